@@ -1,6 +1,26 @@
 from .query import A2SQuery
-from .data import SourceInfo, GoldSourceInfo, Player
-from .enums import ServerType, Environment
+from .async_query import AsyncA2SQuery
+from .shared import SharedA2SQuery
+from .scanner import FleetScanner
+from .sharded import ShardedScanner
+from .master import MasterServerQuery, AsyncMasterServerQuery
+from .responder import A2SResponder
+from .challenge import ChallengeCache
+from .cache import ResponseCache
+from .rtt import RTTEstimator
+from .health import HealthTracker
+from .ratelimit import TokenBucket, Pacer
+from .metrics import Instrument, HistogramCollector
+from .columns import PlayerColumns
+from .lazy import LazySourceInfo, LazyGoldSourceInfo
+from .tracker import PlayerTracker
+from .watch import watch
+from .scheduler import AdaptiveScheduler
+from .data import (
+    SourceInfo, GoldSourceInfo, Player, PlayerEvent, Snapshot, ScanResult, ServerHealth, RequestTrace, ParsedRecord,
+    WatchEvent
+)
+from .enums import RequestType, ResponseType, ServerType, Environment, PlayerEventType, ServerState, Region
 
 __title__ = "a2squery"
 __author__ = "Liam (linKhehe) Henderson"
@@ -9,6 +29,11 @@ __copyright__ = "Copyright 2022-present Liam (linKhehe) Henderson"
 __version__ = "0.0.2"
 
 __all__ = (
-    "A2SQuery", "SourceInfo", "GoldSourceInfo",
-    "Player", "ServerType", "Environment"
+    "A2SQuery", "AsyncA2SQuery", "SharedA2SQuery", "FleetScanner", "ShardedScanner", "AdaptiveScheduler", "MasterServerQuery", "AsyncMasterServerQuery",
+    "A2SResponder", "ChallengeCache", "ResponseCache", "RTTEstimator", "HealthTracker", "TokenBucket", "Pacer",
+    "Instrument", "HistogramCollector",
+    "SourceInfo", "GoldSourceInfo", "LazySourceInfo", "LazyGoldSourceInfo",
+    "Player", "PlayerColumns", "PlayerTracker", "PlayerEvent", "Snapshot", "ScanResult", "ServerHealth", "RequestTrace",
+    "ParsedRecord", "WatchEvent", "watch",
+    "RequestType", "ResponseType", "ServerType", "Environment", "PlayerEventType", "ServerState", "Region"
 )
@@ -0,0 +1,331 @@
+import asyncio
+import functools
+import time
+import typing
+
+from .challenge import ChallengeCache
+from .health import HealthTracker
+from .data import SourceInfo, GoldSourceInfo, Player, RequestTrace
+from .enums import RequestType, ResponseType
+from .exceptions import InvalidResponse, SocketClosed
+from .metrics import Instrument
+from .ratelimit import Pacer
+from .rtt import RTTEstimator
+from .query import QueryResponse, _answers, _pack_request, _parse_info, _parse_player, _parse_rules, _REQUEST_BODIES
+from .reassembly import SPLIT_HEADER, SplitPacketAssembler
+
+__all__ = ("AsyncA2SQuery",)
+
+_RESPONSE_VALUES = frozenset(response_type.value for response_type in ResponseType)
+
+
+class _A2SProtocol(asyncio.DatagramProtocol):
+
+    def __init__(self, timeout: float):
+        self.transport = None
+        self._waiter = None
+        self._request_type = None
+        self._assembler = SplitPacketAssembler(timeout)
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if self._waiter is None or self._waiter.done():
+            return
+
+        if data.startswith(SPLIT_HEADER):
+            try:
+                data = self._assembler.feed(data)
+            except InvalidResponse as exception:
+                self._waiter.set_exception(exception)
+                return
+
+            if data is None:
+                return
+
+        # Replies that do not belong to the current request, such as a late reply to a retransmitted
+        # request, are dropped. Unknown types are passed on so that decoding them reports the error.
+        if len(data) > 4 and data[4] in _RESPONSE_VALUES and not _answers(ResponseType(data[4]), self._request_type):
+            return
+
+        self._waiter.set_result(data)
+
+    def error_received(self, exc):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_exception(exc)
+
+    def connection_lost(self, exc):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_exception(exc or SocketClosed("The socket has been closed. No more requests can be made."))
+
+    async def exchange(self, request_type: RequestType, data: bytes, timeout: float) -> bytes:
+        self._request_type = request_type
+        self._waiter = asyncio.get_event_loop().create_future()
+        self.transport.sendto(data)
+
+        try:
+            return await asyncio.wait_for(self._waiter, timeout)
+        finally:
+            self._waiter = None
+
+
+class AsyncA2SQuery:
+    """Query various information from running Source/GoldSource game servers using asyncio.
+
+    This class is the asyncio counterpart of :class:`a2squery.A2SQuery`. The datagram endpoint is
+    opened on the first request (or when entering the async context manager) and is kept open until closed.
+    Requests made concurrently on the same instance are sent one after another.
+    Lost packets are retransmitted the same way as with :class:`a2squery.A2SQuery`.
+    """
+
+    def __init__(
+            self, host: str, port: int = 27015, timeout: float = 10, challenge_cache: ChallengeCache = None,
+            retries: int = 2, rtt: RTTEstimator = None, health: HealthTracker = None, pacer: Pacer = None,
+            instrument: Instrument = None
+    ):
+        """Create a new AsyncA2SQuery instance for the specified server.
+
+        Arguments:
+            host: The IP address of the server. Do not include a port here.
+            port: The query port of the server. This is the same as the connection port for most games.
+            timeout: The total time a request may take, including retransmissions, before timing out.
+            challenge_cache:
+                Where to remember the server's challenges between requests.
+                Pass the same cache to several clients to share it. Each instance gets its own cache when omitted.
+            retries: How many times a request is retransmitted when no reply arrives.
+            rtt:
+                The server's round trip time estimate, used to decide when to retransmit.
+                Pass the same estimator to later instances for the same server to keep it. Each instance gets its own when omitted.
+            health:
+                Records timeouts and invalid responses so that requests to a server that is down fail fast
+                with :class:`a2squery.exceptions.ServerDown`. Requests are not tracked when omitted.
+            pacer:
+                Delays sends to stay within its rate limits. Share one pacer between every client of a
+                process to pace all of them together. Requests are sent right away when omitted.
+            instrument:
+                Receives a :class:`a2squery.RequestTrace` with the timings and sizes of every request,
+                such as a :class:`a2squery.HistogramCollector`. Nothing is timed when omitted.
+        """
+        self._address = (host, port)
+        self._timeout = timeout
+        self._retries = retries
+        self._rtt = RTTEstimator() if rtt is None else rtt
+        self._health = health
+        self._pacer = pacer
+        self._instrument = instrument
+        self._challenges = ChallengeCache() if challenge_cache is None else challenge_cache
+        self._protocol = None
+        self._lock = None
+        self._closed = False
+
+    async def __aenter__(self):
+        await self._connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    async def _connect(self) -> _A2SProtocol:
+        if self._closed:
+            raise SocketClosed("The socket has been closed. No more requests can be made.")
+
+        # The lock is made on first use, inside the event loop it belongs to. Nothing is awaited before it
+        # is set, so concurrent first requests share it, and only the first of them opens the endpoint.
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        if self._protocol is None:
+            async with self._lock:
+                if self._closed:
+                    raise SocketClosed("The socket has been closed. No more requests can be made.")
+
+                if self._protocol is None:
+                    transport, protocol = await asyncio.get_event_loop().create_datagram_endpoint(
+                        lambda: _A2SProtocol(self._timeout), remote_addr=self._address
+                    )
+
+                    if self._closed:
+                        transport.close()
+                        raise SocketClosed("The socket has been closed. No more requests can be made.")
+
+                    self._address = transport.get_extra_info("peername")[:2]
+                    self._protocol = protocol
+
+        return self._protocol
+
+    def close(self) -> None:
+        """Close the query endpoint. All requests after this will fail."""
+        if self._protocol is not None:
+            self._protocol.transport.close()
+            self._protocol = None
+        self._closed = True
+
+    async def _exchange(
+            self, protocol: _A2SProtocol, request_type: RequestType, data: bytes, deadline: float,
+            trace: RequestTrace = None
+    ) -> QueryResponse:
+        attempt = 0
+
+        while True:
+            if self._pacer is not None:
+                delay = self._pacer.reserve(self._address)
+                if delay:
+                    await asyncio.sleep(delay)
+
+                    if trace is not None:
+                        trace.send += delay
+
+            sent = time.monotonic()
+            remaining = deadline - sent
+
+            if trace is not None:
+                trace.attempts += 1
+                trace.bytes_out += len(data)
+
+            if remaining <= 0:
+                raise asyncio.TimeoutError()
+
+            try:
+                response = await protocol.exchange(request_type, data, min(self._rtt.timeout(attempt), remaining))
+            except asyncio.TimeoutError:
+                if attempt >= self._retries:
+                    raise
+                attempt += 1
+                continue
+
+            if attempt == 0:
+                self._rtt.sample(time.monotonic() - sent)
+
+            response = QueryResponse.from_bytes(response)
+
+            if trace is not None:
+                trace.bytes_in += len(response.data)
+                if response.type is ResponseType.Challenge:
+                    trace.challenges += 1
+                    trace.challenge_rtt = time.monotonic() - sent
+                else:
+                    trace.first_byte = time.monotonic() - sent
+
+            return response
+
+    async def _fetch(
+            self, request_type: RequestType, parse: typing.Callable[[QueryResponse], typing.Any], body: str = None
+    ) -> typing.Any:
+        if self._instrument is None:
+            return parse(await self._request(request_type, body))
+
+        trace = RequestTrace._make(self._address, request_type)
+        started = time.monotonic()
+
+        try:
+            response = await self._request(request_type, body, trace)
+            trace.response_type = response.type
+            parsing = time.monotonic()
+            result = parse(response)
+            trace.parse = time.monotonic() - parsing
+            return result
+        except Exception as exception:
+            trace.error = exception
+            raise
+        finally:
+            trace.total = time.monotonic() - started
+            self._instrument.record(trace)
+
+    async def _request(self, request_type: RequestType, body: str = None, trace: RequestTrace = None) -> QueryResponse:
+        protocol = await self._connect()
+
+        if self._health is None:
+            return await self._query(protocol, request_type, body, trace)
+
+        self._health.check(self._address)
+
+        try:
+            response = await self._query(protocol, request_type, body, trace)
+        except (asyncio.TimeoutError, InvalidResponse) as exception:
+            self._health.record_failure(self._address, exception)
+            raise
+
+        self._health.record_success(self._address)
+        return response
+
+    async def _query(
+            self, protocol: _A2SProtocol, request_type: RequestType, body: str = None, trace: RequestTrace = None
+    ) -> QueryResponse:
+        async with self._lock:
+            challenge = self._challenges.get(self._address, request_type)
+            refreshed = False
+            deadline = time.monotonic() + self._timeout
+
+            while True:
+                response = await self._exchange(protocol, request_type, _pack_request(request_type, body, challenge), deadline, trace)
+
+                if response.type is not ResponseType.Challenge:
+                    return response
+
+                if refreshed:
+                    raise InvalidResponse("Server requested too many challenges")
+
+                challenge = response.read_challenge()
+                self._challenges.set(self._address, request_type, challenge)
+                refreshed = True
+
+    async def info(self, lazy: bool = False) -> typing.Union[SourceInfo, GoldSourceInfo]:
+        """Query general information about the server.
+
+        Arguments:
+            lazy:
+                Decode each field the first time it is read instead of all of them up front.
+                This is faster when only a few fields are used, such as ``players`` and ``map``.
+
+        Returns:
+            :class:`a2squery.SourceInfo` or :class:`a2squery.GoldSourceInfo` depending on server's engine/response.
+        """
+        parse = functools.partial(_parse_info, lazy=True) if lazy else _parse_info
+        return await self._fetch(RequestType.Info, parse, _REQUEST_BODIES[RequestType.Info])
+
+    async def player(self, fields: typing.Iterable[str] = None) -> typing.List[Player]:
+        """Query the server's current players/bots.
+
+        Arguments:
+            fields:
+                Only decode these :class:`a2squery.Player` fields, such as ``("name", "score")``.
+                The other fields are skipped while parsing and left as None.
+
+        Returns:
+            List of Player objects
+        """
+        if fields is None:
+            return await self._fetch(RequestType.Player, _parse_player)
+
+        return await self._fetch(RequestType.Player, functools.partial(_parse_player, fields=tuple(fields)))
+
+    async def players(self, fields: typing.Iterable[str] = None) -> typing.List[Player]:
+        """Query the server's current players/bots.
+
+        This is an alias of AsyncA2SQuery.player().
+
+        Returns:
+            List of Player objects
+        """
+        return await self.player(fields)
+
+    async def rules(self, keys: typing.Iterable[str] = None) -> typing.Dict[str, str]:
+        """Query the server's rules/configuration variables in key/value pairs.
+
+        The Console variables included are the ones marked with FCVAR_NOTIFY
+        as well as any additional ones listed in the server configuration.
+
+        Arguments:
+            keys:
+                Only return these rules, such as ``("sv_tags", "mp_timelimit")``. Other rules are skipped
+                without being decoded. A key sent more than once gets its last value, as in a full parse,
+                and keys the server does not send are missing from the result.
+
+        Returns:
+            Key/value dictionary of rules
+        """
+        if keys is None:
+            return await self._fetch(RequestType.Rules, _parse_rules)
+
+        return await self._fetch(RequestType.Rules, functools.partial(_parse_rules, keys=tuple(keys)))
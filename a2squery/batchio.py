@@ -0,0 +1,250 @@
+"""Send and receive many datagrams per system call.
+
+On Linux, :func:`open_io` returns a :class:`MMsgIO`, which uses ``sendmmsg`` and ``recvmmsg`` through :mod:`ctypes`.
+Everywhere else, or when those calls are missing, it returns a :class:`DatagramIO`, which makes one ``sendto`` or
+``recvfrom_into`` call per datagram. Both share one interface, so callers such as :class:`a2squery.FleetScanner`
+do not need to know which one they got.
+"""
+import ctypes
+import ctypes.util
+import errno
+import itertools
+import os
+import socket
+import struct
+import sys
+import typing
+
+__all__ = ("DatagramIO", "MMsgIO", "open_io")
+
+# The largest datagram that can be received, and the largest request that can be sent in a batch.
+RECEIVE_SIZE = 65536
+SEND_SIZE = 1400
+
+_MSG_DONTWAIT = 0x40
+_SOCKADDR = struct.Struct("=H2s4s8x")
+_NAME_SIZE = _SOCKADDR.size
+_PORT = struct.Struct("!H")
+
+# Cached sockaddr_in structures and addresses are dropped once there are this many.
+_MAX_ADDRESSES = 65536
+
+Entry = typing.Tuple[bytes, typing.Tuple[str, int]]
+
+
+class DatagramIO:
+    """One system call per datagram. Used where batched calls are not available.
+
+    Attributes:
+        buffer: Where received datagrams are written, see :py:meth:`receive`.
+        batch_size: The most datagrams sent or received per call.
+    """
+
+    def __init__(self, sock: socket.socket):
+        self.socket = sock
+        self.batch_size = 1
+        self.buffer = bytearray(RECEIVE_SIZE)
+
+    def send(self, entries: typing.Sequence[Entry], start: int = 0) -> int:
+        """Send ``(data, address)`` entries from ``start`` on.
+
+        Returns:
+            How many entries were sent, at least 1.
+
+        Raises:
+            :class:`OSError` if the first entry could not be sent. The entries after it can be sent with another call.
+        """
+        data, address = entries[start]
+        self.socket.sendto(data, address)
+        return 1
+
+    def receive(self) -> typing.List[typing.Tuple[int, int, typing.Tuple[str, int]]]:
+        """Receive the datagrams that are waiting, without blocking.
+
+        Returns:
+            ``(offset, size, address)`` for every datagram received, where ``buffer[offset:offset + size]`` is the datagram.
+            Empty when nothing is waiting. The buffer is overwritten by the next call.
+        """
+        try:
+            size, address = self.socket.recvfrom_into(self.buffer)
+        except (BlockingIOError, InterruptedError):
+            return []
+
+        return [(0, size, address)]
+
+
+class _IOVec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p), ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(_IOVec)), ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p), ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _MsgHdr), ("msg_len", ctypes.c_uint)]
+
+
+def _load_libc() -> typing.Optional[ctypes.CDLL]:
+    if not sys.platform.startswith("linux"):
+        return None
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        libc.sendmmsg.argtypes = (ctypes.c_int, ctypes.POINTER(_MMsgHdr), ctypes.c_uint, ctypes.c_int)
+        libc.recvmmsg.argtypes = (ctypes.c_int, ctypes.POINTER(_MMsgHdr), ctypes.c_uint, ctypes.c_int, ctypes.c_void_p)
+    except (OSError, AttributeError):
+        return None
+
+    return libc
+
+
+_libc = _load_libc()
+
+
+def _address_of(buffer: bytearray) -> typing.Tuple[ctypes.Array, int]:
+    array = (ctypes.c_char * len(buffer)).from_buffer(buffer)
+    return array, ctypes.addressof(array)
+
+
+class _Batch:
+    """Message headers pointing at fixed size slots of one buffer, and at one sockaddr_in each."""
+
+    def __init__(self, size: int, slot: int):
+        self.buffer = bytearray(size * slot)
+        self.names = bytearray(size * _NAME_SIZE)
+        self.headers = (_MMsgHdr * size)()
+        self.vectors = (_IOVec * size)()
+        # Indexing a ctypes array creates a new wrapper every time, so the wrappers are kept.
+        self.vector_list = list(self.vectors)
+        self.header_list = list(self.headers)
+
+        # The ctypes views keep the buffers from being resized while the kernel points into them.
+        self._buffer, buffer = _address_of(self.buffer)
+        self._names, names = _address_of(self.names)
+
+        for index in range(size):
+            self.vectors[index].iov_base = buffer + index * slot
+            self.vectors[index].iov_len = slot
+
+            header = self.headers[index].msg_hdr
+            header.msg_name = names + index * _NAME_SIZE
+            header.msg_namelen = _NAME_SIZE
+            header.msg_iov = ctypes.pointer(self.vectors[index])
+            header.msg_iovlen = 1
+
+
+class MMsgIO(DatagramIO):
+    """Batched datagram I/O with Linux's ``sendmmsg`` and ``recvmmsg``.
+
+    Datagrams are copied into and out of preallocated buffers, so a batch costs one system call plus a copy
+    of each datagram, instead of one system call per datagram.
+    """
+
+    def __init__(self, sock: socket.socket, batch_size: int = 64):
+        if _libc is None:
+            raise OSError(errno.ENOSYS, "sendmmsg and recvmmsg are not available")
+        if sock.family != socket.AF_INET:
+            raise ValueError("Batched I/O only supports IPv4 sockets")
+
+        self.socket = sock
+        self.batch_size = batch_size
+        self._fd = sock.fileno()
+        self._send = _Batch(batch_size, SEND_SIZE)
+        self._receive = _Batch(batch_size, RECEIVE_SIZE)
+        self._received = 0
+        self._names = {}
+        self._addresses = {}
+        self.buffer = self._receive.buffer
+
+    def _name(self, address: typing.Tuple[str, int]) -> bytes:
+        if len(self._names) >= _MAX_ADDRESSES:
+            self._names.clear()
+
+        name = self._names[address] = _SOCKADDR.pack(socket.AF_INET, _PORT.pack(address[1]), socket.inet_aton(address[0]))
+        return name
+
+    def send(self, entries: typing.Sequence[Entry], start: int = 0) -> int:
+        batch = self._send
+        buffer = batch.buffer
+        names = batch.names
+        vectors = batch.vector_list
+        cached = self._names
+        offset = 0
+        name = 0
+        count = 0
+
+        for data, address in itertools.islice(entries, start, start + self.batch_size):
+            size = len(data)
+            if size > SEND_SIZE:
+                # Too large for a slot. Send everything before it, then send it on its own.
+                if count:
+                    break
+                return DatagramIO.send(self, entries, start)
+
+            buffer[offset:offset + size] = data
+            vectors[count].iov_len = size
+            names[name:name + _NAME_SIZE] = cached.get(address) or self._name(address)
+            offset += SEND_SIZE
+            name += _NAME_SIZE
+            count += 1
+
+        sent = _libc.sendmmsg(self._fd, batch.headers, count, 0)
+        if sent < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, os.strerror(code))
+
+        return sent
+
+    def receive(self) -> typing.List[typing.Tuple[int, int, typing.Tuple[str, int]]]:
+        batch = self._receive
+        headers = batch.header_list
+
+        # The kernel overwrites the name length of every message it fills in.
+        for index in range(self._received):
+            headers[index].msg_hdr.msg_namelen = _NAME_SIZE
+
+        received = _libc.recvmmsg(self._fd, batch.headers, self.batch_size, _MSG_DONTWAIT, None)
+        if received < 0:
+            self._received = 0
+            code = ctypes.get_errno()
+            if code in (errno.EAGAIN, errno.EWOULDBLOCK, errno.EINTR):
+                return []
+            raise OSError(code, os.strerror(code))
+
+        self._received = received
+        names = bytes(batch.names[:received * _NAME_SIZE])
+        addresses = self._addresses
+        datagrams = []
+
+        for index in range(received):
+            # The port and the IPv4 address, both in network byte order.
+            raw = names[index * _NAME_SIZE + 2:index * _NAME_SIZE + 8]
+            address = addresses.get(raw)
+
+            if address is None:
+                if len(addresses) >= _MAX_ADDRESSES:
+                    addresses.clear()
+                address = addresses[raw] = (socket.inet_ntoa(raw[2:]), _PORT.unpack_from(raw)[0])
+
+            datagrams.append((index * RECEIVE_SIZE, headers[index].msg_len, address))
+
+        return datagrams
+
+
+def open_io(sock: socket.socket, batch_size: int = 64) -> DatagramIO:
+    """Get the fastest datagram I/O for a non-blocking IPv4 socket.
+
+    Arguments:
+        sock: The socket to send and receive on.
+        batch_size: The most datagrams sent or received per system call. 1 always gives a :class:`DatagramIO`.
+    """
+    if batch_size > 1 and _libc is not None and sock.family == socket.AF_INET:
+        return MMsgIO(sock, batch_size)
+
+    return DatagramIO(sock)
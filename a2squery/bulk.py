@@ -0,0 +1,173 @@
+"""Parse recorded responses in bulk.
+
+Captures are a sequence of frames, each a little endian unsigned 32 bit length followed by one raw
+datagram as it was received, header included. :func:`write_records` writes this format.
+"""
+import functools
+import mmap
+import os
+import struct
+import typing
+
+from .data import ParsedRecord
+from .enums import RequestType, ResponseFormat, ResponseType
+from .exceptions import InvalidResponse
+from .query import QueryResponse, _parse_info, _PARSERS, _RESPONSE_REQUESTS
+from .reassembly import SplitPacketAssembler
+
+__all__ = ("parse_records", "parse_file", "iter_records", "write_records")
+
+_FRAME = struct.Struct("<I")
+_FORMAT = struct.Struct("<l")
+
+# Captures do not record where a datagram came from, so fragments of one response that are further apart
+# than this many records are not reassembled. This also bounds the memory held for responses that never complete.
+_MAX_DISTANCE = 4096
+
+Buffer = typing.Union[bytes, bytearray, memoryview, mmap.mmap]
+
+
+def write_records(file: typing.BinaryIO, datagrams: typing.Iterable[bytes]) -> int:
+    """Append datagrams to a capture file opened in binary mode.
+
+    Returns:
+        The number of datagrams written.
+    """
+    count = 0
+
+    for datagram in datagrams:
+        file.write(_FRAME.pack(len(datagram)))
+        file.write(datagram)
+        count += 1
+
+    return count
+
+
+def iter_records(buffer: Buffer) -> typing.Iterator[typing.Tuple[int, bytes]]:
+    """Split a capture into its datagrams.
+
+    Each datagram is copied out of ``buffer`` on its own, so ``buffer`` can be a memory map of a file
+    much larger than the available memory.
+
+    Returns:
+        An iterator of ``(offset, datagram)`` tuples, where ``offset`` is where the datagram's frame starts.
+
+    Raises:
+        :class:`a2squery.exceptions.InvalidResponse` after the last complete record if the capture is truncated.
+    """
+    offset = 0
+    size = len(buffer)
+
+    while offset < size:
+        if offset + _FRAME.size > size:
+            raise InvalidResponse("Capture ends inside the frame header at offset {}".format(offset))
+
+        start = offset + _FRAME.size
+        end = start + _FRAME.unpack_from(buffer, offset)[0]
+
+        if end > size:
+            raise InvalidResponse("Capture ends inside the record at offset {}".format(offset))
+
+        yield offset, bytes(buffer[start:end])
+        offset = end
+
+
+def _parse(
+        data: bytes, index: int, assembler: SplitPacketAssembler, parse_info: typing.Callable
+) -> typing.Optional[tuple]:
+    if ResponseFormat(_FORMAT.unpack_from(data)[0]) is ResponseFormat.Batch:
+        data = assembler.feed(data, now=index)
+        if data is None:
+            return None
+
+    response = QueryResponse.from_bytes(data)
+
+    if response.type is ResponseType.Challenge:
+        return response.type, response.read_challenge()
+
+    request_type = _RESPONSE_REQUESTS[response.type]
+    if request_type is RequestType.Info:
+        return response.type, parse_info(response)
+    return response.type, _PARSERS[request_type](response)
+
+
+def _parse_stream(
+        records: typing.Iterable[typing.Tuple[typing.Optional[int], bytes]], lazy: bool
+) -> typing.Iterator[ParsedRecord]:
+    assembler = SplitPacketAssembler(_MAX_DISTANCE)
+    parse_info = functools.partial(_parse_info, lazy=True) if lazy else _parse_info
+
+    for index, (offset, data) in enumerate(records):
+        try:
+            parsed = _parse(data, index, assembler, parse_info)
+        except (InvalidResponse, ValueError, IndexError, struct.error) as exception:
+            yield ParsedRecord._make(index, offset, error=exception)
+            continue
+
+        if parsed is not None:
+            yield ParsedRecord._make(index, offset, *parsed)
+
+
+def parse_records(records: typing.Iterable[bytes], lazy: bool = False) -> typing.Iterator[ParsedRecord]:
+    """Parse raw datagrams, one result per response.
+
+    The header of each datagram decides how it is parsed. Split packets are reassembled first and yield
+    a single record once their last fragment has been read; fragments of responses that never complete
+    are dropped. Datagrams carry no source address, so fragments are matched by their split id alone: a new
+    first fragment with an id that is already held starts that response over, and fragments more than
+    4096 records apart are not reassembled. A malformed datagram yields a record with its error and does not stop the run.
+
+    Arguments:
+        records: Raw datagrams, each starting with the simple or split response header.
+        lazy: Parse info responses into :class:`a2squery.LazySourceInfo` and :class:`a2squery.LazyGoldSourceInfo`.
+
+    Returns:
+        An iterator of :class:`a2squery.ParsedRecord`.
+    """
+    return _parse_stream(((None, data) for data in records), lazy)
+
+
+def parse_file(file: typing.Union[str, os.PathLike, typing.BinaryIO], lazy: bool = False) -> typing.Iterator[ParsedRecord]:
+    """Parse a capture written by :func:`write_records`.
+
+    The file is memory mapped and read one record at a time, so captures of any size can be parsed.
+    A truncated capture yields an error record after its last complete record.
+
+    Arguments:
+        file: A path, or a file opened in binary mode.
+        lazy: See :func:`parse_records`.
+
+    Returns:
+        An iterator of :class:`a2squery.ParsedRecord`.
+    """
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as f:
+            yield from parse_file(f, lazy)
+        return
+
+    if hasattr(file, "getbuffer"):
+        buffer = file.getbuffer()
+    elif os.fstat(file.fileno()).st_size == 0:
+        return
+    else:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    frames = iter_records(buffer)
+    complete = 0
+
+    def counted():
+        nonlocal complete
+        for frame in frames:
+            complete += 1
+            yield frame
+
+    try:
+        yield from _parse_stream(counted(), lazy)
+    except InvalidResponse as exception:
+        yield ParsedRecord._make(complete, None, error=exception)
+    finally:
+        frames.close()
+        if isinstance(buffer, memoryview):
+            buffer.release()
+        else:
+            buffer.close()
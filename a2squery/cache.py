@@ -0,0 +1,236 @@
+import collections
+import threading
+import time
+import typing
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .challenge import ChallengeCache
+from .enums import RequestType
+from .health import HealthTracker
+from .query import A2SQuery
+from .rtt import RTTEstimator
+
+__all__ = ("ResponseCache",)
+
+_DEFAULT_TTLS = {
+    RequestType.Info: 5,
+    RequestType.Player: 5,
+    RequestType.Rules: 60,
+}
+
+
+class _Entry:
+
+    __slots__ = ("value", "expires", "stale_until")
+
+    def __init__(self, value: typing.Any, expires: float, stale_until: float):
+        self.value = value
+        self.expires = expires
+        self.stale_until = stale_until
+
+
+class ResponseCache:
+    """A shared in-process cache of query results keyed by server address and request type.
+
+    Fresh results are returned straight from the cache. Once a result is older than its request type's TTL
+    it is still returned for another ``stale_ttl`` seconds while a background thread refreshes it.
+    Concurrent misses for the same key wait on a single query instead of each sending their own.
+    The least recently used entries are evicted once more than ``max_size`` results are cached.
+
+    Attributes:
+        hits: The number of lookups answered with a fresh result.
+        stale_hits: The number of lookups answered with a stale result while it was being refreshed.
+        misses: The number of lookups that had to wait for a query.
+        coalesced: The number of misses that shared a query already in flight.
+        evictions: The number of results dropped to stay under ``max_size``.
+    """
+
+    def __init__(
+            self, ttl: typing.Dict[RequestType, float] = None, stale_ttl: float = 30,
+            max_size: int = 4096, timeout: float = 5, workers: int = 4, health: HealthTracker = None
+    ):
+        """Create a new ResponseCache.
+
+        Arguments:
+            ttl: How long results stay fresh, per request type. Missing request types use the defaults (5s, 5s and 60s for rules).
+            stale_ttl: How long an expired result may still be returned while it is refreshed. 0 disables stale-while-revalidate.
+            max_size: The maximum number of cached results.
+            timeout: The timeout of the queries made by the cache.
+            workers: The number of threads refreshing stale results in the background.
+            health: Passed to the :class:`a2squery.A2SQuery` instances made by the cache, so misses for servers that are down fail fast.
+        """
+        self.ttl = dict(_DEFAULT_TTLS)
+        self.ttl.update(ttl or {})
+        self.stale_ttl = stale_ttl
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health = health
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+        self._entries = collections.OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._challenges = ChallengeCache()
+        self._rtt = {}
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        """Wait for background refreshes to finish and stop their threads."""
+        self._executor.shutdown()
+
+    def stats(self) -> typing.Dict[str, int]:
+        """Get the cache counters.
+
+        Returns:
+            Dictionary of the hit/miss counters and the current size.
+        """
+        return {
+            "hits": self.hits, "stale_hits": self.stale_hits, "misses": self.misses,
+            "coalesced": self.coalesced, "evictions": self.evictions, "size": len(self._entries)
+        }
+
+    def invalidate(self, address: typing.Tuple[str, int], request_type: RequestType = None) -> None:
+        """Drop cached results for a server.
+
+        Arguments:
+            address: The server's ``(host, port)``.
+            request_type: Only drop the result for this request type. All of them are dropped when omitted.
+        """
+        request_types = list(RequestType) if request_type is None else [request_type]
+
+        with self._lock:
+            for request_type in request_types:
+                self._entries.pop((address, request_type), None)
+            self._forget(address)
+
+    def get(
+            self, address: typing.Tuple[str, int], request_type: RequestType,
+            fetch: typing.Callable[[], typing.Any] = None
+    ) -> typing.Any:
+        """Get a result from the cache, querying the server when needed.
+
+        Arguments:
+            address: The server's ``(host, port)``.
+            request_type: The type of request.
+            fetch:
+                Called without arguments to get a new result on a miss or refresh.
+                Queries the server with :class:`a2squery.A2SQuery` when omitted.
+
+        Returns:
+            The same value as the matching :class:`a2squery.A2SQuery` method.
+        """
+        key = (address, request_type)
+
+        if fetch is None:
+            fetch = self._fetcher(address, request_type)
+
+        with self._lock:
+            now = time.monotonic()
+            entry = self._entries.get(key)
+
+            if entry is not None and now < entry.stale_until:
+                self._entries.move_to_end(key)
+
+                if now < entry.expires:
+                    self.hits += 1
+                    return entry.value
+
+                self.stale_hits += 1
+                if key not in self._in_flight:
+                    self._in_flight[key] = future = Future()
+                    self._executor.submit(self._refresh, key, fetch, future)
+                return entry.value
+
+            self.misses += 1
+            future = self._in_flight.get(key)
+
+            if future is not None:
+                self.coalesced += 1
+                owner = False
+            else:
+                self._in_flight[key] = future = Future()
+                owner = True
+
+        if owner:
+            self._refresh(key, fetch, future)
+
+        return future.result()
+
+    def info(self, host: str, port: int = 27015):
+        """Cached :py:meth:`a2squery.A2SQuery.info`."""
+        return self.get((host, port), RequestType.Info)
+
+    def player(self, host: str, port: int = 27015):
+        """Cached :py:meth:`a2squery.A2SQuery.player`."""
+        return self.get((host, port), RequestType.Player)
+
+    def rules(self, host: str, port: int = 27015):
+        """Cached :py:meth:`a2squery.A2SQuery.rules`."""
+        return self.get((host, port), RequestType.Rules)
+
+    def _fetcher(self, address: typing.Tuple[str, int], request_type: RequestType) -> typing.Callable[[], typing.Any]:
+        def fetch():
+            with self._lock:
+                rtt = self._rtt.setdefault(address, RTTEstimator())
+
+            a2s = A2SQuery(*address, timeout=self.timeout, challenge_cache=self._challenges, rtt=rtt, health=self.health)
+
+            try:
+                if request_type is RequestType.Info:
+                    return a2s.info()
+                if request_type is RequestType.Player:
+                    return a2s.player()
+                return a2s.rules()
+            finally:
+                a2s.close()
+
+        return fetch
+
+    def _forget(self, address: typing.Tuple[str, int]) -> None:
+        # Called with the lock held. A server's RTT estimate is kept only while something of it is cached or in flight.
+        for request_type in RequestType:
+            if (address, request_type) in self._entries or (address, request_type) in self._in_flight:
+                return
+
+        self._rtt.pop(address, None)
+
+    def _refresh(self, key: typing.Tuple[typing.Tuple[str, int], RequestType], fetch, future: Future) -> None:
+        try:
+            value = fetch()
+        except BaseException as exception:
+            # Waiters get every error, but only ordinary ones stop here.
+            future.set_exception(exception)
+            if isinstance(exception, Exception):
+                return
+            raise
+        else:
+            with self._lock:
+                now = time.monotonic()
+                expires = now + self.ttl[key[1]]
+                self._entries[key] = _Entry(value, expires, expires + self.stale_ttl)
+                self._entries.move_to_end(key)
+
+                while len(self._entries) > self.max_size:
+                    evicted, _ = self._entries.popitem(last=False)
+                    self._forget(evicted[0])
+                    self.evictions += 1
+
+            future.set_result(value)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+                self._forget(key[0])
@@ -0,0 +1,76 @@
+import time
+import typing
+
+from .enums import RequestType
+
+__all__ = ("ChallengeCache",)
+
+
+class ChallengeCache:
+    """Remember the challenge numbers servers hand out so requests can include them up front.
+
+    Challenges are stored per server address and request type and expire after ``ttl`` seconds.
+    A cached challenge that the server no longer accepts is answered with a new challenge,
+    which replaces the cached one, so a stale entry costs no more than a cache miss.
+    One cache can be shared between any number of clients.
+    """
+
+    def __init__(self, ttl: float = 60):
+        """Create a new ChallengeCache.
+
+        Arguments:
+            ttl: How long a challenge is reused for, in seconds.
+        """
+        self.ttl = ttl
+        self._challenges = {}
+
+    def __len__(self):
+        return len(self._challenges)
+
+    def get(self, address: typing.Tuple[str, int], request_type: RequestType) -> int:
+        """Get the cached challenge for a server.
+
+        Returns:
+            The challenge number, or -1 when nothing is cached or the entry has expired.
+        """
+        entry = self._challenges.get((address, request_type))
+
+        if entry is None:
+            return -1
+
+        challenge, expires = entry
+        if expires < time.monotonic():
+            self._challenges.pop((address, request_type), None)
+            return -1
+
+        return challenge
+
+    def set(self, address: typing.Tuple[str, int], request_type: RequestType, challenge: int) -> None:
+        """Store a challenge received from a server."""
+        self._challenges[(address, request_type)] = (challenge, time.monotonic() + self.ttl)
+
+    def invalidate(self, address: typing.Tuple[str, int], request_type: RequestType = None) -> None:
+        """Forget the challenges cached for a server.
+
+        Arguments:
+            address: The server's address.
+            request_type: Only forget the challenge for this request type. All of them are forgotten when omitted.
+        """
+        request_types = list(RequestType) if request_type is None else [request_type]
+
+        for request_type in request_types:
+            self._challenges.pop((address, request_type), None)
+
+    def clear_expired(self) -> int:
+        """Remove every expired challenge.
+
+        Returns:
+            The number of challenges removed.
+        """
+        now = time.monotonic()
+        expired = [key for key, (_, expires) in list(self._challenges.items()) if expires < now]
+
+        for key in expired:
+            self._challenges.pop(key, None)
+
+        return len(expired)
@@ -0,0 +1,158 @@
+import array
+import struct
+import typing
+
+from .data import Player
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+__all__ = ("PlayerColumns",)
+
+_SCORE_DURATION = struct.Struct("<lf")
+_DEATHS_MONEY = struct.Struct("<ll")
+
+
+class PlayerColumns:
+    """Player lists of many servers parsed into NumPy column arrays.
+
+    Every row is one player. ``server_id`` is the position of the player's payload in the iterable passed to
+    :py:meth:`a2squery.PlayerColumns.from_payloads`. Names are not decoded while parsing, the payloads are
+    concatenated into :py:attr:`names` and ``name_start``/``name_end`` hold each name's offsets in it.
+    ``deaths`` and ``money`` are 0 unless ``extended`` is set, which only happens for The Ship servers.
+
+    .. note::
+
+        This class requires NumPy. Install it with ``pip install a2squery[numpy]``.
+
+    Attributes:
+        servers: The number of payloads parsed.
+        names: The concatenated payloads the name offsets point into.
+        server_id: ``uint32`` array of the payload each player came from.
+        index: ``uint8`` array of the players' chunk indexes.
+        score: ``int32`` array of the players' scores.
+        duration: ``float32`` array of how long the players have been connected, in seconds.
+        deaths: ``int32`` array of the players' deaths.
+        money: ``int32`` array of the players' money.
+        extended: ``bool`` array, True where deaths and money were sent by the server.
+        name_start: ``uint32`` array of where each name starts in :py:attr:`names`.
+        name_end: ``uint32`` array of where each name ends in :py:attr:`names`.
+    """
+
+    def __init__(self, servers: int, names: bytes, **columns):
+        self.servers = servers
+        self.names = names
+        self.server_id = columns["server_id"]
+        self.index = columns["index"]
+        self.score = columns["score"]
+        self.duration = columns["duration"]
+        self.deaths = columns["deaths"]
+        self.money = columns["money"]
+        self.extended = columns["extended"]
+        self.name_start = columns["name_start"]
+        self.name_end = columns["name_end"]
+
+    @classmethod
+    def from_payloads(cls, payloads: typing.Iterable[bytes]) -> "PlayerColumns":
+        """Parse player response payloads (as passed to :py:meth:`a2squery.parser.Parser.parse_players`) into columns.
+
+        Arguments:
+            payloads: The player payloads, one per server.
+        """
+        if numpy is None:
+            raise ImportError("PlayerColumns requires NumPy. Install it with pip install a2squery[numpy]")
+
+        server_id = array.array("I")
+        index = array.array("B")
+        score = array.array("i")
+        duration = array.array("f")
+        deaths = array.array("i")
+        money = array.array("i")
+        extended = array.array("B")
+        name_start = array.array("I")
+        name_end = array.array("I")
+        names = bytearray()
+        servers = 0
+
+        for servers, payload in enumerate(payloads, 1):
+            base = len(names)
+            names += payload
+            count = payload[0]
+            position = 1
+
+            for _ in range(count):
+                end = payload.index(b"\x00", position + 1)
+                player_score, player_duration = _SCORE_DURATION.unpack_from(payload, end + 1)
+
+                index.append(payload[position])
+                name_start.append(base + position + 1)
+                name_end.append(base + end)
+                score.append(player_score)
+                duration.append(player_duration)
+
+                position = end + 9
+
+            has_extra = position < len(payload)
+
+            for _ in range(count):
+                if has_extra:
+                    player_deaths, player_money = _DEATHS_MONEY.unpack_from(payload, position)
+                    position += 8
+                else:
+                    player_deaths, player_money = 0, 0
+
+                server_id.append(servers - 1)
+                deaths.append(player_deaths)
+                money.append(player_money)
+                extended.append(has_extra)
+
+        return cls(
+            servers, bytes(names),
+            server_id=numpy.frombuffer(server_id, dtype=numpy.uint32),
+            index=numpy.frombuffer(index, dtype=numpy.uint8),
+            score=numpy.frombuffer(score, dtype=numpy.int32),
+            duration=numpy.frombuffer(duration, dtype=numpy.float32),
+            deaths=numpy.frombuffer(deaths, dtype=numpy.int32),
+            money=numpy.frombuffer(money, dtype=numpy.int32),
+            extended=numpy.frombuffer(extended, dtype=numpy.bool_),
+            name_start=numpy.frombuffer(name_start, dtype=numpy.uint32),
+            name_end=numpy.frombuffer(name_end, dtype=numpy.uint32),
+        )
+
+    def __len__(self):
+        return len(self.server_id)
+
+    def __getitem__(self, row: int) -> Player:
+        extended = bool(self.extended[row])
+
+        return Player._make(
+            int(self.index[row]), self.name(row), int(self.score[row]), float(self.duration[row]),
+            int(self.deaths[row]) if extended else None, int(self.money[row]) if extended else None
+        )
+
+    def name(self, row: int) -> str:
+        """Decode the name of the player in ``row``."""
+        return self.names[self.name_start[row]: self.name_end[row]].decode("utf-8")
+
+    def players(self, server_id: int) -> typing.List[Player]:
+        """Build the list of :class:`a2squery.Player` of one server, as :py:meth:`a2squery.A2SQuery.player` would return it."""
+        start, end = numpy.searchsorted(self.server_id, [server_id, server_id + 1])
+        return [self[row] for row in range(start, end)]
+
+    def players_per_server(self) -> "numpy.ndarray":
+        """Count the players of every server.
+
+        Returns:
+            An array with one count per server, indexed by server id.
+        """
+        return numpy.bincount(self.server_id, minlength=self.servers)
+
+    def score_per_server(self) -> "numpy.ndarray":
+        """Sum the players' scores of every server.
+
+        Returns:
+            An array with one total per server, indexed by server id.
+        """
+        return numpy.bincount(self.server_id, weights=self.score, minlength=self.servers).astype(numpy.int64)
@@ -1,38 +1,88 @@
+import typing
 from typing import Optional
 
-from .enums import Environment, ServerType
+from .enums import Environment, PlayerEventType, RequestType, ResponseType, ServerState, ServerType
 
-__all__ = ("SourceInfo", "GoldSourceInfo", "Player")
+__all__ = ("SourceInfo", "GoldSourceInfo", "Player", "PlayerEvent", "Snapshot", "ScanResult", "ServerHealth", "RequestTrace", "ParsedRecord", "WatchEvent")
 
 
-class Data:
+def _build_make(fields: typing.Tuple[str, ...], defaults: typing.Dict[str, typing.Any]):
+    arguments = ", ".join(
+        "{0}=_defaults[{0!r}]".format(key) if key in defaults else key for key in fields
+    )
+    body = "".join("\n    self.{0} = {0}".format(key) for key in fields)
+    namespace = {"_defaults": defaults}
+
+    exec("def _make(cls, {}):\n    self = cls.__new__(cls){}\n    return self".format(arguments, body), namespace)
+
+    return classmethod(namespace["_make"])
+
+
+class _DataMeta(type):
+    """Stores the annotated fields of Data subclasses in __slots__ instead of a per-instance __dict__.
+
+    Class level defaults would clash with the slots, so they are moved to ``_defaults``
+    and applied when an instance is constructed.
+    """
+
+    def __new__(mcs, name, bases, namespace):
+        fields = tuple(namespace.get("__annotations__", ()))
+        defaults = {}
+
+        for base in reversed(bases):
+            defaults.update(getattr(base, "_defaults", {}))
+
+        for key in fields:
+            if key in namespace:
+                defaults[key] = namespace.pop(key)
+
+        namespace.setdefault("__slots__", fields)
+
+        cls = super().__new__(mcs, name, bases, namespace)
+        cls._fields = getattr(cls, "_fields", ()) + fields
+        cls._defaults = defaults
+        cls._make = _build_make(cls._fields, defaults)
+
+        return cls
+
+
+class Data(metaclass=_DataMeta):
+    """Base class of the response records.
+
+    Records behave like read-only mappings of their fields. ``_make`` builds a record from
+    positional or keyword values without checking them and is what the parser uses.
+    """
 
     __annotations__ = []
 
     def __init__(self, **kwargs):
         for key, value in kwargs.items():
-            if key in self.__annotations__:
+            if key in self._fields:
                 setattr(self, key, value)
             else:
                 raise KeyError(key)
 
+        for key, value in self._defaults.items():
+            if key not in kwargs:
+                setattr(self, key, value)
+
     def __iter__(self):
-        for key in self.__annotations__:
+        for key in self._fields:
             yield key, getattr(self, key)
 
     def __getitem__(self, key):
-        if key in self.__annotations__:
+        if key in self._fields:
             return getattr(self, key)
         raise KeyError(key)
 
     def keys(self):
-        return self.__annotations__
+        return self._fields
 
     def values(self):
-        return [getattr(self, key) for key in self.__annotations__]
+        return [getattr(self, key) for key in self._fields]
 
     def items(self):
-        return [(key, getattr(self, key)) for key in self.__annotations__]
+        return [(key, getattr(self, key)) for key in self._fields]
 
     def get(self, key, default=None):
         return getattr(self, key) or default
@@ -252,3 +302,183 @@ class Player(Data):
 
     deaths: Optional[int] = None
     money: Optional[int] = None
+
+
+class PlayerEvent(Data):
+    """Represents a change to a server's player list, as reported by :class:`a2squery.PlayerTracker`.
+
+    Attributes:
+        type:
+            Whether the player joined, left, or had their score, deaths or money change. Duration changes
+            are updates only for a tracker made with ``durations=True``.
+        address: The address of the server the player is on.
+        player: The player's current state. For leave events this is the last state seen.
+
+        previous:
+            The player's previous state.
+
+            .. danger::
+
+                This field is only populated for update events.
+    """
+
+    type: PlayerEventType
+    address: typing.Any
+    player: Player
+
+    previous: Optional[Player] = None
+
+
+class Snapshot(Data):
+    """Represents a server's information, players and rules queried together.
+
+    Attributes:
+        info: The server's :class:`a2squery.SourceInfo` or :class:`a2squery.GoldSourceInfo`.
+        players: List of the server's :class:`a2squery.Player`.
+        rules: Key/value dictionary of the server's rules.
+    """
+
+    info: typing.Union[SourceInfo, GoldSourceInfo]
+    players: typing.List[Player]
+    rules: typing.Dict[str, str]
+
+
+class ScanResult(Data):
+    """Represents the outcome of one request made by :class:`a2squery.FleetScanner`.
+
+    Attributes:
+        address: The ``(host, port)`` target as it was passed to the scanner.
+        request_type: The type of request that was sent to the target.
+        result:
+            The parsed response. This is a :class:`a2squery.SourceInfo` or :class:`a2squery.GoldSourceInfo`
+            for info requests, a list of :class:`a2squery.Player` for player requests and a dictionary for rules requests.
+
+            .. danger::
+
+                This field is only populated when :py:attr:`a2squery.ScanResult.error` is None.
+
+        error: The exception raised while querying the target, if any. Timeouts are reported as :class:`socket.timeout`.
+    """
+
+    address: typing.Tuple[str, int]
+    request_type: RequestType
+
+    result: typing.Any = None
+    error: Optional[Exception] = None
+
+
+class ServerHealth(Data):
+    """Represents what :class:`a2squery.HealthTracker` knows about a server.
+
+    Attributes:
+        address: The server's address.
+        state: Whether the server is up, down, or being probed to find out if it is back.
+        failures: The number of requests that failed in a row.
+        probes: The number of probes that failed since the server went down.
+        last_error: The error of the last failed request, if any.
+        last_success: When the last request succeeded, as a :func:`time.time` timestamp.
+        next_probe: When the next probe is allowed if the server is down, as a :func:`time.time` timestamp.
+    """
+
+    address: typing.Tuple[str, int]
+    state: ServerState
+    failures: int
+    probes: int
+
+    last_error: Optional[Exception] = None
+    last_success: Optional[float] = None
+    next_probe: Optional[float] = None
+
+
+class RequestTrace(Data):
+    """Represents the timings and sizes of one request, as passed to :py:meth:`a2squery.Instrument.record`.
+
+    All durations are in seconds.
+
+    Attributes:
+        address: The server's ``(host, port)``.
+        request_type: The type of request. None for :py:meth:`a2squery.A2SQuery.snapshot`.
+        response_type: The type of the response that was parsed, if one arrived.
+        total: How long the whole request took, including challenges, retransmissions and parsing.
+        send: The time spent sending packets, including waiting for a :class:`a2squery.Pacer`.
+        first_byte: The time from sending the final request to receiving the first packet of its response.
+        challenge_rtt: The round trip time of the challenge exchange, if the server asked for a new challenge.
+        parse: The time spent parsing the response.
+        attempts: The number of request packets sent. More than one means a challenge or a retransmission.
+        challenges: The number of challenges received.
+        bytes_out: The number of bytes sent.
+        bytes_in: The number of bytes received, including the headers of split packets.
+        error: The exception the request raised, if any.
+    """
+
+    address: typing.Tuple[str, int]
+    request_type: Optional[RequestType]
+
+    response_type: Optional[ResponseType] = None
+    total: float = 0
+    send: float = 0
+    first_byte: Optional[float] = None
+    challenge_rtt: Optional[float] = None
+    parse: Optional[float] = None
+    attempts: int = 0
+    challenges: int = 0
+    bytes_out: int = 0
+    bytes_in: int = 0
+    error: Optional[Exception] = None
+
+
+class ParsedRecord(Data):
+    """Represents one response parsed by :func:`a2squery.bulk.parse_records` or :func:`a2squery.bulk.parse_file`.
+
+    Attributes:
+        index: The position of the record in the input, counting from 0. For split responses this is the last fragment's.
+        offset: Where the record's frame starts in the file. None when parsing an iterable.
+        response_type: The response type read from the header, if it could be read.
+        result:
+            The parsed response, as returned by the matching :class:`a2squery.A2SQuery` method.
+            Challenge responses are parsed into the challenge number.
+        error: The exception raised while parsing the record, if any.
+    """
+
+    index: int
+    offset: Optional[int]
+
+    response_type: Optional[ResponseType] = None
+    result: typing.Any = None
+    error: Optional[Exception] = None
+
+
+class WatchEvent(Data):
+    """Represents a change to one response of a server watched by :func:`a2squery.watch`.
+
+    Attributes:
+        address: The ``(host, port)`` target as it was passed to :func:`a2squery.watch`.
+        request_type: The type of request whose response changed.
+        result:
+            The new parsed response, as returned by the matching :class:`a2squery.AsyncA2SQuery` method.
+
+            .. danger::
+
+                This field is only populated when :py:attr:`a2squery.WatchEvent.error` is None.
+
+        previous: The last response seen before this one. None for the first response of a target.
+
+        player_events:
+            What changed between the previous and the new players, see :class:`a2squery.PlayerTracker`.
+
+            .. danger::
+
+                This field is only populated for player requests.
+
+        error:
+            The exception raised by the first failed poll after a successful one. Failures are only reported
+            once, and the next successful poll is always reported.
+    """
+
+    address: typing.Tuple[str, int]
+    request_type: RequestType
+
+    result: typing.Any = None
+    previous: typing.Any = None
+    player_events: Optional[typing.List[PlayerEvent]] = None
+    error: Optional[Exception] = None
@@ -0,0 +1,225 @@
+import struct
+import typing
+
+from .data import SourceInfo, GoldSourceInfo, Player
+from .enums import ResponseType, ResponseFormat
+from .reassembly import SIMPLE_HEADER
+
+__all__ = ("Encoder", "pack_response", "split_response")
+
+
+_BYTE = struct.Struct("<B")
+_SHORT = struct.Struct("<h")
+_LONG = struct.Struct("<l")
+_LONG_LONG = struct.Struct("<Q")
+_FLOAT = struct.Struct("<f")
+_SPLIT = struct.Struct("<lLBBH")
+
+# The largest datagram a Source server sends before it splits a response.
+MAX_PACKET_SIZE = 1400
+
+
+class Encoder:
+    """Writes A2S fields to a buffer.
+
+    This is the inverse of :class:`a2squery.parser.Parser`: every ``encode_*`` method returns the payload
+    that the matching ``parse_*`` method reads back into an equal object. Payloads do not include the
+    response header, see :func:`pack_response`.
+    """
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def getvalue(self) -> bytes:
+        return bytes(self.data)
+
+    def write_byte(self, value: int) -> None:
+        self.data.append(value)
+
+    def write_string(self, value: str) -> None:
+        self.data += value.encode("utf-8")
+        self.data.append(0)
+
+    def write_short(self, value: int) -> None:
+        self.data += _SHORT.pack(value)
+
+    def write_char(self, value: str) -> None:
+        self.data += value.encode("ascii")
+
+    def write_bool(self, value: bool) -> None:
+        self.data.append(1 if value else 0)
+
+    def write_long(self, value: int) -> None:
+        self.data += _LONG.pack(value)
+
+    def write_long_long(self, value: int) -> None:
+        self.data += _LONG_LONG.pack(value)
+
+    def write_float(self, value: float) -> None:
+        self.data += _FLOAT.pack(value)
+
+    @staticmethod
+    def _extra_data_flag(info: SourceInfo) -> int:
+        if info.extra_data_flag is not None:
+            return info.extra_data_flag
+
+        flag = 0
+        if info.port is not None:
+            flag |= 0x80
+        if info.steam_id is not None:
+            flag |= 0x10
+        if info.spectator_port is not None:
+            flag |= 0x40
+        if info.keywords is not None:
+            flag |= 0x20
+        if info.game_id is not None:
+            flag |= 0x01
+        return flag
+
+    @classmethod
+    def encode_source_info(cls, info: SourceInfo) -> bytes:
+        """Encode a :class:`a2squery.SourceInfo`.
+
+        The optional trailing fields are written according to ``extra_data_flag``. When it is None,
+        the flag is built from the optional fields that are set.
+        """
+        encoder = cls()
+        encoder.write_byte(info.protocol)
+        encoder.write_string(info.name)
+        encoder.write_string(info.map)
+        encoder.write_string(info.folder)
+        encoder.write_string(info.game)
+        encoder.write_short(info.app_id)
+        encoder.write_byte(info.players)
+        encoder.write_byte(info.max_players)
+        encoder.write_byte(info.bots)
+        encoder.write_char(info.server_type.value)
+        encoder.write_char(info.environment.value)
+        encoder.write_bool(info.password)
+        encoder.write_bool(info.vac)
+
+        if info.app_id == 2400:
+            encoder.write_byte(info.mode)
+            encoder.write_byte(info.witnesses)
+            encoder.write_byte(info.duration)
+
+        encoder.write_string(info.version)
+
+        extra_data_flag = cls._extra_data_flag(info)
+        encoder.write_byte(extra_data_flag)
+
+        if extra_data_flag & 0x80:
+            encoder.write_short(info.port)
+
+        if extra_data_flag & 0x10:
+            encoder.write_long_long(info.steam_id)
+
+        if extra_data_flag & 0x40:
+            encoder.write_short(info.spectator_port)
+            encoder.write_string(info.spectator_name)
+
+        if extra_data_flag & 0x20:
+            encoder.write_string(info.keywords)
+
+        if extra_data_flag & 0x01:
+            encoder.write_long_long(info.game_id)
+
+        return encoder.getvalue()
+
+    @classmethod
+    def encode_goldsource_info(cls, info: GoldSourceInfo) -> bytes:
+        """Encode a :class:`a2squery.GoldSourceInfo`. The mod fields are only written when ``modded`` is set."""
+        encoder = cls()
+        encoder.write_string(info.address)
+        encoder.write_string(info.name)
+        encoder.write_string(info.map)
+        encoder.write_string(info.folder)
+        encoder.write_string(info.game)
+        encoder.write_byte(info.players)
+        encoder.write_byte(info.max_players)
+        encoder.write_byte(info.protocol)
+        encoder.write_char(info.server_type.value)
+        encoder.write_char(info.environment.value)
+        encoder.write_bool(info.password)
+        encoder.write_bool(info.modded)
+
+        if info.modded:
+            encoder.write_string(info.mod_link)
+            encoder.write_string(info.mod_download_link)
+            encoder.write_long(info.mod_version)
+            encoder.write_long(info.mod_size)
+            encoder.write_bool(info.mod_multiplayer_only)
+            encoder.write_bool(info.mod_uses_custom_dll)
+
+        encoder.write_bool(info.vac)
+        encoder.write_byte(info.bots)
+
+        return encoder.getvalue()
+
+    @classmethod
+    def encode_players(cls, players: typing.Sequence[Player]) -> bytes:
+        """Encode a list of :class:`a2squery.Player`.
+
+        The Ship's deaths and money are appended after the players when the first player has them.
+        """
+        encoder = cls()
+        encoder.write_byte(len(players))
+
+        for player in players:
+            encoder.write_byte(player.index)
+            encoder.write_string(player.name)
+            encoder.write_long(player.score)
+            encoder.write_float(player.duration)
+
+        if players and players[0].deaths is not None:
+            for player in players:
+                encoder.write_long(player.deaths)
+                encoder.write_long(player.money)
+
+        return encoder.getvalue()
+
+    @classmethod
+    def encode_rules(cls, rules: typing.Mapping[str, str]) -> bytes:
+        """Encode a dictionary of rules."""
+        encoder = cls()
+        encoder.write_short(len(rules))
+
+        for name, value in rules.items():
+            encoder.write_string(name)
+            encoder.write_string(value)
+
+        return encoder.getvalue()
+
+
+def pack_response(response_type: ResponseType, payload: bytes) -> bytes:
+    """Prepend the simple response header and the response type to a payload."""
+    return SIMPLE_HEADER + _BYTE.pack(response_type.value) + payload
+
+
+def split_response(packet: bytes, response_id: int, max_size: int = MAX_PACKET_SIZE) -> typing.List[bytes]:
+    """Split a whole response packet the way Source servers do.
+
+    Every fragment carries the Source split header with the packet size field, so ``max_size`` includes
+    the 12 byte header. Packets that fit in ``max_size`` are returned as they are.
+
+    Arguments:
+        packet: A response starting with the simple response header, as returned by :func:`pack_response`.
+        response_id: The id shared by the fragments. The compression bit must not be set.
+        max_size: The largest datagram to produce.
+
+    Returns:
+        The datagrams to send, in order.
+    """
+    if len(packet) <= max_size:
+        return [packet]
+
+    size = max_size - _SPLIT.size
+    chunks = [packet[offset: offset + size] for offset in range(0, len(packet), size)]
+
+    if len(chunks) > 255:
+        raise ValueError("A response of {} bytes does not fit in 255 packets of {} bytes".format(len(packet), max_size))
+
+    return [
+        _SPLIT.pack(ResponseFormat.Batch.value, response_id & 0x7FFFFFFF, len(chunks), number, size) + chunk
+        for number, chunk in enumerate(chunks)
+    ]
@@ -2,7 +2,7 @@ from enum import Enum
 
 __all__ = (
     "RequestType", "ResponseType", "ResponseFormat",
-    "ServerType", "Environment"
+    "ServerType", "Environment", "PlayerEventType", "ServerState", "Region"
 )
 
 
@@ -57,3 +57,30 @@ class Environment(Enum):
         if value.lower() != value:
             return cls(value.lower())
         return cls.Unknown
+
+
+class PlayerEventType(Enum):
+
+    Join = "join"
+    Leave = "leave"
+    Update = "update"
+
+
+class ServerState(Enum):
+
+    Up = "up"
+    Down = "down"
+    Probing = "probing"
+
+
+class Region(Enum):
+
+    USEast = 0x00
+    USWest = 0x01
+    SouthAmerica = 0x02
+    Europe = 0x03
+    Asia = 0x04
+    Australia = 0x05
+    MiddleEast = 0x06
+    Africa = 0x07
+    World = 0xFF
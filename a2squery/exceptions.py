@@ -1,4 +1,4 @@
-__all__ = ("SourceQueryException", "InvalidResponse", "SocketClosed")
+__all__ = ("SourceQueryException", "InvalidResponse", "SocketClosed", "ServerDown")
 
 
 class SourceQueryException(Exception):
@@ -11,3 +11,14 @@ class InvalidResponse(SourceQueryException):
 
 class SocketClosed(SourceQueryException):
     pass
+
+
+class ServerDown(SourceQueryException):
+
+    def __init__(self, address, retry_in: float):
+        super().__init__("{}:{} is down, the next probe is in {:.1f}s".format(address[0], address[1], retry_in))
+        self.address = address
+        self.retry_in = retry_in
+
+    def __reduce__(self):
+        return type(self), (self.address, self.retry_in)
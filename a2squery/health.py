@@ -0,0 +1,111 @@
+import threading
+import time
+import typing
+
+from .data import ServerHealth
+from .enums import ServerState
+from .exceptions import ServerDown
+
+__all__ = ("HealthTracker",)
+
+
+class HealthTracker:
+    """Track which servers are responding and stop querying the ones that are not.
+
+    A server is marked down after ``failure_threshold`` requests in a row time out or get an invalid response.
+    Requests to a down server then fail immediately with :class:`a2squery.exceptions.ServerDown` until its next
+    probe is due. One request is let through as the probe; if it succeeds the server is up again, otherwise the
+    wait before the next probe doubles, up to ``max_backoff``.
+    One tracker can be shared between any number of clients and threads.
+    """
+
+    def __init__(self, failure_threshold: int = 3, backoff: float = 30, max_backoff: float = 600):
+        """Create a new HealthTracker.
+
+        Arguments:
+            failure_threshold: How many requests in a row must fail before a server is marked down.
+            backoff: How long to wait before the first probe of a down server, in seconds.
+            max_backoff: The longest wait between probes, in seconds.
+        """
+        self.failure_threshold = failure_threshold
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._servers = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._servers)
+
+    def _get(self, address: typing.Tuple[str, int]) -> ServerHealth:
+        health = self._servers.get(address)
+
+        if health is None:
+            health = self._servers[address] = ServerHealth._make(address, ServerState.Up, 0, 0)
+
+        return health
+
+    def check(self, address: typing.Tuple[str, int]) -> None:
+        """Make sure a request to a server is allowed.
+
+        Raises:
+            :class:`a2squery.exceptions.ServerDown` if the server is down and its next probe is not due yet.
+        """
+        with self._lock:
+            health = self._servers.get(address)
+
+            if health is None or health.state is ServerState.Up:
+                return
+
+            now = time.time()
+            if now < health.next_probe:
+                raise ServerDown(address, health.next_probe - now)
+
+            health.state = ServerState.Probing
+            health.next_probe = now + self._backoff(health.probes + 1)
+
+    def record_success(self, address: typing.Tuple[str, int]) -> None:
+        """Record that a server replied."""
+        with self._lock:
+            health = self._get(address)
+            health.state = ServerState.Up
+            health.failures = 0
+            health.probes = 0
+            health.last_success = time.time()
+            health.next_probe = None
+
+    def record_failure(self, address: typing.Tuple[str, int], error: Exception = None) -> None:
+        """Record that a request to a server timed out or got an invalid response."""
+        with self._lock:
+            health = self._get(address)
+            health.failures += 1
+            health.last_error = error
+
+            if health.state is ServerState.Probing:
+                health.probes += 1
+            elif health.state is ServerState.Up and health.failures < self.failure_threshold:
+                return
+
+            health.state = ServerState.Down
+            health.next_probe = time.time() + self._backoff(health.probes)
+
+    def state(self, address: typing.Tuple[str, int]) -> ServerState:
+        """Get the state of a server. Servers that were never queried are up."""
+        health = self._servers.get(address)
+        return ServerState.Up if health is None else health.state
+
+    def servers(self) -> typing.List[ServerHealth]:
+        """Get a copy of the health of every server seen so far.
+
+        Returns:
+            List of :class:`a2squery.ServerHealth`
+        """
+        with self._lock:
+            return [ServerHealth._make(*health.values()) for health in self._servers.values()]
+
+    def forget(self, address: typing.Tuple[str, int]) -> None:
+        """Stop tracking a server."""
+        with self._lock:
+            self._servers.pop(address, None)
+
+    def _backoff(self, probes: int) -> float:
+        return min(self.backoff * 2 ** probes, self.max_backoff)
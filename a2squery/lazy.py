@@ -0,0 +1,256 @@
+import typing
+
+from .data import SourceInfo, GoldSourceInfo
+from .enums import ServerType, Environment
+from .parser import Parser, _SHORT, _LONG, _LONG_LONG
+
+__all__ = ("LazySourceInfo", "LazyGoldSourceInfo")
+
+
+def _byte(data: bytes, offset: int) -> int:
+    return data[offset]
+
+
+def _bool(data: bytes, offset: int) -> bool:
+    return bool(data[offset])
+
+
+def _short(data: bytes, offset: int) -> int:
+    return _SHORT.unpack_from(data, offset)[0]
+
+
+def _long(data: bytes, offset: int) -> int:
+    return _LONG.unpack_from(data, offset)[0]
+
+
+def _long_long(data: bytes, offset: int) -> int:
+    return _LONG_LONG.unpack_from(data, offset)[0]
+
+
+def _string(data: bytes, offset: int) -> str:
+    return data[offset: data.index(b"\x00", offset)].decode("utf-8")
+
+
+def _server_type(data: bytes, offset: int) -> ServerType:
+    return ServerType(chr(data[offset]))
+
+
+def _environment(data: bytes, offset: int) -> Environment:
+    return Environment(chr(data[offset]))
+
+
+class _LazyInfo:
+    """Mixin that decodes info fields from the raw payload the first time they are read.
+
+    Info payloads start with a few strings followed by a block of fixed size fields. Creating the
+    record only finds those strings' terminators (``_anchors``), and every field of the head is
+    addressed as an offset from one of them (``_head``). The variable tail of the payload is only
+    scanned the first time one of its fields is read. Decoded values are stored in the record's
+    slots, so later reads are plain attribute lookups.
+    """
+
+    __slots__ = ()
+
+    _head = {}
+    _readers = {}
+    _fixed_size = 0
+
+    @classmethod
+    def from_payload(cls, data: bytes, index: int = 0, end: int = None):
+        """Create a record from an info payload. The payload is copied, so ``data`` may be reused."""
+        self = cls.__new__(cls)
+        self._data = data = bytes(data[index:end])
+        self._tail = None
+
+        anchors = [0]
+        position = cls._string_start
+        for _ in range(cls._strings):
+            anchors.append(position)
+            position = data.index(b"\x00", position) + 1
+        anchors.append(position)
+
+        if position + cls._fixed_size > len(data):
+            raise IndexError("Info response is too short")
+
+        self._anchors = anchors
+        return self
+
+    def _scan_tail(self) -> typing.Dict[str, int]:
+        raise NotImplementedError
+
+    def _mark(self, parser: Parser, offsets: typing.Dict[str, int], *names: str) -> None:
+        for name in names:
+            offsets[name] = parser.index
+
+            if self._readers[name] is _string:
+                parser.skip_string()
+            else:
+                parser.skip(_SIZES[self._readers[name]])
+
+    def __getattr__(self, name: str) -> typing.Any:
+        if name.startswith("_") or name not in self._fields:
+            raise AttributeError(name)
+
+        head = self._head.get(name)
+        if head is not None:
+            offset = self._anchors[head[0]] + head[1]
+        else:
+            if self._tail is None:
+                self._tail = self._scan_tail()
+            offset = self._tail.get(name)
+
+        value = self._defaults.get(name) if offset is None else self._readers[name](self._data, offset)
+
+        setattr(self, name, value)
+        return value
+
+
+_SIZES = {_byte: 1, _bool: 1, _short: 2, _long: 4, _long_long: 8, _server_type: 1, _environment: 1}
+
+
+class LazySourceInfo(_LazyInfo, SourceInfo):
+    """A :class:`a2squery.SourceInfo` whose fields are decoded on first access.
+
+    Payload errors past the fixed size fields, such as invalid UTF-8 or a truncated extra data section,
+    are raised by the first read of an affected field instead of while parsing.
+    """
+
+    __slots__ = ("_data", "_anchors", "_tail")
+
+    _string_start = 1
+    _strings = 4
+    _fixed_size = 9
+
+    _head = {
+        "protocol": (0, 0),
+        "name": (1, 0),
+        "map": (2, 0),
+        "folder": (3, 0),
+        "game": (4, 0),
+        "app_id": (5, 0),
+        "players": (5, 2),
+        "max_players": (5, 3),
+        "bots": (5, 4),
+        "server_type": (5, 5),
+        "environment": (5, 6),
+        "password": (5, 7),
+        "vac": (5, 8),
+    }
+
+    _readers = {
+        "protocol": _byte,
+        "name": _string,
+        "map": _string,
+        "folder": _string,
+        "game": _string,
+        "app_id": _short,
+        "players": _byte,
+        "max_players": _byte,
+        "bots": _byte,
+        "server_type": _server_type,
+        "environment": _environment,
+        "password": _bool,
+        "vac": _bool,
+        "mode": _byte,
+        "witnesses": _byte,
+        "duration": _byte,
+        "version": _string,
+        "extra_data_flag": _byte,
+        "port": _short,
+        "steam_id": _long_long,
+        "spectator_port": _short,
+        "spectator_name": _string,
+        "keywords": _string,
+        "game_id": _long_long,
+    }
+
+    def _scan_tail(self) -> typing.Dict[str, int]:
+        offsets = {}
+        parser = Parser(self._data, self._anchors[5] + self._fixed_size)
+
+        if self.app_id == 2400:
+            self._mark(parser, offsets, "mode", "witnesses", "duration")
+
+        self._mark(parser, offsets, "version", "extra_data_flag")
+        extra_data_flag = self._data[offsets["extra_data_flag"]]
+
+        if extra_data_flag & 0x80:
+            self._mark(parser, offsets, "port")
+
+        if extra_data_flag & 0x10:
+            self._mark(parser, offsets, "steam_id")
+
+        if extra_data_flag & 0x40:
+            self._mark(parser, offsets, "spectator_port", "spectator_name")
+
+        if extra_data_flag & 0x20:
+            self._mark(parser, offsets, "keywords")
+
+        if extra_data_flag & 0x01:
+            self._mark(parser, offsets, "game_id")
+
+        return offsets
+
+
+class LazyGoldSourceInfo(_LazyInfo, GoldSourceInfo):
+    """A :class:`a2squery.GoldSourceInfo` whose fields are decoded on first access.
+
+    Payload errors past the fixed size fields, such as invalid UTF-8 or a truncated mod section,
+    are raised by the first read of an affected field instead of while parsing.
+    """
+
+    __slots__ = ("_data", "_anchors", "_tail")
+
+    _string_start = 0
+    _strings = 5
+    _fixed_size = 7
+
+    _head = {
+        "address": (1, 0),
+        "name": (2, 0),
+        "map": (3, 0),
+        "folder": (4, 0),
+        "game": (5, 0),
+        "players": (6, 0),
+        "max_players": (6, 1),
+        "protocol": (6, 2),
+        "server_type": (6, 3),
+        "environment": (6, 4),
+        "password": (6, 5),
+        "modded": (6, 6),
+    }
+
+    _readers = {
+        "address": _string,
+        "name": _string,
+        "map": _string,
+        "folder": _string,
+        "game": _string,
+        "players": _byte,
+        "max_players": _byte,
+        "protocol": _byte,
+        "server_type": _server_type,
+        "environment": _environment,
+        "password": _bool,
+        "modded": _bool,
+        "vac": _bool,
+        "bots": _byte,
+        "mod_link": _string,
+        "mod_download_link": _string,
+        "mod_version": _long,
+        "mod_size": _long,
+        "mod_multiplayer_only": _bool,
+        "mod_uses_custom_dll": _bool,
+    }
+
+    def _scan_tail(self) -> typing.Dict[str, int]:
+        offsets = {}
+        parser = Parser(self._data, self._anchors[6] + self._fixed_size)
+
+        if self.modded:
+            self._mark(parser, offsets, "mod_link", "mod_download_link", "mod_version", "mod_size")
+            self._mark(parser, offsets, "mod_multiplayer_only", "mod_uses_custom_dll")
+
+        self._mark(parser, offsets, "vac", "bots")
+
+        return offsets
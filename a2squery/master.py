@@ -0,0 +1,291 @@
+import asyncio
+import socket
+import struct
+import time
+import typing
+
+from .enums import Region
+from .exceptions import InvalidResponse, SocketClosed
+
+__all__ = ("MasterServerQuery", "AsyncMasterServerQuery")
+
+MASTER_SERVER = ("hl2master.steampowered.com", 27011)
+
+_REPLY_HEADER = b"\xff\xff\xff\xff\x66\x0a"
+_ADDRESS = struct.Struct(">4sH")
+_FIRST = ("0.0.0.0", 0)
+
+Filter = typing.Union[str, typing.Dict[str, typing.Any]]
+
+
+def _build_filter(filter: Filter) -> str:
+    """Turn ``{"appid": 730, "dedicated": True}`` into ``\\appid\\730\\dedicated\\1``. Strings are used as they are."""
+    if isinstance(filter, str):
+        return filter
+
+    return "".join(
+        "\\{}\\{}".format(key, int(value) if isinstance(value, bool) else value) for key, value in filter.items()
+    )
+
+
+def _pack_request(region: Region, cursor: typing.Tuple[str, int], filter: str) -> bytes:
+    return struct.pack("<BB", 0x31, region.value) + "{}:{}\x00{}\x00".format(cursor[0], cursor[1], filter).encode("utf-8")
+
+
+def _parse_page(data: bytes) -> typing.List[typing.Tuple[str, int]]:
+    if not data.startswith(_REPLY_HEADER):
+        raise InvalidResponse("Master server response has an invalid header")
+
+    end = len(data) - (len(data) - len(_REPLY_HEADER)) % _ADDRESS.size
+    return [
+        (socket.inet_ntoa(host), port) for host, port in _ADDRESS.iter_unpack(memoryview(data)[len(_REPLY_HEADER):end])
+    ]
+
+
+class _Pager:
+    """Tracks the cursor of a server listing and decides which addresses of a page are new."""
+
+    def __init__(self):
+        self.cursor = _FIRST
+        self.done = False
+        self._seeds = set()
+
+    def answers(self, page: typing.List[typing.Tuple[str, int]]) -> bool:
+        """Whether a page can be the reply to the request for the current cursor.
+
+        A page follows its seed, so a page that holds the seed past its first entry, or starts at an earlier
+        seed, is a late reply to an earlier request, for example one that was requested again.
+        """
+        if not page:
+            return True
+        if page[0] != self.cursor and page[0] in self._seeds:
+            return False
+        return self.cursor == _FIRST or self.cursor not in page[1:]
+
+    def feed(self, page: typing.List[typing.Tuple[str, int]]) -> typing.List[typing.Tuple[str, int]]:
+        if page and page[-1] == _FIRST:
+            self.done = True
+            page = page[:-1]
+
+        # The seed address is sometimes repeated as the first entry of the next page.
+        if page and page[0] == self.cursor:
+            page = page[1:]
+
+        if not page:
+            self.done = True
+        else:
+            self._seeds.add(self.cursor)
+            self.cursor = page[-1]
+
+        return page
+
+
+class MasterServerQuery:
+    """List game servers from a Valve master server.
+
+    The master server returns up to a few hundred addresses per reply. Every following page is requested
+    with the last address of the previous one, so addresses are yielded as soon as their page arrives
+    and a scan can start before the listing is complete.
+    """
+
+    def __init__(self, host: str = MASTER_SERVER[0], port: int = MASTER_SERVER[1], timeout: float = 10, retries: int = 2):
+        """Create a new MasterServerQuery instance connected to a master server.
+
+        Arguments:
+            host: The address of the master server. Defaults to Valve's Source master server.
+            port: The port of the master server.
+            timeout: How long to wait for a page before requesting it again.
+            retries: How many times a page is requested again when no reply arrives.
+        """
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.connect((host, port))
+        self._timeout = timeout
+        self._retries = retries
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        """Close the socket. All requests after this will fail."""
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def _reply(self, pager: _Pager, deadline: float) -> typing.List[typing.Tuple[str, int]]:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise socket.timeout("timed out")
+
+            self._socket.settimeout(remaining)
+            page = _parse_page(self._socket.recv(65536))
+
+            if pager.answers(page):
+                return page
+
+    def _exchange(self, data: bytes, pager: _Pager) -> typing.List[typing.Tuple[str, int]]:
+        attempt = 0
+
+        while True:
+            self._socket.send(data)
+
+            try:
+                return self._reply(pager, time.monotonic() + self._timeout)
+            except socket.timeout:
+                if attempt >= self._retries:
+                    raise
+                attempt += 1
+
+    def servers(self, region: Region = Region.World, filter: Filter = "") -> typing.Iterator[typing.Tuple[str, int]]:
+        """List the servers matching a filter.
+
+        Arguments:
+            region: Only list servers in this region.
+            filter:
+                A filter string such as ``\\appid\\730\\empty\\1``, or a dictionary of filter keys and values.
+                Boolean values are sent as 1 and 0. See Valve's master server query protocol for the filter keys.
+
+        Returns:
+            An iterator of ``(host, port)`` tuples.
+        """
+        if self._socket is None:
+            raise SocketClosed("The socket has been closed. No more requests can be made.")
+
+        filter = _build_filter(filter)
+        pager = _Pager()
+
+        while not pager.done:
+            yield from pager.feed(self._exchange(_pack_request(region, pager.cursor, filter), pager))
+
+
+class _MasterProtocol(asyncio.DatagramProtocol):
+
+    def __init__(self):
+        self.transport = None
+        self._waiter = None
+        self._pager = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if self._waiter is None or self._waiter.done():
+            return
+
+        try:
+            page = _parse_page(data)
+        except InvalidResponse as exception:
+            self._waiter.set_exception(exception)
+            return
+
+        if self._pager.answers(page):
+            self._waiter.set_result(page)
+
+    def error_received(self, exc):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_exception(exc)
+
+    async def exchange(self, data: bytes, pager: _Pager, timeout: float) -> typing.List[typing.Tuple[str, int]]:
+        self._pager = pager
+        self._waiter = asyncio.get_event_loop().create_future()
+        self.transport.sendto(data)
+
+        try:
+            return await asyncio.wait_for(self._waiter, timeout)
+        finally:
+            self._waiter = None
+
+
+class AsyncMasterServerQuery:
+    """List game servers from a Valve master server using asyncio.
+
+    This class is the asyncio counterpart of :class:`a2squery.MasterServerQuery`.
+    """
+
+    def __init__(self, host: str = MASTER_SERVER[0], port: int = MASTER_SERVER[1], timeout: float = 10, retries: int = 2):
+        """Create a new AsyncMasterServerQuery instance for a master server.
+
+        Arguments:
+            host: The address of the master server. Defaults to Valve's Source master server.
+            port: The port of the master server.
+            timeout: How long to wait for a page before requesting it again.
+            retries: How many times a page is requested again when no reply arrives.
+        """
+        self._address = (host, port)
+        self._timeout = timeout
+        self._retries = retries
+        self._protocol = None
+        self._lock = None
+        self._closed = False
+
+    async def __aenter__(self):
+        await self._connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    async def _connect(self) -> _MasterProtocol:
+        if self._closed:
+            raise SocketClosed("The socket has been closed. No more requests can be made.")
+
+        # Made on first use, inside the event loop it belongs to, the same way as in AsyncA2SQuery.
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        if self._protocol is None:
+            async with self._lock:
+                if self._closed:
+                    raise SocketClosed("The socket has been closed. No more requests can be made.")
+
+                if self._protocol is None:
+                    transport, protocol = await asyncio.get_event_loop().create_datagram_endpoint(
+                        _MasterProtocol, remote_addr=self._address
+                    )
+
+                    if self._closed:
+                        transport.close()
+                        raise SocketClosed("The socket has been closed. No more requests can be made.")
+
+                    self._protocol = protocol
+
+        return self._protocol
+
+    def close(self) -> None:
+        """Close the endpoint. All requests after this will fail."""
+        if self._protocol is not None:
+            self._protocol.transport.close()
+            self._protocol = None
+        self._closed = True
+
+    async def _exchange(self, data: bytes, pager: _Pager) -> typing.List[typing.Tuple[str, int]]:
+        protocol = await self._connect()
+        attempt = 0
+
+        # The protocol has one waiter, so concurrent listings take turns.
+        async with self._lock:
+            while True:
+                try:
+                    return await protocol.exchange(data, pager, self._timeout)
+                except asyncio.TimeoutError:
+                    if attempt >= self._retries:
+                        raise
+                    attempt += 1
+
+    async def servers(
+            self, region: Region = Region.World, filter: Filter = ""
+    ) -> typing.AsyncIterator[typing.Tuple[str, int]]:
+        """List the servers matching a filter. See :py:meth:`a2squery.MasterServerQuery.servers`.
+
+        Returns:
+            An async iterator of ``(host, port)`` tuples.
+        """
+        filter = _build_filter(filter)
+        pager = _Pager()
+
+        while not pager.done:
+            for address in pager.feed(await self._exchange(_pack_request(region, pager.cursor, filter), pager)):
+                yield address
@@ -0,0 +1,146 @@
+import bisect
+import threading
+import typing
+
+from .data import RequestTrace
+
+__all__ = ("Instrument", "HistogramCollector")
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Metric name, RequestTrace field and help text of every histogram.
+_HISTOGRAMS = (
+    ("request_duration_seconds", "total", "Time taken by whole requests, including challenges, retransmissions and parsing."),
+    ("send_duration_seconds", "send", "Time spent sending request packets, including pacing."),
+    ("first_byte_seconds", "first_byte", "Time from sending the final request to the first packet of its response."),
+    ("challenge_rtt_seconds", "challenge_rtt", "Round trip time of challenge exchanges."),
+    ("parse_duration_seconds", "parse", "Time spent parsing responses."),
+)
+
+# Metric name, RequestTrace field and help text of every counter that sums a field.
+_COUNTERS = (
+    ("request_attempts_total", "attempts", "Request packets sent, including challenge resends and retransmissions."),
+    ("challenges_total", "challenges", "Challenges received."),
+    ("sent_bytes_total", "bytes_out", "Bytes sent."),
+    ("received_bytes_total", "bytes_in", "Bytes received."),
+)
+
+
+class Instrument:
+    """Receives a :class:`a2squery.RequestTrace` for every request made by a client it is passed to.
+
+    Subclass this and override :py:meth:`record` to send the traces elsewhere. ``record`` is called
+    on the thread that made the request, after the result has been parsed, so it should be fast.
+    Clients without an instrument do not time anything.
+    """
+
+    def record(self, trace: RequestTrace) -> None:
+        """Called once per request, whether it succeeded or not. Does nothing unless overridden."""
+
+
+class _Histogram:
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.sum = 0
+        self.count = 0
+
+
+def _label(trace: RequestTrace) -> str:
+    return "snapshot" if trace.request_type is None else trace.request_type.name.lower()
+
+
+class HistogramCollector(Instrument):
+    """An :class:`a2squery.Instrument` that keeps histograms and counters in memory and renders them for Prometheus.
+
+    Every metric is labelled with the request type. Requests are also counted by outcome, which is ``ok``
+    or the name of the exception raised. Thread safe, so one collector can be shared by every client.
+    """
+
+    def __init__(self, buckets: typing.Sequence[float] = DEFAULT_BUCKETS, prefix: str = "a2squery"):
+        """Create a new HistogramCollector.
+
+        Arguments:
+            buckets: The upper bounds of the histogram buckets, in seconds.
+            prefix: Prepended to every metric name.
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+        self._histograms = {name: {} for name, _, _ in _HISTOGRAMS}
+        self._counters = {name: {} for name, _, _ in _COUNTERS}
+        self._outcomes = {}
+        self._lock = threading.Lock()
+
+    def record(self, trace: RequestTrace) -> None:
+        label = _label(trace)
+        outcome = "ok" if trace.error is None else type(trace.error).__name__
+
+        with self._lock:
+            for name, field, _ in _HISTOGRAMS:
+                value = getattr(trace, field)
+                if value is None:
+                    continue
+
+                histograms = self._histograms[name]
+                histogram = histograms.get(label)
+                if histogram is None:
+                    histogram = histograms[label] = _Histogram(len(self.buckets) + 1)
+
+                histogram.counts[bisect.bisect_left(self.buckets, value)] += 1
+                histogram.sum += value
+                histogram.count += 1
+
+            for name, field, _ in _COUNTERS:
+                counters = self._counters[name]
+                counters[label] = counters.get(label, 0) + getattr(trace, field)
+
+            key = (label, outcome)
+            self._outcomes[key] = self._outcomes.get(key, 0) + 1
+
+    def count(self, request_type: str = None, outcome: str = None) -> int:
+        """Get the number of requests recorded.
+
+        Arguments:
+            request_type: Only count this request type, such as ``"info"`` or ``"snapshot"``.
+            outcome: Only count this outcome, such as ``"ok"`` or ``"InvalidResponse"``.
+        """
+        with self._lock:
+            return sum(
+                count for (label, result), count in self._outcomes.items()
+                if request_type in (None, label) and outcome in (None, result)
+            )
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+
+        with self._lock:
+            name = "{}_requests_total".format(self.prefix)
+            lines.append("# HELP {} Requests made, by outcome.".format(name))
+            lines.append("# TYPE {} counter".format(name))
+            for (label, outcome), count in sorted(self._outcomes.items()):
+                lines.append('{}{{request_type="{}",outcome="{}"}} {}'.format(name, label, outcome, count))
+
+            for metric, _, description in _COUNTERS:
+                name = "{}_{}".format(self.prefix, metric)
+                lines.append("# HELP {} {}".format(name, description))
+                lines.append("# TYPE {} counter".format(name))
+                for label, value in sorted(self._counters[metric].items()):
+                    lines.append('{}{{request_type="{}"}} {}'.format(name, label, value))
+
+            for metric, _, description in _HISTOGRAMS:
+                name = "{}_{}".format(self.prefix, metric)
+                lines.append("# HELP {} {}".format(name, description))
+                lines.append("# TYPE {} histogram".format(name))
+
+                for label, histogram in sorted(self._histograms[metric].items()):
+                    cumulative = 0
+                    for bound, count in zip(self.buckets + ("+Inf",), histogram.counts):
+                        cumulative += count
+                        lines.append('{}_bucket{{request_type="{}",le="{}"}} {}'.format(name, label, bound, cumulative))
+                    lines.append('{}_sum{{request_type="{}"}} {}'.format(name, label, histogram.sum))
+                    lines.append('{}_count{{request_type="{}"}} {}'.format(name, label, histogram.count))
+
+        return "\n".join(lines) + "\n"
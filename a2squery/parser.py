@@ -7,14 +7,30 @@ from .enums import ServerType, Environment
 __all__ = ("Parser",)
 
 
+_SHORT = struct.Struct("<h")
+_LONG = struct.Struct("<l")
+_LONG_LONG = struct.Struct("<Q")
+_FLOAT = struct.Struct("<f")
+
+_PLAYER_FIELDS = frozenset(("index", "name", "score", "duration", "deaths", "money"))
+
+
 class Parser:
+    """Reads A2S fields from a buffer.
 
-    def __init__(self, data: bytes):
-        self.index = 0
+    The buffer can be ``bytes`` or a ``bytearray`` that is reused between receives, in which case
+    ``index`` and ``end`` mark the part of it that holds the payload. Fields are unpacked in place
+    with precompiled :class:`struct.Struct` objects, so only the values themselves are allocated.
+    """
+
+    def __init__(self, data: typing.Union[bytes, bytearray], index: int = 0, end: int = None):
+        self.start = index
+        self.index = index
+        self.end = len(data) if end is None else end
         self.data = data
 
     def __enter__(self):
-        self.index = 0
+        self.index = self.start
         return self
 
     def __exit__(self, exc_val, exc_type, exc_tb):
@@ -22,14 +38,26 @@ class Parser:
             return True
         return False
 
-    def read_byte(self) -> int:
-        value = struct.unpack("<B", self.data[self.index: self.index + 1])[0]
-        self.index = self.index + 1
+    def _advance(self, size: int) -> int:
+        index = self.index
+        self.index = index + size
 
-        return value
+        if self.index > self.end:
+            raise struct.error("Response ended {} bytes into a {} byte field".format(self.end - index, size))
+
+        return index
+
+    def skip(self, size: int) -> None:
+        self._advance(size)
+
+    def skip_string(self) -> None:
+        self.index = self.data.index(b"\x00", self.index, self.end) + 1
+
+    def read_byte(self) -> int:
+        return self.data[self._advance(1)]
 
     def read_string(self) -> str:
-        end = self.data.index(b"\x00", self.index)
+        end = self.data.index(b"\x00", self.index, self.end)
 
         value = self.data[self.index: end].decode("utf-8")
         self.index = end + 1
@@ -37,10 +65,7 @@ class Parser:
         return value
 
     def read_short(self) -> int:
-        value = struct.unpack("<h", self.data[self.index: self.index + 2])[0]
-        self.index = self.index + 2
-
-        return value
+        return _SHORT.unpack_from(self.data, self._advance(2))[0]
 
     def read_char(self) -> str:
         return chr(self.read_byte())
@@ -49,26 +74,17 @@ class Parser:
         return bool(self.read_byte())
 
     def read_long(self) -> int:
-        value = struct.unpack("<l", self.data[self.index: self.index + 4])[0]
-        self.index = self.index + 4
-
-        return value
+        return _LONG.unpack_from(self.data, self._advance(4))[0]
 
     def read_long_long(self) -> int:
-        value = struct.unpack("<Q", self.data[self.index: self.index + 8])[0]
-        self.index = self.index + 8
-
-        return value
+        return _LONG_LONG.unpack_from(self.data, self._advance(8))[0]
 
     def read_float(self) -> float:
-        value = struct.unpack("<f", self.data[self.index: self.index + 4])[0]
-        self.index = self.index + 4
-
-        return value
+        return _FLOAT.unpack_from(self.data, self._advance(4))[0]
 
     @classmethod
-    def parse_source_info(cls, data: bytes) -> SourceInfo:
-        with cls(data) as parser:
+    def parse_source_info(cls, data: bytes, index: int = 0, end: int = None) -> SourceInfo:
+        with cls(data, index, end) as parser:
             protocol = parser.read_byte()
             name = parser.read_string()
             info_map = parser.read_string()
@@ -118,7 +134,7 @@ class Parser:
             if extra_data_flag & 0x01:
                 game_id = parser.read_long_long()
 
-            return SourceInfo(
+            return SourceInfo._make(
                 protocol=protocol, name=name, map=info_map,
                 folder=folder, game=game, app_id=app_id,
                 players=players, max_players=max_players, bots=bots,
@@ -130,8 +146,8 @@ class Parser:
             )
 
     @classmethod
-    def parse_goldsource_info(cls, data: bytes) -> GoldSourceInfo:
-        with cls(data) as parser:
+    def parse_goldsource_info(cls, data: bytes, index: int = 0, end: int = None) -> GoldSourceInfo:
+        with cls(data, index, end) as parser:
             address = parser.read_string()
             name = parser.read_string()
             info_map = parser.read_string()
@@ -163,7 +179,7 @@ class Parser:
             vac = parser.read_bool()
             bots = parser.read_byte()
 
-        return GoldSourceInfo(
+        return GoldSourceInfo._make(
             address=address, name=name, map=info_map,
             folder=folder, game=game, players=players,
             max_players=max_players, protocol=protocol, server_type=server_type,
@@ -174,21 +190,33 @@ class Parser:
         )
 
     @classmethod
-    def parse_players(cls, data: bytes) -> typing.List[Player]:
+    def parse_players(
+            cls, data: bytes, index: int = 0, end: int = None, fields: typing.Iterable[str] = None
+    ) -> typing.List[Player]:
+        """Parse a player payload.
+
+        Arguments:
+            fields:
+                Only decode these :class:`a2squery.Player` fields, such as ``("name",)``. The other fields
+                are skipped without being decoded and are None. Every field is decoded when omitted.
+        """
+        if fields is not None:
+            return cls._parse_player_fields(data, index, end, frozenset(fields))
+
         players = []
 
-        with cls(data) as parser:
+        with cls(data, index, end) as parser:
             player_count = parser.read_byte()
 
             while len(players) < player_count:
-                players.append(Player(
-                    index=parser.read_byte(),
-                    name=parser.read_string(),
-                    score=parser.read_long(),
-                    duration=parser.read_float()
+                players.append(Player._make(
+                    parser.read_byte(),
+                    parser.read_string(),
+                    parser.read_long(),
+                    parser.read_float()
                 ))
 
-            if parser.index < len(data):
+            if parser.index < parser.end:
                 for player in players:
                     player.deaths = parser.read_long()
                     player.money = parser.read_long()
@@ -196,9 +224,112 @@ class Parser:
         return players
 
     @classmethod
-    def parse_rules(cls, data: bytes) -> typing.Dict[str, str]:
-        with cls(data) as parser:
+    def _parse_player_fields(cls, data: bytes, index: int, end: typing.Optional[int], fields: frozenset) -> typing.List[Player]:
+        unknown = fields - _PLAYER_FIELDS
+        if unknown:
+            raise ValueError("Unknown player fields: {}".format(", ".join(sorted(unknown))))
+
+        read_index = "index" in fields
+        read_name = "name" in fields
+        read_score = "score" in fields
+        read_duration = "duration" in fields
+        players = []
+
+        # Fields are read at their offsets instead of through the parser, so skipped ones cost nothing.
+        with cls(data, index, end) as parser:
+            player_count = parser.read_byte()
+            offset = parser.index
+            stop = parser.end
+
+            for _ in range(player_count):
+                name_end = data.index(b"\x00", offset + 1, stop)
+                if name_end + 9 > stop:
+                    raise struct.error("Response ended inside player {}".format(len(players)))
+
+                players.append(Player._make(
+                    data[offset] if read_index else None,
+                    data[offset + 1: name_end].decode("utf-8") if read_name else None,
+                    _LONG.unpack_from(data, name_end + 1)[0] if read_score else None,
+                    _FLOAT.unpack_from(data, name_end + 5)[0] if read_duration else None
+                ))
+                offset = name_end + 9
+
+            read_deaths = "deaths" in fields
+            read_money = "money" in fields
+
+            if (read_deaths or read_money) and offset < stop:
+                if offset + 8 * player_count > stop:
+                    raise struct.error("Response ended inside the deaths and money of the players")
+
+                for player in players:
+                    if read_deaths:
+                        player.deaths = _LONG.unpack_from(data, offset)[0]
+                    if read_money:
+                        player.money = _LONG.unpack_from(data, offset + 4)[0]
+                    offset += 8
+
+        return players
+
+    @classmethod
+    def parse_rules(
+            cls, data: bytes, index: int = 0, end: int = None, keys: typing.Iterable[str] = None
+    ) -> typing.Dict[str, str]:
+        """Parse a rules payload.
+
+        Arguments:
+            keys:
+                Only return these rules. Each key is searched for in the raw payload, so other rules are
+                skipped without decoding or copying them. This suits a handful of keys. A key sent more than
+                once gets its last value, as in a full parse, and keys the server does not send are missing.
+                Every rule is returned when omitted.
+        """
+        if keys is not None:
+            return cls._parse_rule_keys(data, index, end, keys)
+
+        with cls(data, index, end) as parser:
             rule_count = parser.read_short()
             rules = dict((parser.read_string(), parser.read_string()) for _ in range(rule_count))
 
         return rules
+
+    @classmethod
+    def _parse_rule_keys(cls, data: bytes, index: int, end: typing.Optional[int], keys: typing.Iterable[str]) -> typing.Dict[str, str]:
+        rules = {}
+
+        with cls(data, index, end) as parser:
+            rule_count = parser.read_short()
+            body = parser.index
+            stop = parser.end
+
+            # Every rule has a name and a value, so fewer terminators than that means the response was cut short.
+            if data.count(b"\x00", body, stop) < rule_count * 2:
+                raise struct.error("Response ended inside the {} rules".format(rule_count))
+
+            for key in keys:
+                encoded = key.encode("utf-8")
+                needle = b"\x00" + encoded + b"\x00"
+                name = body if rule_count and data.startswith(encoded + b"\x00", body, stop) else None
+
+                # A name starts after an even number of terminators, a value after an odd number, so a match
+                # inside a value is skipped. The terminators are counted once, from one match to the next, and
+                # every match is visited because the last one wins, as it does in a full parse.
+                terminators = 0
+                counted = body
+                found = data.find(needle, body, stop)
+
+                while found != -1:
+                    terminators += data.count(b"\x00", counted, found + 1)
+                    counted = found + 1
+
+                    if terminators // 2 >= rule_count:
+                        break
+                    if terminators % 2 == 0:
+                        name = found + 1
+
+                    found = data.find(needle, found + 1, stop)
+
+                if name is not None:
+                    value = name + len(encoded) + 1
+                    rules[key] = data[value: data.index(b"\x00", value, stop)].decode("utf-8")
+
+        return rules
@@ -1,21 +1,117 @@
+import functools
 import socket
 import struct
+import time
 import typing
 
-from .data import SourceInfo, GoldSourceInfo, Player
+from .challenge import ChallengeCache
+from .health import HealthTracker
+from .data import SourceInfo, GoldSourceInfo, Player, Snapshot, RequestTrace
+from .lazy import LazySourceInfo, LazyGoldSourceInfo
 from .exceptions import InvalidResponse, SocketClosed
+from .metrics import Instrument
 from .parser import Parser
+from .ratelimit import Pacer
+from .reassembly import SPLIT_HEADER, SplitPacketAssembler
+from .rtt import RTTEstimator
 from .enums import RequestType, ResponseType, ResponseFormat
 
 __all__ = ("QueryResponse", "A2SQuery")
 
 
 class QueryResponse:
+    """A response whose payload is ``data[index:end]``.
 
-    def __init__(self, response_type: ResponseType, response_format: ResponseFormat, data: bytes):
+    ``data`` may be a receive buffer that is reused, so the response should be parsed before the next receive.
+    """
+
+    def __init__(
+            self, response_type: ResponseType, response_format: ResponseFormat,
+            data: typing.Union[bytes, bytearray], index: int = 0, end: int = None
+    ):
         self.type = response_type
         self.format = response_format
         self.data = data
+        self.index = index
+        self.end = len(data) if end is None else end
+
+    @classmethod
+    def from_bytes(cls, data: typing.Union[bytes, bytearray], end: int = None, start: int = 0) -> "QueryResponse":
+        parser = Parser(data, start, end)
+
+        return cls(
+            response_format=ResponseFormat(parser.read_long()),
+            response_type=ResponseType(parser.read_byte()),
+            data=data, index=parser.index, end=parser.end
+        )
+
+    @property
+    def payload(self) -> bytes:
+        """A copy of the payload that stays valid after the receive buffer is reused."""
+        return bytes(self.data[self.index: self.end])
+
+    def read_challenge(self) -> int:
+        return Parser(self.data, self.index, self.end).read_long()
+
+
+def _pack_request(request_type: RequestType, body: str = None, challenge: int = -1) -> bytes:
+    if body is None:
+        body = ""
+
+    return struct.pack("<lB{}sl".format(len(body)), -1, request_type.value, body.encode(), challenge)
+
+
+def _parse_info(response: QueryResponse, lazy: bool = False) -> typing.Union[SourceInfo, GoldSourceInfo]:
+    if lazy and response.type is ResponseType.InfoSource:
+        return LazySourceInfo.from_payload(response.data, response.index, response.end)
+    if lazy and response.type is ResponseType.InfoGoldSource:
+        return LazyGoldSourceInfo.from_payload(response.data, response.index, response.end)
+    if response.type is ResponseType.InfoSource:
+        return Parser.parse_source_info(response.data, response.index, response.end)
+    if response.type is ResponseType.InfoGoldSource:
+        return Parser.parse_goldsource_info(response.data, response.index, response.end)
+
+    raise InvalidResponse("Invalid server response type (got {}, expected {} or {})".format(response.type, ResponseType.InfoSource, ResponseType.InfoGoldSource))
+
+
+def _parse_player(response: QueryResponse, fields: typing.Iterable[str] = None) -> typing.List[Player]:
+    if response.type is ResponseType.Player:
+        return Parser.parse_players(response.data, response.index, response.end, fields)
+
+    raise InvalidResponse("Invalid server response type (got {}, expected {})".format(response.type, ResponseType.Player))
+
+
+def _parse_rules(response: QueryResponse, keys: typing.Iterable[str] = None) -> typing.Dict[str, str]:
+    if response.type is ResponseType.Rules:
+        return Parser.parse_rules(response.data, response.index, response.end, keys)
+
+    raise InvalidResponse("Invalid server response type (got {}, expected {})".format(response.type, ResponseType.Rules))
+
+
+_REQUEST_BODIES = {
+    RequestType.Info: "Source Engine Query\x00",
+    RequestType.Player: None,
+    RequestType.Rules: None,
+}
+
+_PARSERS = {
+    RequestType.Info: _parse_info,
+    RequestType.Player: _parse_player,
+    RequestType.Rules: _parse_rules,
+}
+
+_RESPONSE_REQUESTS = {
+    ResponseType.InfoSource: RequestType.Info,
+    ResponseType.InfoGoldSource: RequestType.Info,
+    ResponseType.Player: RequestType.Player,
+    ResponseType.Rules: RequestType.Rules,
+}
+
+
+def _answers(response_type: ResponseType, request_type: RequestType) -> bool:
+    # A challenge can answer any request. Anything else must match, since a retransmitted request can be
+    # answered twice and the late reply must not be taken as the answer to the next request.
+    return response_type is ResponseType.Challenge or _RESPONSE_REQUESTS.get(response_type) is request_type
 
 
 class A2SQuery:
@@ -23,20 +119,55 @@ class A2SQuery:
 
     This class allows you to interface with servers that implement the A2S query protocol.
     Each instance of A2SQuery opens a socket and connects to the specified server until closed.
-    A2SQuery will authenticate server challenge requests.
+    A2SQuery will authenticate server challenge requests and reassemble multi-packet responses.
+    Challenges are cached, so repeated requests usually take a single round trip.
+    Lost packets are retransmitted after a timeout derived from the server's measured round trip time.
     """
 
-    def __init__(self, host: str, port: int = 27015, timeout: float = 10):
+    def __init__(
+            self, host: str, port: int = 27015, timeout: float = 10, challenge_cache: ChallengeCache = None,
+            retries: int = 2, rtt: RTTEstimator = None, health: HealthTracker = None, pacer: Pacer = None,
+            instrument: Instrument = None
+    ):
         """Create a new A2SQuery instance connected to the specified server.
 
         Arguments:
             host: The IP address of the server. Do not include a port here.
             port: The query port of the server. This is the same as the connection port for most games.
-            timeout: How long to wait for connection/requests before timing out.
+            timeout: The total time a request may take, including retransmissions, before timing out.
+            challenge_cache:
+                Where to remember the server's challenges between requests.
+                Pass the same cache to several clients to share it. Each instance gets its own cache when omitted.
+            retries: How many times a request is retransmitted when no reply arrives.
+            rtt:
+                The server's round trip time estimate, used to decide when to retransmit.
+                Pass the same estimator to later instances for the same server to keep it. Each instance gets its own when omitted.
+            health:
+                Records timeouts and invalid responses so that requests to a server that is down fail fast
+                with :class:`a2squery.exceptions.ServerDown`. Requests are not tracked when omitted.
+            pacer:
+                Delays sends to stay within its rate limits. Share one pacer between every client of a
+                process to pace all of them together. Requests are sent right away when omitted.
+            instrument:
+                Receives a :class:`a2squery.RequestTrace` with the timings and sizes of every request,
+                such as a :class:`a2squery.HistogramCollector`. Nothing is timed when omitted.
         """
         self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self._socket.connect((host, port))
         self._socket.settimeout(timeout)
+        self._timeout = timeout
+        self._retries = retries
+        self._rtt = RTTEstimator() if rtt is None else rtt
+        self._health = health
+        self._pacer = pacer
+        self._instrument = instrument
+        self._trace = None
+        self._first_byte = None
+        self._address = self._socket.getpeername()
+        self._buffer = bytearray(65536)
+        self._view = memoryview(self._buffer)
+        self._assembler = SplitPacketAssembler(timeout)
+        self._challenges = ChallengeCache() if challenge_cache is None else challenge_cache
 
     def __enter__(self):
         return self
@@ -51,62 +182,188 @@ class A2SQuery:
         self._socket.close()
         self._socket = None
 
-    def _request(self, request_type: RequestType, body: str = None, challenge: int = -1) -> QueryResponse:
+    def _receive(self) -> QueryResponse:
+        trace = self._trace
+        first = True
+
+        while True:
+            size = self._socket.recv_into(self._buffer)
+
+            if trace is not None:
+                trace.bytes_in += size
+                if first:
+                    self._first_byte = time.monotonic()
+                    first = False
+
+            if not self._buffer.startswith(SPLIT_HEADER, 0, size):
+                return QueryResponse.from_bytes(self._buffer, size)
+
+            data = self._assembler.feed(bytes(self._view[:size]))
+            if data is not None:
+                return QueryResponse.from_bytes(data)
+
+    def _send(self, data: bytes) -> None:
+        trace = self._trace
+
+        if trace is not None:
+            trace.attempts += 1
+            trace.bytes_out += len(data)
+            started = time.monotonic()
+
+        if self._pacer is not None:
+            self._pacer.wait(self._address)
+
+        try:
+            self._socket.send(data)
+        except OSError:
+            if self._pacer is not None:
+                self._pacer.record_drop()
+            raise
+        finally:
+            if trace is not None:
+                trace.send += time.monotonic() - started
+
+    def _reply(self, request_type: RequestType, expires: float) -> QueryResponse:
+        while True:
+            remaining = expires - time.monotonic()
+            if remaining <= 0:
+                raise socket.timeout("timed out")
+
+            self._socket.settimeout(remaining)
+            response = self._receive()
+
+            if _answers(response.type, request_type):
+                return response
+
+    def _exchange(self, request_type: RequestType, data: bytes, deadline: float) -> QueryResponse:
+        attempt = 0
+
+        while True:
+            if deadline <= time.monotonic():
+                raise socket.timeout("timed out")
+
+            self._send(data)
+            sent = time.monotonic()
+
+            try:
+                response = self._reply(request_type, min(sent + self._rtt.timeout(attempt), deadline))
+            except socket.timeout:
+                if attempt >= self._retries:
+                    raise
+                attempt += 1
+                continue
+
+            if attempt == 0:
+                self._rtt.sample(time.monotonic() - sent)
+
+            trace = self._trace
+            if trace is not None:
+                if response.type is ResponseType.Challenge:
+                    trace.challenges += 1
+                    trace.challenge_rtt = self._first_byte - sent
+                else:
+                    trace.first_byte = self._first_byte - sent
+
+            return response
+
+    def _traced(self, request_type: typing.Optional[RequestType], request: typing.Callable, parse, *args) -> typing.Any:
+        trace = self._trace = RequestTrace._make(self._address, request_type)
+        started = time.monotonic()
+
+        try:
+            result = request(*args)
+
+            if parse is not None:
+                trace.response_type = result.type
+                parsing = time.monotonic()
+                result = parse(result)
+                trace.parse = time.monotonic() - parsing
+
+            return result
+        except Exception as exception:
+            trace.error = exception
+            raise
+        finally:
+            trace.total = time.monotonic() - started
+            self._trace = None
+            self._instrument.record(trace)
+
+    def _fetch(self, request_type: RequestType, parse: typing.Callable[[QueryResponse], typing.Any], body: str = None) -> typing.Any:
+        if self._instrument is None:
+            return parse(self._request(request_type, body))
+
+        return self._traced(request_type, self._request, parse, request_type, body)
+
+    def _guarded(self, query: typing.Callable, *args) -> typing.Any:
         if self._socket is None:
             raise SocketClosed("The socket has been closed. No more requests can be made.")
 
-        if body is None:
-            body = ""
+        if self._health is None:
+            return query(*args)
 
-        self._socket.send(struct.pack("<lB{}sl".format(len(body)), -1, request_type.value, body.encode(), challenge))
+        self._health.check(self._address)
 
-        response_data = self._socket.recv(65536)
+        try:
+            result = query(*args)
+        except (socket.timeout, InvalidResponse) as exception:
+            self._health.record_failure(self._address, exception)
+            raise
 
-        parser = Parser(response_data)
+        self._health.record_success(self._address)
+        return result
 
-        response = QueryResponse(
-            response_format=ResponseFormat(parser.read_long()),
-            response_type=ResponseType(parser.read_byte()),
-            data=response_data[parser.index:]
-        )
+    def _request(self, request_type: RequestType, body: str = None) -> QueryResponse:
+        return self._guarded(self._query, request_type, body)
 
-        if response.type is ResponseType.Challenge:
-            if challenge != -1:
-                raise InvalidResponse("Server requested too many challenges")
+    def _query(self, request_type: RequestType, body: str = None) -> QueryResponse:
+        challenge = self._challenges.get(self._address, request_type)
+        refreshed = False
+        deadline = time.monotonic() + self._timeout
+
+        while True:
+            response = self._exchange(request_type, _pack_request(request_type, body, challenge), deadline)
 
-            return self._request(request_type, body, challenge=struct.unpack("<l", response.data)[0])
+            if response.type is not ResponseType.Challenge:
+                return response
+
+            if refreshed:
+                raise InvalidResponse("Server requested too many challenges")
 
-        return response
+            challenge = response.read_challenge()
+            self._challenges.set(self._address, request_type, challenge)
+            refreshed = True
 
-    def info(self) -> typing.Union[SourceInfo, GoldSourceInfo]:
+    def info(self, lazy: bool = False) -> typing.Union[SourceInfo, GoldSourceInfo]:
         """Query general information about the server.
 
+        Arguments:
+            lazy:
+                Decode each field the first time it is read instead of all of them up front.
+                This is faster when only a few fields are used, such as ``players`` and ``map``.
+
         Returns:
             :class:`a2squery.SourceInfo` or :class:`a2squery.GoldSourceInfo` depending on server's engine/response.
         """
-        response = self._request(RequestType.Info, "Source Engine Query\x00")
-
-        if response.type is ResponseType.InfoSource:
-            return Parser.parse_source_info(response.data)
-        if response.type is ResponseType.InfoGoldSource:
-            return Parser.parse_goldsource_info(response.data)
-
-        raise InvalidResponse("Invalid server response type (got {}, expected {} or {})".format(response.type, ResponseType.InfoSource, ResponseType.InfoGoldSource))
+        parse = functools.partial(_parse_info, lazy=True) if lazy else _parse_info
+        return self._fetch(RequestType.Info, parse, _REQUEST_BODIES[RequestType.Info])
 
-    def player(self) -> typing.List[Player]:
+    def player(self, fields: typing.Iterable[str] = None) -> typing.List[Player]:
         """Query the server's current players/bots.
 
+        Arguments:
+            fields:
+                Only decode these :class:`a2squery.Player` fields, such as ``("name", "score")``.
+                The other fields are skipped while parsing and left as None.
+
         Returns:
             List of Player objects
         """
-        response = self._request(RequestType.Player)
+        if fields is None:
+            return self._fetch(RequestType.Player, _parse_player)
 
-        if response.type is ResponseType.Player:
-            return Parser.parse_players(response.data)
+        return self._fetch(RequestType.Player, functools.partial(_parse_player, fields=tuple(fields)))
 
-        raise InvalidResponse("Invalid server response type (got {}, expected {})".format(response.type, ResponseType.Player))
-
-    def players(self) -> typing.List[Player]:
+    def players(self, fields: typing.Iterable[str] = None) -> typing.List[Player]:
         """Query the server's current players/bots.
 
         This is an alias of A2SQuery.player().
@@ -114,20 +371,82 @@ class A2SQuery:
         Returns:
             List of Player objects
         """
-        return self.player()
+        return self.player(fields)
 
-    def rules(self) -> typing.Dict[str, str]:
+    def rules(self, keys: typing.Iterable[str] = None) -> typing.Dict[str, str]:
         """Query the server's rules/configuration variables in key/value pairs.
 
         The Console variables included are the ones marked with FCVAR_NOTIFY
         as well as any additional ones listed in the server configuration.
 
+        Arguments:
+            keys:
+                Only return these rules, such as ``("sv_tags", "mp_timelimit")``. Other rules are skipped
+                without being decoded. A key sent more than once gets its last value, as in a full parse,
+                and keys the server does not send are missing from the result.
+
         Returns:
             Key/value dictionary of rules
         """
-        response = self._request(RequestType.Rules)
+        if keys is None:
+            return self._fetch(RequestType.Rules, _parse_rules)
+
+        return self._fetch(RequestType.Rules, functools.partial(_parse_rules, keys=tuple(keys)))
+
+    def snapshot(self) -> Snapshot:
+        """Query the server's information, players and rules at the same time.
+
+        All three requests are sent at once and the replies are matched up by their response type.
+        Servers hand out one challenge per client, so a challenge received for one request is used
+        to resend every request that was not already sent with it.
+        This usually takes one or two round trips instead of the six needed by calling
+        :py:meth:`a2squery.A2SQuery.info`, :py:meth:`a2squery.A2SQuery.player` and
+        :py:meth:`a2squery.A2SQuery.rules` one after another.
+
+        Returns:
+            :class:`a2squery.Snapshot`
+        """
+        if self._instrument is None:
+            return self._guarded(self._snapshot)
+
+        return self._traced(None, self._guarded, None, self._snapshot)
+
+    def _snapshot(self) -> Snapshot:
+        self._socket.settimeout(self._timeout)
+
+        challenges = {request_type: self._challenges.get(self._address, request_type) for request_type in _PARSERS}
+        refreshes = dict.fromkeys(_PARSERS, 0)
+        results = {}
+
+        for request_type, challenge in challenges.items():
+            self._send(_pack_request(request_type, _REQUEST_BODIES[request_type], challenge))
 
-        if response.type is ResponseType.Rules:
-            return Parser.parse_rules(response.data)
+        while len(results) < len(_PARSERS):
+            response = self._receive()
 
-        raise InvalidResponse("Invalid server response type (got {}, expected {})".format(response.type, ResponseType.Rules))
+            if response.type is ResponseType.Challenge:
+                challenge = response.read_challenge()
+
+                for request_type in _PARSERS:
+                    if request_type in results or challenges[request_type] == challenge:
+                        continue
+
+                    if refreshes[request_type] == 2:
+                        raise InvalidResponse("Server requested too many challenges")
+
+                    challenges[request_type] = challenge
+                    refreshes[request_type] += 1
+                    self._challenges.set(self._address, request_type, challenge)
+                    self._send(_pack_request(request_type, _REQUEST_BODIES[request_type], challenge))
+
+                continue
+
+            request_type = _RESPONSE_REQUESTS[response.type]
+            if request_type not in results:
+                results[request_type] = _PARSERS[request_type](response)
+
+        return Snapshot(
+            info=results[RequestType.Info],
+            players=results[RequestType.Player],
+            rules=results[RequestType.Rules]
+        )
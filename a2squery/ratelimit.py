@@ -0,0 +1,204 @@
+import heapq
+import socket
+import threading
+import time
+import typing
+
+__all__ = ("TokenBucket", "Pacer")
+
+
+class TokenBucket:
+    """A token bucket that refills at ``rate`` tokens per second and holds at most ``burst`` tokens.
+
+    :py:meth:`reserve` takes a token even when the bucket is empty, leaving it in debt. The debt is paid back by
+    the refill, so callers can schedule a send for :py:meth:`available_at` instead of polling the bucket.
+    """
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float = 1):
+        """Create a new TokenBucket. It starts full.
+
+        Arguments:
+            rate: How many tokens are added per second.
+            burst: The most tokens the bucket can hold.
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.tokens + (now - self.updated) * self.rate, self.burst)
+            self.updated = now
+
+    def available_at(self, now: float) -> float:
+        """Get the ``time.monotonic()`` time at which a token taken at ``now`` may be used."""
+        self._refill(now)
+
+        if self.tokens >= 1:
+            return now
+        return now + (1 - self.tokens) / self.rate
+
+    def reserve(self, now: float) -> None:
+        """Take a token at ``now``, going into debt if the bucket is empty."""
+        self._refill(now)
+        self.tokens -= 1
+
+    def consume(self, now: float = None) -> bool:
+        """Take a token if one is available right now.
+
+        Returns:
+            Whether a token was taken.
+        """
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+
+        if self.tokens < 1:
+            return False
+
+        self.tokens -= 1
+        return True
+
+
+def _subnet(host: str, prefix: int) -> typing.Any:
+    try:
+        return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, host), "big") >> (32 - prefix)
+    except OSError:
+        pass
+
+    try:
+        return 6, int.from_bytes(socket.inet_pton(socket.AF_INET6, host), "big") >> 64
+    except OSError:
+        return host
+
+
+class Pacer:
+    """Spread outgoing requests over time so they are not dropped by the kernel, NATs or the servers' own rate limits.
+
+    Every request needs a token from a global bucket and from the bucket of its destination's subnet.
+    When either bucket is empty the request is scheduled for the earliest time both have a token, so
+    a busy subnet never holds up requests to other subnets. One pacer can be shared between any number
+    of clients and threads.
+
+    Attributes:
+        requests: The number of requests paced.
+        delayed: The number of requests that had to wait for a token.
+        drops: The number of requests the socket refused to send, for example because its buffer was full.
+        max_queue_depth: The highest :py:attr:`queue_depth` seen so far.
+    """
+
+    def __init__(
+            self, rate: float = 1000, burst: int = 100, subnet_rate: float = 100, subnet_burst: int = 20,
+            prefix: int = 24
+    ):
+        """Create a new Pacer.
+
+        Arguments:
+            rate: The most requests sent per second in total.
+            burst: How many requests may be sent back to back before ``rate`` applies.
+            subnet_rate: The most requests sent per second to a single subnet.
+            subnet_burst: How many requests may be sent back to back to a single subnet.
+            prefix: The prefix length that groups IPv4 addresses into subnets. IPv6 addresses always use /64.
+        """
+        self.subnet_rate = subnet_rate
+        self.subnet_burst = subnet_burst
+        self.prefix = prefix
+
+        self.requests = 0
+        self.delayed = 0
+        self.drops = 0
+        self.max_queue_depth = 0
+
+        self._bucket = TokenBucket(rate, burst)
+        self._subnets = {}
+        self._queue = []
+        self._lock = threading.Lock()
+
+    @property
+    def queue_depth(self) -> int:
+        """The number of requests waiting for their send time."""
+        with self._lock:
+            self._expire(time.monotonic())
+            return len(self._queue)
+
+    def _expire(self, now: float) -> None:
+        while self._queue and self._queue[0] <= now:
+            heapq.heappop(self._queue)
+
+    def stats(self) -> typing.Dict[str, int]:
+        """Get the pacer counters.
+
+        Returns:
+            Dictionary of the counters, the queue depth and the number of subnets seen.
+        """
+        return {
+            "requests": self.requests, "delayed": self.delayed, "drops": self.drops,
+            "queue_depth": self.queue_depth, "max_queue_depth": self.max_queue_depth, "subnets": len(self._subnets)
+        }
+
+    def reserve(self, address: typing.Tuple[str, int]) -> float:
+        """Reserve the next send slot to a server.
+
+        Arguments:
+            address: The server's ``(host, port)``. The host should be an IP address.
+
+        Returns:
+            How many seconds to wait before sending. 0 when the request may be sent right away.
+        """
+        key = _subnet(address[0], self.prefix)
+
+        with self._lock:
+            subnet = self._subnets.get(key)
+
+            if subnet is None:
+                subnet = self._subnets[key] = TokenBucket(self.subnet_rate, self.subnet_burst)
+
+            now = time.monotonic()
+
+            # The global token is taken at the time the subnet lets the request go, not now. Otherwise a
+            # backlog to one subnet would run the global bucket into debt and delay every other subnet.
+            ready = subnet.available_at(now)
+            subnet.reserve(now)
+            at = self._bucket.available_at(ready)
+            self._bucket.reserve(ready)
+            self.requests += 1
+
+            if at <= now:
+                return 0
+
+            self.delayed += 1
+            self._expire(now)
+            heapq.heappush(self._queue, at)
+            if len(self._queue) > self.max_queue_depth:
+                self.max_queue_depth = len(self._queue)
+
+            return at - now
+
+    def wait(self, address: typing.Tuple[str, int]) -> None:
+        """Reserve the next send slot to a server and sleep until it is due."""
+        delay = self.reserve(address)
+
+        if delay:
+            time.sleep(delay)
+
+    def record_drop(self) -> None:
+        """Record that the socket refused to send a request."""
+        with self._lock:
+            self.drops += 1
+
+    def forget_idle(self) -> None:
+        """Drop the buckets of subnets that are full again, to bound memory when scanning many subnets."""
+        with self._lock:
+            now = time.monotonic()
+
+            for key, subnet in list(self._subnets.items()):
+                subnet._refill(now)
+                if subnet.tokens >= subnet.burst:
+                    del self._subnets[key]
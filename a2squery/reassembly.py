@@ -0,0 +1,194 @@
+import bz2
+import collections
+import struct
+import time
+import typing
+import zlib
+
+from .enums import ResponseFormat
+from .exceptions import InvalidResponse
+
+__all__ = ("SplitPacketAssembler",)
+
+SPLIT_HEADER = struct.pack("<l", ResponseFormat.Batch.value)
+SIMPLE_HEADER = struct.pack("<l", ResponseFormat.Simple.value)
+
+
+class _Layout:
+    """Describes where the packet fields live in one flavour of split packet header."""
+
+    def __init__(self, payload_offset: int, goldsource: bool = False):
+        self.payload_offset = payload_offset
+        self.goldsource = goldsource
+
+    def numbering(self, data: bytes) -> typing.Tuple[int, int]:
+        if self.goldsource:
+            return data[8] >> 4, data[8] & 0x0F
+        return data[9], data[8]
+
+
+# Source with the packet size field, Source engines that omit it, and GoldSource.
+_LAYOUTS = (_Layout(12), _Layout(10), _Layout(9, goldsource=True))
+_COMPRESSED_LAYOUT = _LAYOUTS[0]
+
+
+class _Buffer:
+
+    __slots__ = ("created", "fragments", "layout")
+
+    def __init__(self, created: float):
+        self.created = created
+        self.fragments = []
+        self.layout = None
+
+
+class SplitPacketAssembler:
+    """Reassemble multi-packet (split) responses.
+
+    The header of a split packet differs between GoldSource, Source and some older Source games,
+    and the flavour can only be told apart once the first packet of a response has arrived.
+    Fragments are therefore kept as they were received until packet 0 is seen, and are decoded after.
+    Duplicated fragments are ignored and fragments may arrive in any order.
+    A different first fragment with an id that is already held starts the response over, since the id was
+    reused, and fragments that disagree with the first one about the number of fragments are rejected.
+    Incomplete responses are dropped once they are older than ``timeout`` seconds.
+    """
+
+    def __init__(self, timeout: float = 5):
+        """Create a new SplitPacketAssembler.
+
+        Arguments:
+            timeout: How long to keep an incomplete response before dropping it.
+        """
+        self.timeout = timeout
+        # Responses in the order they started, which is also the order they expire in.
+        self._buffers = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._buffers)
+
+    def evict(self, now: float = None) -> int:
+        """Drop incomplete responses that are older than the timeout.
+
+        Only the expired responses are visited, so this is cheap enough to run on every fragment.
+
+        Returns:
+            The number of responses dropped.
+        """
+        if now is None:
+            now = time.monotonic()
+
+        buffers = self._buffers
+        dropped = 0
+
+        while buffers and now - buffers[next(iter(buffers))].created > self.timeout:
+            buffers.popitem(last=False)
+            dropped += 1
+
+        return dropped
+
+    def feed(self, data: bytes, address: typing.Any = None, now: float = None) -> typing.Optional[bytes]:
+        """Add a split packet to its response.
+
+        Arguments:
+            data: The raw datagram, starting with the split packet header.
+            address: The address the datagram was received from. Responses from different addresses never mix.
+            now:
+                The current time, in the same unit as the timeout. Defaults to ``time.monotonic()``, but any
+                increasing count works, such as the index of the datagram in a capture.
+
+        Returns:
+            The reassembled (and decompressed) response, starting with the simple response header,
+            once every fragment has arrived. None otherwise.
+        """
+        if len(data) < 10 or not data.startswith(SPLIT_HEADER):
+            raise InvalidResponse("Not a split packet")
+
+        if now is None:
+            now = time.monotonic()
+        self.evict(now)
+
+        data = bytes(data)
+        packet_id = struct.unpack_from("<l", data, 4)[0]
+        key = (address, packet_id)
+        first = self._detect_layout(data, packet_id)
+
+        buffer = self._buffers.get(key)
+        if buffer is not None and first is not None and buffer.layout is not None and data not in buffer.fragments:
+            del self._buffers[key]
+            buffer = None
+
+        if buffer is None:
+            buffer = self._buffers[key] = _Buffer(now)
+
+        buffer.fragments.append(data)
+
+        if buffer.layout is None:
+            buffer.layout = first
+            if buffer.layout is None:
+                return None
+
+        numbered = [(buffer.layout.numbering(fragment), fragment) for fragment in buffer.fragments]
+        total = next(total for (number, total), _ in numbered if number == 0)
+        payloads = {}
+        compressed = packet_id & 0x80000000
+
+        for (number, fragment_total), fragment in numbered:
+            if fragment_total != total:
+                continue
+            if number >= total:
+                del self._buffers[key]
+                raise InvalidResponse("Split packet number {} is out of range (total {})".format(number, total))
+            payloads[number] = fragment
+
+        if numbered[-1][0][1] != total:
+            buffer.fragments = list(payloads.values())
+            raise InvalidResponse(
+                "Split packet total {} does not match the {} of its response".format(numbered[-1][0][1], total)
+            )
+
+        if len(payloads) < total:
+            buffer.fragments = list(payloads.values())
+            return None
+
+        del self._buffers[key]
+
+        if compressed:
+            return self._decompress(payloads)
+
+        return b"".join(payloads[number][buffer.layout.payload_offset:] for number in range(total))
+
+    @staticmethod
+    def _detect_layout(data: bytes, packet_id: int) -> typing.Optional[_Layout]:
+        if packet_id & 0x80000000:
+            if data[9] == 0:
+                return _COMPRESSED_LAYOUT
+            return None
+
+        for layout in _LAYOUTS:
+            if layout.numbering(data)[0] == 0 and data[layout.payload_offset: layout.payload_offset + 4] == SIMPLE_HEADER:
+                return layout
+
+        return None
+
+    @staticmethod
+    def _decompress(payloads: typing.Dict[int, bytes]) -> bytes:
+        if len(payloads[0]) < 20:
+            raise InvalidResponse("Compressed split response is too short for its size and CRC")
+
+        size, checksum = struct.unpack_from("<lL", payloads[0], 12)
+        compressed = payloads[0][20:] + b"".join(payloads[number][12:] for number in range(1, len(payloads)))
+
+        if size < 0:
+            raise InvalidResponse("Split response declares a negative size")
+
+        # Never inflate more than the declared size, so a small response cannot expand into gigabytes.
+        try:
+            data = bz2.BZ2Decompressor().decompress(compressed, max_length=size + 1)
+        except (OSError, ValueError, EOFError) as exception:
+            raise InvalidResponse("Could not decompress split response: {}".format(exception))
+
+        if len(data) != size or zlib.crc32(data) & 0xFFFFFFFF != checksum:
+            raise InvalidResponse("Split response failed its size/CRC check")
+
+        return data
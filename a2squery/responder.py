@@ -0,0 +1,201 @@
+import os
+import socket
+import struct
+import threading
+import time
+import typing
+
+from .data import SourceInfo, GoldSourceInfo, Player
+from .encoder import Encoder, MAX_PACKET_SIZE, pack_response, split_response
+from .enums import RequestType, ResponseType
+from .reassembly import SIMPLE_HEADER
+
+__all__ = ("A2SResponder",)
+
+_CHALLENGE = struct.Struct("<L")
+_INFO_BODY = b"Source Engine Query\x00"
+
+# The size of every valid request, header and challenge included.
+_REQUEST_SIZES = {
+    RequestType.Info.value: 5 + len(_INFO_BODY) + 4,
+    RequestType.Player.value: 9,
+    RequestType.Rules.value: 9,
+}
+
+# The challenge clients send when they have none. It is never handed out.
+_NO_CHALLENGE = 0xFFFFFFFF
+
+
+class A2SResponder:
+    """Answer A2S queries on a UDP socket like a game server would.
+
+    Responses are encoded with :class:`a2squery.encoder.Encoder` once, when the responder is created and
+    whenever :py:meth:`update` is called, and split into datagrams up front, so answering a query only
+    costs a receive, a lookup and a send. This is enough for tens of thousands of queries per second on
+    loopback from a single thread.
+
+    Challenges are derived from the client's address and a secret that is replaced every
+    ``challenge_lifetime`` seconds, so no state is kept per client. A challenge stays valid for at least
+    one lifetime and at most two. Requests that are malformed are ignored, as game servers do.
+    """
+
+    def __init__(
+            self, info: typing.Union[SourceInfo, GoldSourceInfo], players: typing.Sequence[Player] = (),
+            rules: typing.Mapping[str, str] = None, host: str = "127.0.0.1", port: int = 0,
+            challenge: bool = True, challenge_lifetime: float = 30, max_packet_size: int = MAX_PACKET_SIZE
+    ):
+        """Create a new A2SResponder and bind its socket. Call :py:meth:`start` or :py:meth:`serve_forever` to answer queries.
+
+        Arguments:
+            info: The info response.
+            players: The players response.
+            rules: The rules response. Defaults to no rules.
+            host: The address to bind to.
+            port: The port to bind to. A free port is picked when 0, see :py:attr:`address`.
+            challenge: Require a challenge on every request type, as current Source servers do.
+            challenge_lifetime: How often the challenge secret is replaced, in seconds.
+            max_packet_size: Responses larger than this are sent as split packets.
+        """
+        self.challenge = challenge
+        self.challenge_lifetime = challenge_lifetime
+        self.max_packet_size = max_packet_size
+
+        self.requests = 0
+        self.challenges = 0
+        self.ignored = 0
+
+        self._packets = {}
+        self._responses = {
+            RequestType.Info: info,
+            RequestType.Player: list(players),
+            RequestType.Rules: dict(rules or {}),
+        }
+        self.update()
+
+        self._secrets = (os.urandom(16), os.urandom(16))
+        self._rotate_at = time.monotonic() + challenge_lifetime
+        self._closed = False
+        self._thread = None
+
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        self._socket.settimeout(0.1)
+        self._socket.bind((host, port))
+
+        self.address = self._socket.getsockname()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def update(
+            self, info: typing.Union[SourceInfo, GoldSourceInfo] = None, players: typing.Sequence[Player] = None,
+            rules: typing.Mapping[str, str] = None
+    ) -> None:
+        """Replace some of the responses and encode them again. Responses that are not passed are kept.
+
+        Safe to call while the responder is serving; a query is answered entirely from the old or the new responses.
+        """
+        if info is not None:
+            self._responses[RequestType.Info] = info
+        if players is not None:
+            self._responses[RequestType.Player] = list(players)
+        if rules is not None:
+            self._responses[RequestType.Rules] = dict(rules)
+
+        info = self._responses[RequestType.Info]
+        if isinstance(info, GoldSourceInfo):
+            info_packet = pack_response(ResponseType.InfoGoldSource, Encoder.encode_goldsource_info(info))
+        else:
+            info_packet = pack_response(ResponseType.InfoSource, Encoder.encode_source_info(info))
+
+        packets = {
+            RequestType.Info: info_packet,
+            RequestType.Player: pack_response(ResponseType.Player, Encoder.encode_players(self._responses[RequestType.Player])),
+            RequestType.Rules: pack_response(ResponseType.Rules, Encoder.encode_rules(self._responses[RequestType.Rules])),
+        }
+
+        # Each update gets new split ids so fragments of old and new responses are never mixed up.
+        response_id = (int(time.monotonic() * 1000) & 0xFFFFFF) << 4
+        self._packets = {
+            request_type.value: tuple(split_response(packet, response_id + index, self.max_packet_size))
+            for index, (request_type, packet) in enumerate(packets.items())
+        }
+
+    def _challenge(self, secret: bytes, client: typing.Tuple[str, int]) -> bytes:
+        value = hash((secret, client)) & 0xFFFFFFFF
+        if value == _NO_CHALLENGE:
+            value = 0
+        return _CHALLENGE.pack(value)
+
+    def _rotate(self, now: float) -> None:
+        self._secrets = (os.urandom(16), self._secrets[0])
+        self._rotate_at = now + self.challenge_lifetime
+
+    def start(self) -> None:
+        """Answer queries on a background thread until :py:meth:`close` is called."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+            self._thread.start()
+
+    def close(self) -> None:
+        """Stop answering queries and close the socket."""
+        self._closed = True
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+            self._thread = None
+        self._socket.close()
+
+    def serve_forever(self) -> None:
+        """Answer queries on the calling thread until :py:meth:`close` is called."""
+        sock = self._socket
+        recvfrom = sock.recvfrom
+        sendto = sock.sendto
+        challenge_for = self._challenge
+        no_challenge = _CHALLENGE.pack(_NO_CHALLENGE)
+
+        while not self._closed:
+            try:
+                data, client = recvfrom(2048)
+            except socket.timeout:
+                data = None
+            except ConnectionResetError:
+                continue
+            except OSError:
+                if self._closed:
+                    return
+                raise
+
+            now = time.monotonic()
+            if now >= self._rotate_at:
+                self._rotate(now)
+
+            if data is None:
+                continue
+
+            request_type = data[4] if len(data) > 4 else None
+            if len(data) != _REQUEST_SIZES.get(request_type) or not data.startswith(SIMPLE_HEADER):
+                self.ignored += 1
+                continue
+
+            if request_type == RequestType.Info.value and data[5:-4] != _INFO_BODY:
+                self.ignored += 1
+                continue
+
+            self.requests += 1
+
+            if self.challenge:
+                current, previous = self._secrets
+                challenge = data[-4:]
+                if challenge == no_challenge or (
+                        challenge != challenge_for(current, client) and challenge != challenge_for(previous, client)
+                ):
+                    self.challenges += 1
+                    sendto(SIMPLE_HEADER + b"A" + challenge_for(current, client), client)
+                    continue
+
+            for packet in self._packets[request_type]:
+                sendto(packet, client)
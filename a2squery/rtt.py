@@ -0,0 +1,47 @@
+__all__ = ("RTTEstimator",)
+
+
+class RTTEstimator:
+    """Estimate a server's round trip time and how long to wait before retransmitting a request.
+
+    This uses the same smoothed round trip time and variance as TCP's retransmission timer (RFC 6298).
+    Only replies to requests that were not retransmitted are sampled, since a reply to a retransmitted
+    request cannot be matched to the send it answers.
+
+    Attributes:
+        srtt: The smoothed round trip time in seconds, or None before the first sample.
+        rttvar: The round trip time variance in seconds, or None before the first sample.
+        rto: How long to wait for a reply before retransmitting, in seconds.
+    """
+
+    alpha = 1 / 8
+    beta = 1 / 4
+
+    def __init__(self, initial_rto: float = 1, min_rto: float = 0.05, max_rto: float = 10):
+        """Create a new RTTEstimator.
+
+        Arguments:
+            initial_rto: The retransmission timeout used until the first reply is sampled.
+            min_rto: The smallest retransmission timeout allowed.
+            max_rto: The largest retransmission timeout allowed.
+        """
+        self.srtt = None
+        self.rttvar = None
+        self.rto = initial_rto
+        self.min_rto = min_rto
+        self.max_rto = max_rto
+
+    def sample(self, rtt: float) -> None:
+        """Update the estimate with a measured round trip time in seconds."""
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - self.beta) * self.rttvar + self.beta * abs(self.srtt - rtt)
+            self.srtt = (1 - self.alpha) * self.srtt + self.alpha * rtt
+
+        self.rto = min(max(self.srtt + 4 * self.rttvar, self.min_rto), self.max_rto)
+
+    def timeout(self, attempt: int) -> float:
+        """Get how long to wait for a reply to a request's attempt (0 for the first send), with exponential backoff."""
+        return min(self.rto * 2 ** attempt, self.max_rto)
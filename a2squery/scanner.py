@@ -0,0 +1,479 @@
+import collections.abc
+import errno
+import functools
+import heapq
+import itertools
+import math
+import selectors
+import socket
+import struct
+import time
+import typing
+
+from .batchio import DatagramIO, open_io
+from .challenge import ChallengeCache
+from .health import HealthTracker
+from .data import ScanResult, RequestTrace
+from .enums import RequestType, ResponseType
+from .exceptions import InvalidResponse, ServerDown
+from .metrics import Instrument
+from .ratelimit import Pacer
+from .rtt import RTTEstimator
+from .query import QueryResponse, _pack_request, _parse_info, _PARSERS, _REQUEST_BODIES
+from .reassembly import SPLIT_HEADER, SplitPacketAssembler
+
+__all__ = ("FleetScanner",)
+
+# How long a scan waits for replies before asking its targets again after they yielded None.
+_IDLE_WAIT = 0.01
+
+# The most servers whose round trip time estimates are kept. The least recently used estimates are dropped first.
+_MAX_ESTIMATES = 65536
+
+# Errors that an ICMP message about an earlier request leaves on a socket. The next receive reports them,
+# they say nothing about which target was unreachable, and the scan carries on; timeouts cover those targets.
+_ICMP_ERRNOS = frozenset(
+    getattr(errno, name) for name in (
+        "ECONNREFUSED", "ECONNRESET", "EHOSTUNREACH", "ENETUNREACH", "EHOSTDOWN", "ENETDOWN", "EMSGSIZE"
+    ) if hasattr(errno, name)
+)
+
+
+class _Target:
+
+    __slots__ = (
+        "target", "address", "io", "challenge", "refreshed", "attempt", "sent", "expires", "deadline", "trace"
+    )
+
+    def __init__(self, target: typing.Tuple[str, int], address: typing.Tuple[str, int], io: DatagramIO):
+        self.target = target
+        self.address = address
+        self.io = io
+        self.challenge = -1
+        self.refreshed = False
+        self.attempt = 0
+        self.sent = 0.0
+        self.expires = 0.0
+        self.deadline = 0.0
+        self.trace = None
+
+
+class FleetScanner:
+    """Query many servers at once from a small pool of unconnected sockets.
+
+    Requests are sent with ``sendto`` and replies are matched back to their target by the address
+    they were received from, so scanning thousands of servers only needs a handful of file descriptors.
+    On Linux, the requests and replies of many targets are batched into single ``sendmmsg`` and ``recvmmsg``
+    system calls, see :mod:`a2squery.batchio`.
+    Challenge requests are answered per target. Readiness is polled with :mod:`selectors`, which uses
+    epoll on Linux. Each target's round trip time is tracked across scans and used to retransmit
+    lost requests, as :class:`a2squery.A2SQuery` does.
+    """
+
+    def __init__(
+            self, timeout: float = 5, max_in_flight: int = 512, sockets: int = 1,
+            challenge_cache: ChallengeCache = None, retries: int = 2, health: HealthTracker = None,
+            pacer: Pacer = None, instrument: Instrument = None, batch_size: int = 32
+    ):
+        """Create a new FleetScanner.
+
+        Arguments:
+            timeout: The total time a target may take to reply, including retransmissions, before giving up on it.
+            max_in_flight: The maximum number of targets waiting for a reply at any one time.
+            sockets: The number of UDP sockets to spread targets across.
+            challenge_cache:
+                Where to remember challenges between scans so that repeated scans take a single round trip.
+                The scanner gets its own cache when omitted.
+            retries: How many times a request is retransmitted when no reply arrives.
+            health:
+                Records timeouts and invalid responses per target. Targets that are down are not sent anything
+                and get a :class:`a2squery.exceptions.ServerDown` error until their next probe is due.
+            pacer:
+                Schedules every send, including retransmissions, within its global and per-subnet rate limits.
+                Requests waiting for their slot count towards ``max_in_flight``. Requests are sent right away when omitted.
+            instrument:
+                Receives a :class:`a2squery.RequestTrace` for every target, such as a :class:`a2squery.HistogramCollector`.
+                Nothing is timed when omitted.
+            batch_size:
+                The most datagrams sent or received per system call. Datagrams are batched with ``sendmmsg`` and
+                ``recvmmsg`` where those are available, and take one ``sendto`` or ``recvfrom_into`` call each
+                elsewhere or when this is 1.
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        if sockets < 1:
+            raise ValueError("sockets must be at least 1")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        self._timeout = timeout
+        self._retries = retries
+        self._rtt = collections.OrderedDict()
+        self._health = health
+        self._pacer = pacer
+        self._instrument = instrument
+        self._max_in_flight = max_in_flight
+        self._selector = selectors.DefaultSelector()
+        self._assembler = SplitPacketAssembler(timeout)
+        self._challenges = ChallengeCache() if challenge_cache is None else challenge_cache
+        self._sockets = []
+        self._ios = []
+
+        for _ in range(sockets):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setblocking(False)
+            io = open_io(sock, batch_size)
+            self._selector.register(sock, selectors.EVENT_READ, io)
+            self._sockets.append(sock)
+            self._ios.append(io)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        """Close the scanner's sockets. All scans after this will fail."""
+        for sock in self._sockets:
+            self._selector.unregister(sock)
+            sock.close()
+        self._sockets = []
+        self._ios = []
+        self._selector.close()
+
+    def _estimator(self, address: typing.Tuple[str, int]) -> RTTEstimator:
+        estimator = self._rtt.get(address)
+
+        if estimator is None:
+            estimator = self._rtt[address] = RTTEstimator()
+            if len(self._rtt) > _MAX_ESTIMATES:
+                self._rtt.popitem(last=False)
+        else:
+            self._rtt.move_to_end(address)
+
+        return estimator
+
+    def scan(
+            self, targets: typing.Iterable[typing.Tuple[str, int]],
+            request_type: RequestType = RequestType.Info, lazy: bool = False
+    ) -> typing.Iterator[ScanResult]:
+        """Send a request to every target and yield the results as they arrive.
+
+        Targets are consumed lazily so that no more than ``max_in_flight`` of them are waiting for a reply.
+        A target listed more than once is queried again after its previous request has finished.
+        The iterable may yield None when it has no target ready yet, in which case the scan handles replies
+        for a moment and then asks it again. This lets one scan be fed by a long running schedule.
+
+        Arguments:
+            targets: An iterable of ``(host, port)`` tuples.
+            request_type: The type of request to send to every target.
+            lazy: Decode info fields the first time they are read. See :py:meth:`a2squery.A2SQuery.info`.
+
+        Returns:
+            An iterator of :class:`a2squery.ScanResult`, one per target, in the order the replies arrive.
+        """
+        if not self._sockets:
+            raise ValueError("The scanner has been closed. No more scans can be made.")
+
+        parse = _PARSERS[request_type]
+        if lazy and request_type is RequestType.Info:
+            parse = functools.partial(_parse_info, lazy=True)
+        pending = {}
+        deferred = []
+        deadlines = []
+        outgoing = []
+        outbox = {}
+        counter = itertools.count()
+        exhausted = False
+        resolved = {}
+
+        def resolve(host: str) -> typing.Union[str, OSError]:
+            # IP addresses are used as they are, and each host name is looked up once per scan.
+            try:
+                socket.inet_pton(socket.AF_INET, host)
+                return host
+            except OSError:
+                pass
+
+            ip = resolved.get(host)
+            if ip is None:
+                try:
+                    ip = socket.gethostbyname(host)
+                except OSError as exception:
+                    ip = exception
+                resolved[host] = ip
+
+            return ip
+
+        # The host names of a list of targets are looked up before anything is sent, so the lookups do not hold
+        # up the requests in flight. Other iterables may be endless, and their host names are looked up as they come.
+        if isinstance(targets, collections.abc.Collection):
+            for target in targets:
+                if target is not None:
+                    resolve(target[0])
+
+        targets = iter(targets)
+
+        def transmit(state: _Target):
+            state.sent = time.monotonic()
+            state.deadline = state.sent + min(self._estimator(state.address).timeout(state.attempt), state.expires - state.sent)
+            heapq.heappush(deadlines, (state.deadline, next(counter), state))
+            data = _pack_request(request_type, _REQUEST_BODIES[request_type], state.challenge)
+
+            if state.trace is not None:
+                state.trace.attempts += 1
+                state.trace.bytes_out += len(data)
+
+            # Requests are queued and sent together by flush(), once per pass of the loop.
+            queued = outbox.get(state.io)
+            if queued is None:
+                queued = outbox[state.io] = ([], [])
+            queued[0].append((data, state.address))
+            queued[1].append(state)
+
+        def flush() -> typing.List[typing.Tuple[_Target, OSError]]:
+            failed = []
+
+            for io, (entries, states) in outbox.items():
+                sent = 0
+                while sent < len(entries):
+                    try:
+                        sent += io.send(entries, sent)
+                    except OSError as exception:
+                        state = states[sent]
+                        sent += 1
+                        if self._pacer is not None:
+                            self._pacer.record_drop()
+                            # A full socket buffer is just a lost packet, which the retransmission timer already handles.
+                            if isinstance(exception, BlockingIOError) or exception.errno == errno.ENOBUFS:
+                                continue
+                        failed.append((state, exception))
+
+                now = time.monotonic()
+                for state in states:
+                    if state.trace is not None:
+                        state.trace.send += now - state.sent
+                    state.sent = now
+
+            outbox.clear()
+            return failed
+
+        def send(state: _Target):
+            delay = 0 if self._pacer is None else self._pacer.reserve(state.address)
+
+            if delay:
+                state.deadline = math.inf
+                heapq.heappush(outgoing, (time.monotonic() + delay, next(counter), state))
+            else:
+                transmit(state)
+
+        def record(state: _Target, result: ScanResult):
+            trace = state.trace
+            trace.error = result.error
+            trace.total = time.monotonic() - state.expires + self._timeout
+            self._instrument.record(trace)
+
+        def finish(state: _Target, result: ScanResult):
+            del pending[state.address]
+
+            if state.trace is not None:
+                record(state, result)
+
+            for index, waiting in enumerate(deferred):
+                if waiting.address == state.address:
+                    del deferred[index]
+                    return waiting
+
+        def start(state: _Target):
+            state.expires = time.monotonic() + self._timeout
+
+            if self._instrument is not None:
+                state.trace = RequestTrace._make(state.address, request_type)
+
+            try:
+                if self._health is not None:
+                    self._health.check(state.address)
+                send(state)
+            except (ServerDown, OSError) as exception:
+                result = ScanResult(address=state.target, request_type=request_type, error=exception)
+                if state.trace is not None:
+                    record(state, result)
+                return result
+            pending[state.address] = state
+
+        while True:
+            idle = False
+
+            while len(pending) < self._max_in_flight and not exhausted:
+                try:
+                    target = next(targets)
+                except StopIteration:
+                    exhausted = True
+                    break
+
+                if target is None:
+                    idle = True
+                    break
+
+                ip = resolve(target[0])
+                if isinstance(ip, OSError):
+                    yield ScanResult(address=target, request_type=request_type, error=ip)
+                    continue
+                address = (ip, target[1])
+
+                state = _Target(target, address, self._ios[hash(address) % len(self._ios)])
+                state.challenge = self._challenges.get(address, request_type)
+
+                if address in pending:
+                    deferred.append(state)
+                    continue
+
+                failed = start(state)
+                if failed is not None:
+                    yield failed
+
+            failures = flush()
+            for state, exception in failures:
+                if pending.get(state.address) is not state:
+                    continue
+
+                result = ScanResult(address=state.target, request_type=request_type, error=exception)
+                waiting = finish(state, result)
+                yield result
+
+                if waiting is not None:
+                    failed = start(waiting)
+                    if failed is not None:
+                        yield failed
+
+            # Finished targets make room for more, and the requests of the ones that replaced them are not sent yet.
+            if failures:
+                continue
+
+            if not pending and exhausted:
+                break
+
+            while deadlines and pending.get(deadlines[0][2].address) is not deadlines[0][2]:
+                heapq.heappop(deadlines)
+
+            wake = min(deadlines[0][0] if deadlines else math.inf, outgoing[0][0] if outgoing else math.inf)
+            if idle:
+                wake = min(wake, time.monotonic() + _IDLE_WAIT)
+            events = self._selector.select(max(wake - time.monotonic(), 0) if wake < math.inf else None)
+
+            for key, _ in events:
+                io = key.data
+                buffer = io.buffer
+                view = memoryview(buffer)
+
+                while True:
+                    try:
+                        datagrams = io.receive()
+                    except OSError as exception:
+                        if isinstance(exception, ConnectionError) or exception.errno in _ICMP_ERRNOS:
+                            continue
+                        raise
+
+                    if not datagrams:
+                        break
+
+                    for offset, size, address in datagrams:
+                        state = pending.get(address)
+                        if state is None:
+                            continue
+
+                        result = ScanResult(address=state.target, request_type=request_type)
+                        trace = state.trace
+
+                        if trace is not None:
+                            trace.bytes_in += size
+
+                        try:
+                            if buffer.startswith(SPLIT_HEADER, offset, offset + size):
+                                data = self._assembler.feed(bytes(view[offset:offset + size]), address)
+                                if data is None:
+                                    continue
+
+                                response = QueryResponse.from_bytes(data)
+                            else:
+                                response = QueryResponse.from_bytes(buffer, offset + size, offset)
+
+                            if response.type is ResponseType.Challenge:
+                                if state.refreshed:
+                                    raise InvalidResponse("Server requested too many challenges")
+
+                                if state.attempt == 0:
+                                    self._estimator(address).sample(time.monotonic() - state.sent)
+
+                                if trace is not None:
+                                    trace.challenges += 1
+                                    trace.challenge_rtt = time.monotonic() - state.sent
+
+                                state.challenge = response.read_challenge()
+                                state.refreshed = True
+                                state.attempt = 0
+                                self._challenges.set(address, request_type, state.challenge)
+                                send(state)
+                                continue
+
+                            if state.attempt == 0:
+                                self._estimator(address).sample(time.monotonic() - state.sent)
+
+                            if trace is None:
+                                result.result = parse(response)
+                            else:
+                                parsing = time.monotonic()
+                                trace.first_byte = parsing - state.sent
+                                trace.response_type = response.type
+                                result.result = parse(response)
+                                trace.parse = time.monotonic() - parsing
+                        except (InvalidResponse, ValueError, IndexError, struct.error, OSError) as exception:
+                            result.error = exception
+
+                        if self._health is not None:
+                            if result.error is None:
+                                self._health.record_success(address)
+                            elif isinstance(result.error, InvalidResponse):
+                                self._health.record_failure(address, result.error)
+
+                        waiting = finish(state, result)
+                        yield result
+
+                        if waiting is not None:
+                            failed = start(waiting)
+                            if failed is not None:
+                                yield failed
+
+            now = time.monotonic()
+
+            while outgoing and outgoing[0][0] <= now:
+                _, _, state = heapq.heappop(outgoing)
+
+                if pending.get(state.address) is not state:
+                    continue
+
+                transmit(state)
+
+            while deadlines and deadlines[0][0] <= now:
+                _, _, state = heapq.heappop(deadlines)
+
+                if pending.get(state.address) is not state or state.deadline > now:
+                    continue
+
+                if state.attempt < self._retries and state.expires > now:
+                    state.attempt += 1
+                    send(state)
+                    continue
+
+                result = ScanResult(address=state.target, request_type=request_type, error=socket.timeout("timed out"))
+                if self._health is not None:
+                    self._health.record_failure(state.address, result.error)
+
+                waiting = finish(state, result)
+                yield result
+
+                if waiting is not None:
+                    failed = start(waiting)
+                    if failed is not None:
+                        yield failed
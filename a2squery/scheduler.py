@@ -0,0 +1,223 @@
+import heapq
+import itertools
+import math
+import random
+import time
+import typing
+
+from .data import ScanResult
+from .enums import RequestType
+from .ratelimit import TokenBucket
+from .scanner import FleetScanner
+
+__all__ = ("AdaptiveScheduler",)
+
+
+class _Schedule:
+
+    __slots__ = ("target", "interval", "due", "players", "map", "active")
+
+    def __init__(self, target: typing.Tuple[str, int], interval: float):
+        self.target = target
+        self.interval = interval
+        self.due = math.inf
+        self.players = None
+        self.map = None
+        self.active = True
+
+
+class AdaptiveScheduler:
+    """Decide when to poll each of many servers, within a global budget of polls per second.
+
+    Every server has its own polling interval, which adapts to what its info responses show:
+
+    * A change in the number of players or the map halves the interval. A poll that shows no change
+      stretches it by a quarter, so servers that have gone quiet slowly back off.
+    * Occupancy caps the interval. An empty server may back off to ``max_interval``, a full one is
+      polled every ``min_interval``, and the cap falls linearly in between.
+    * A failed poll doubles the interval, up to ``max_interval``.
+
+    When the intervals ask for more polls than the budget allows, every interval is stretched by the same
+    factor, so busy servers stay fresher than idle ones instead of all of them falling equally behind.
+    The next due time of every server is kept in a heap, so picking the next poll is logarithmic in the number
+    of servers, and a token bucket holds the polls to the budget even when many come due at once.
+    """
+
+    def __init__(
+            self, targets: typing.Iterable[typing.Tuple[str, int]] = (), rate: float = 100,
+            min_interval: float = 10, max_interval: float = 600, jitter: float = 0.1
+    ):
+        """Create a new AdaptiveScheduler.
+
+        Arguments:
+            targets: The ``(host, port)`` tuples to poll. More can be added with :py:meth:`add`.
+            rate:
+                The most polls sent per second. Challenge resends and retransmissions are not counted,
+                pass a :class:`a2squery.Pacer` to the scanner to limit those too.
+            min_interval: The shortest time between two polls of the same server, in seconds.
+            max_interval: The longest time between two polls of the same server, in seconds.
+            jitter: How much each interval may vary, as a fraction of it, so that polls do not fall into step.
+        """
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError("intervals must be positive and min_interval may not exceed max_interval")
+
+        self.rate = rate
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+
+        self._bucket = TokenBucket(rate, max(1, rate * 0.1))
+        self._random = random.Random()
+        self._schedules = {}
+        self._heap = []
+        self._counter = itertools.count()
+        self._stopped = False
+
+        # The first polls of the initial targets are spread over the stretched interval of all of them.
+        targets = list(dict.fromkeys(targets))
+        self._demand = len(targets) / min_interval
+        spread = min_interval * self.stretch
+        now = time.monotonic()
+
+        for target in targets:
+            schedule = self._schedules[target] = _Schedule(target, min_interval)
+            schedule.due = now + self._random.uniform(0, spread)
+            self._heap.append((schedule.due, next(self._counter), schedule))
+
+        heapq.heapify(self._heap)
+
+    def __len__(self):
+        return len(self._schedules)
+
+    @property
+    def demand(self) -> float:
+        """How many polls per second the current intervals ask for."""
+        return self._demand
+
+    @property
+    def stretch(self) -> float:
+        """The factor every interval is stretched by to stay within the budget. 1 when the budget is not exceeded."""
+        return max(1, self._demand / self.rate)
+
+    def interval(self, target: typing.Tuple[str, int]) -> float:
+        """Get the current polling interval of a server, before stretching and jitter."""
+        return self._schedules[target].interval
+
+    def _push(self, schedule: _Schedule, due: float) -> None:
+        schedule.due = due
+        heapq.heappush(self._heap, (due, next(self._counter), schedule))
+
+    def _set_interval(self, schedule: _Schedule, interval: float) -> None:
+        self._demand += 1 / interval - 1 / schedule.interval
+        schedule.interval = interval
+
+    def add(self, target: typing.Tuple[str, int], now: float = None) -> None:
+        """Start polling a server. Its first poll is due at a random time within its first stretched interval."""
+        if target in self._schedules:
+            return
+
+        now = time.monotonic() if now is None else now
+        schedule = self._schedules[target] = _Schedule(target, self.min_interval)
+        self._demand += 1 / schedule.interval
+        self._push(schedule, now + self._random.uniform(0, schedule.interval * self.stretch))
+
+    def remove(self, target: typing.Tuple[str, int]) -> None:
+        """Stop polling a server. A poll in flight is still reported, but not rescheduled."""
+        schedule = self._schedules.pop(target, None)
+
+        if schedule is not None:
+            schedule.active = False
+            self._demand -= 1 / schedule.interval
+
+    def next_due(self) -> float:
+        """Get the ``time.monotonic()`` time at which the next poll is due, or ``math.inf`` when none is scheduled."""
+        heap = self._heap
+
+        while heap and (not heap[0][2].active or heap[0][2].due != heap[0][0]):
+            heapq.heappop(heap)
+
+        return heap[0][0] if heap else math.inf
+
+    def due(self, now: float = None, limit: int = None) -> typing.List[typing.Tuple[str, int]]:
+        """Take the servers whose poll is due and fits in the budget, most overdue first.
+
+        A server that is taken is not due again until its result has been passed to :py:meth:`record`.
+
+        Arguments:
+            now: The current ``time.monotonic()`` time.
+            limit: The most servers to take.
+        """
+        now = time.monotonic() if now is None else now
+        heap = self._heap
+        taken = []
+
+        while (limit is None or len(taken) < limit) and self.next_due() <= now:
+            if not self._bucket.consume(now):
+                break
+
+            schedule = heapq.heappop(heap)[2]
+            schedule.due = math.inf
+            taken.append(schedule.target)
+
+        return taken
+
+    def record(self, result: ScanResult, now: float = None) -> None:
+        """Adapt a server's interval to the result of its poll and schedule its next one.
+
+        Arguments:
+            result: The result of an info request to the server.
+            now: The current ``time.monotonic()`` time.
+        """
+        schedule = self._schedules.get(result.address)
+        if schedule is None:
+            return
+
+        now = time.monotonic() if now is None else now
+
+        if result.error is not None:
+            interval = min(schedule.interval * 2, self.max_interval)
+        else:
+            info = result.result
+            changed = schedule.players is not None and (info.players != schedule.players or info.map != schedule.map)
+            schedule.players = info.players
+            schedule.map = info.map
+
+            occupancy = min(info.players / info.max_players, 1) if info.max_players else 0
+            ceiling = self.max_interval - (self.max_interval - self.min_interval) * occupancy
+            interval = schedule.interval * (0.5 if changed else 1.25)
+            interval = max(min(interval, ceiling), self.min_interval)
+
+        self._set_interval(schedule, interval)
+
+        if schedule.due == math.inf:
+            jitter = self._random.uniform(1 - self.jitter, 1 + self.jitter)
+            self._push(schedule, now + interval * self.stretch * jitter)
+
+    def _targets(self) -> typing.Iterator[typing.Optional[typing.Tuple[str, int]]]:
+        while not self._stopped:
+            targets = self.due()
+            if not targets:
+                yield None
+            yield from targets
+
+    def stop(self) -> None:
+        """Make :py:meth:`run` stop once the polls in flight have finished."""
+        self._stopped = True
+
+    def run(self, scanner: FleetScanner, lazy: bool = False) -> typing.Iterator[ScanResult]:
+        """Poll the servers with a scanner until :py:meth:`stop` is called, yielding every result.
+
+        Results are recorded before they are yielded, and servers can be added or removed while running.
+
+        Arguments:
+            scanner: The scanner to send the info requests with.
+            lazy: Decode info fields the first time they are read. See :py:meth:`a2squery.A2SQuery.info`.
+
+        Returns:
+            An iterator of :class:`a2squery.ScanResult`, one per poll.
+        """
+        self._stopped = False
+
+        for result in scanner.scan(self._targets(), RequestType.Info, lazy):
+            self.record(result)
+            yield result
@@ -0,0 +1,302 @@
+import enum
+import marshal
+import multiprocessing
+import pickle
+import threading
+import time
+import typing
+import zlib
+from multiprocessing.connection import wait
+
+from .data import SourceInfo, GoldSourceInfo, Player, ScanResult
+from .enums import RequestType, ServerType, Environment
+from .scanner import FleetScanner
+
+__all__ = ("ShardedScanner",)
+
+# Results are sent to the parent once this many are waiting, or once the oldest has waited this long.
+_BATCH_SIZE = 256
+_BATCH_DELAY = 0.05
+_CHUNK_SIZE = 512
+
+_INFO_CLASSES = (SourceInfo, GoldSourceInfo)
+
+
+def _shard(target: typing.Tuple[str, int], shards: int) -> int:
+    return zlib.crc32("{}:{}".format(target[0], target[1]).encode("utf-8")) % shards
+
+
+def _encode(result: ScanResult) -> tuple:
+    """Turn a result into a tuple of builtins that :mod:`marshal` can serialize."""
+    if result.error is not None:
+        return result.address, True, pickle.dumps(result.error)
+
+    value = result.result
+    if result.request_type is RequestType.Info:
+        value = (
+            _INFO_CLASSES.index(type(value)),
+            tuple(field.value if isinstance(field, enum.Enum) else field for field in value.values())
+        )
+    elif result.request_type is RequestType.Player:
+        value = [tuple(player.values()) for player in value]
+
+    return result.address, False, value
+
+
+def _decode(record: tuple, request_type: RequestType) -> ScanResult:
+    address, failed, value = record
+
+    if failed:
+        return ScanResult._make(address, request_type, None, pickle.loads(value))
+
+    if request_type is RequestType.Info:
+        value = _INFO_CLASSES[value[0]]._make(*value[1])
+        value.server_type = ServerType(value.server_type)
+        value.environment = Environment(value.environment)
+    elif request_type is RequestType.Player:
+        value = [Player._make(*player) for player in value]
+
+    return ScanResult._make(address, request_type, value)
+
+
+def _targets(commands) -> typing.Iterator[typing.Optional[typing.Tuple[str, int]]]:
+    while True:
+        # Yielding None lets the scanner handle replies while the next chunk is on its way.
+        if not commands.poll():
+            yield None
+            continue
+
+        chunk = commands.recv()
+        if chunk is None:
+            return
+        yield from chunk
+
+
+class _Batcher:
+    """Collects encoded results and sends them to the parent in batches.
+
+    A background thread sends a batch once its oldest result has waited ``_BATCH_DELAY``, even when the
+    scan is busy waiting for slow targets and produces nothing else.
+    """
+
+    def __init__(self, results):
+        self._results = results
+        self._condition = threading.Condition()
+        self._batch = []
+        self._flush_at = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._flush_forever, daemon=True)
+        self._thread.start()
+
+    def _send(self) -> None:
+        self._results.send_bytes(marshal.dumps(self._batch))
+        self._batch = []
+
+    def _flush_forever(self) -> None:
+        with self._condition:
+            while not self._closed:
+                if not self._batch:
+                    self._condition.wait()
+                    continue
+
+                delay = self._flush_at - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+
+                self._send()
+
+    def add(self, record: tuple) -> None:
+        with self._condition:
+            if not self._batch:
+                self._flush_at = time.monotonic() + _BATCH_DELAY
+                self._condition.notify()
+
+            self._batch.append(record)
+            if len(self._batch) >= _BATCH_SIZE:
+                self._send()
+
+    def finish(self) -> None:
+        """Send what is left, followed by the empty message that ends a scan."""
+        with self._condition:
+            if self._batch:
+                self._send()
+            self._results.send_bytes(b"")
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+
+def _worker(commands, results, options: typing.Dict[str, typing.Any]) -> None:
+    scanner = FleetScanner(**options)
+    batcher = _Batcher(results)
+
+    try:
+        while True:
+            request_type = commands.recv()
+            if request_type is None:
+                return
+
+            for result in scanner.scan(_targets(commands), RequestType(request_type)):
+                batcher.add(_encode(result))
+
+            batcher.finish()
+    finally:
+        batcher.close()
+        scanner.close()
+
+
+class ShardedScanner:
+    """Spread a scan over several processes, each running its own :class:`a2squery.FleetScanner`.
+
+    Targets are assigned to a worker by a hash of their address, so a target always lands on the same
+    worker and keeps its round trip time estimate and challenge between scans. Each worker parses its own
+    replies and sends the results back in batches of plain tuples, which are much cheaper to serialize
+    than the result objects themselves.
+
+    With one worker, scans run in the calling process without any serialization.
+    The workers are started when the scanner is created and run until it is closed.
+    """
+
+    def __init__(
+            self, workers: int = None, timeout: float = 5, max_in_flight: int = 512, sockets: int = 1, retries: int = 2
+    ):
+        """Create a new ShardedScanner and start its workers.
+
+        Arguments:
+            workers: The number of worker processes. Defaults to the number of CPUs.
+            timeout: Passed to every worker's :class:`a2squery.FleetScanner`.
+            max_in_flight: The maximum number of targets waiting for a reply, per worker.
+            sockets: The number of UDP sockets of each worker.
+            retries: How many times a request is retransmitted when no reply arrives.
+        """
+        self.workers = workers or multiprocessing.cpu_count()
+        options = {"timeout": timeout, "max_in_flight": max_in_flight, "sockets": sockets, "retries": retries}
+
+        self._scanner = None
+        self._processes = []
+        self._commands = []
+        self._results = []
+
+        if self.workers == 1:
+            self._scanner = FleetScanner(**options)
+            return
+
+        for _ in range(self.workers):
+            commands, commands_in = multiprocessing.Pipe(duplex=False)
+            results_out, results = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=_worker, args=(commands, results, options), daemon=True)
+            process.start()
+            commands.close()
+            results.close()
+
+            self._processes.append(process)
+            self._commands.append(commands_in)
+            self._results.append(results_out)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        """Stop the workers. All scans after this will fail."""
+        if self._scanner is not None:
+            self._scanner.close()
+
+        for commands in self._commands:
+            try:
+                commands.send(None)
+            except OSError:
+                pass
+            commands.close()
+
+        for process, results in zip(self._processes, self._results):
+            process.join()
+            results.close()
+
+        self._processes = []
+        self._commands = []
+        self._results = []
+
+    def _feed(self, targets: typing.Iterable[typing.Tuple[str, int]], stop: threading.Event, errors: list) -> None:
+        chunks = [[] for _ in self._commands]
+
+        try:
+            for target in targets:
+                if stop.is_set():
+                    break
+
+                shard = _shard(target, len(chunks))
+                chunks[shard].append(target)
+
+                if len(chunks[shard]) >= _CHUNK_SIZE:
+                    self._commands[shard].send(chunks[shard])
+                    chunks[shard] = []
+        except Exception as exception:
+            errors.append(exception)
+        finally:
+            for commands, chunk in zip(self._commands, chunks):
+                if chunk and not stop.is_set():
+                    commands.send(chunk)
+                commands.send(None)
+
+    def scan(
+            self, targets: typing.Iterable[typing.Tuple[str, int]], request_type: RequestType = RequestType.Info
+    ) -> typing.Iterator[ScanResult]:
+        """Send a request to every target and yield the results as they arrive.
+
+        Targets are read on a background thread and handed to the workers in chunks while earlier results
+        are still arriving. Closing the iterator early stops reading targets and discards the remaining results.
+
+        Arguments:
+            targets: An iterable of ``(host, port)`` tuples.
+            request_type: The type of request to send to every target.
+
+        Returns:
+            An iterator of :class:`a2squery.ScanResult`, one per target, in the order the replies arrive.
+        """
+        if self._scanner is not None:
+            yield from self._scanner.scan(targets, request_type)
+            return
+
+        if not self._processes:
+            raise ValueError("The scanner has been closed. No more scans can be made.")
+
+        for commands in self._commands:
+            commands.send(request_type.value)
+
+        stop = threading.Event()
+        errors = []
+        feeder = threading.Thread(target=self._feed, args=(targets, stop, errors), daemon=True)
+        feeder.start()
+        remaining = list(self._results)
+
+        try:
+            while remaining:
+                for results in wait(remaining):
+                    data = results.recv_bytes()
+
+                    if not data:
+                        remaining.remove(results)
+                        continue
+
+                    for record in marshal.loads(data):
+                        yield _decode(record, request_type)
+        finally:
+            stop.set()
+
+            # Workers finish their current chunk after the feeder stops, so wait for them to be idle again.
+            while remaining:
+                for results in wait(remaining):
+                    if not results.recv_bytes():
+                        remaining.remove(results)
+
+            feeder.join()
+
+        if errors:
+            raise errors[0]
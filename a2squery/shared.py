@@ -0,0 +1,234 @@
+import queue
+import socket
+import struct
+import threading
+import time
+import typing
+
+from .challenge import ChallengeCache
+from .data import Snapshot
+from .exceptions import InvalidResponse, SocketClosed
+from .health import HealthTracker
+from .query import A2SQuery, QueryResponse, _pack_request, _PARSERS, _REQUEST_BODIES, _RESPONSE_REQUESTS
+from .ratelimit import Pacer
+from .reassembly import SPLIT_HEADER
+from .rtt import RTTEstimator
+from .enums import RequestType, ResponseType
+
+__all__ = ("SharedA2SQuery",)
+
+# How often the receiver checks whether the client has been closed, in seconds.
+_POLL_INTERVAL = 0.1
+
+
+class _Waiter:
+    """A caller waiting for the reply to one request."""
+
+    __slots__ = ("request_type", "body", "challenge", "responses", "attempt", "refreshed", "sent", "shared")
+
+    def __init__(self, request_type: RequestType, body: typing.Optional[str], challenge: int):
+        self.request_type = request_type
+        self.body = body
+        self.challenge = challenge
+        self.responses = queue.Queue()
+        self.attempt = 0
+        self.refreshed = False
+        self.sent = 0
+        self.shared = False
+
+
+class SharedA2SQuery(A2SQuery):
+    """A thread safe :class:`a2squery.A2SQuery` that carries any number of concurrent requests over one socket.
+
+    A background thread receives every reply and routes it to the callers waiting for its response type.
+    Concurrent requests of the same type are identical, so one reply completes all of them and each
+    caller parses its own copy. Challenges apply to every request type, so a challenge is passed to every
+    waiting caller, and each one that sent a different challenge resends its request with the new one.
+    Replies that nobody is waiting for, such as late replies to requests that already timed out, are dropped.
+
+    One instance can be shared by every thread of a :class:`concurrent.futures.ThreadPoolExecutor`.
+    Requests are not instrumented, since traces are collected per request on the calling thread.
+    """
+
+    def __init__(
+            self, host: str, port: int = 27015, timeout: float = 10, challenge_cache: ChallengeCache = None,
+            retries: int = 2, rtt: RTTEstimator = None, health: HealthTracker = None, pacer: Pacer = None
+    ):
+        """Create a new SharedA2SQuery connected to the specified server and start its receiver thread.
+
+        Arguments:
+            host: The IP address of the server. Do not include a port here.
+            port: The query port of the server.
+            timeout: The total time a request may take, including retransmissions, before timing out.
+            challenge_cache: See :class:`a2squery.A2SQuery`.
+            retries: How many times a request is retransmitted when no reply arrives.
+            rtt: See :class:`a2squery.A2SQuery`.
+            health: See :class:`a2squery.A2SQuery`.
+            pacer: See :class:`a2squery.A2SQuery`.
+        """
+        super().__init__(host, port, timeout, challenge_cache, retries, rtt, health, pacer)
+        self._socket.settimeout(_POLL_INTERVAL)
+
+        self._lock = threading.Lock()
+        self._waiters = {request_type: [] for request_type in RequestType}
+        self._closed = False
+        self._receiver = threading.Thread(target=self._receive_forever, daemon=True)
+        self._receiver.start()
+
+    def close(self) -> None:
+        """Stop the receiver and close the socket. Waiting requests fail with :class:`a2squery.exceptions.SocketClosed`."""
+        if self._closed:
+            return
+
+        self._closed = True
+        if self._receiver is not threading.current_thread():
+            self._receiver.join()
+
+        self._broadcast(SocketClosed("The socket has been closed. No more requests can be made."))
+        self._socket.close()
+        self._socket = None
+
+    def _broadcast(self, item: typing.Union[QueryResponse, Exception], request_type: RequestType = None) -> None:
+        with self._lock:
+            if request_type is None:
+                waiters = [waiter for waiters in self._waiters.values() for waiter in waiters]
+            else:
+                waiters = list(self._waiters[request_type])
+
+        for waiter in waiters:
+            waiter.responses.put(item)
+
+    def _receive_forever(self) -> None:
+        buffer = bytearray(65536)
+        view = memoryview(buffer)
+
+        while not self._closed:
+            try:
+                size = self._socket.recv_into(buffer)
+            except socket.timeout:
+                continue
+            except OSError as exception:
+                if self._closed:
+                    return
+                # ICMP errors such as a refused port are reported on the next receive. They belong to every request.
+                self._broadcast(exception)
+                continue
+
+            data = bytes(view[:size])
+
+            # A datagram that cannot be decoded is dropped, like a lost one, so one stray or corrupt
+            # packet does not fail every waiting request. Waiters retransmit or time out instead.
+            try:
+                if data.startswith(SPLIT_HEADER):
+                    data = self._assembler.feed(data)
+                    if data is None:
+                        continue
+
+                response = QueryResponse.from_bytes(data)
+            except (InvalidResponse, ValueError, IndexError, struct.error):
+                continue
+
+            if response.type is ResponseType.Challenge:
+                self._broadcast(response)
+            else:
+                self._broadcast(response, _RESPONSE_REQUESTS[response.type])
+
+    def _start(self, request_type: RequestType, body: typing.Optional[str]) -> _Waiter:
+        waiter = _Waiter(request_type, body, self._challenges.get(self._address, request_type))
+
+        with self._lock:
+            waiters = self._waiters[request_type]
+            waiters.append(waiter)
+            if len(waiters) > 1:
+                for other in waiters:
+                    other.shared = True
+
+        try:
+            self._transmit(waiter)
+        except BaseException:
+            self._stop(waiter)
+            raise
+
+        return waiter
+
+    def _stop(self, waiter: _Waiter) -> None:
+        with self._lock:
+            self._waiters[waiter.request_type].remove(waiter)
+
+    def _transmit(self, waiter: _Waiter) -> None:
+        self._send(_pack_request(waiter.request_type, waiter.body, waiter.challenge))
+        waiter.sent = time.monotonic()
+
+    def _finish(self, waiter: _Waiter, deadline: float) -> QueryResponse:
+        try:
+            while True:
+                now = time.monotonic()
+                remaining = deadline - now
+
+                if remaining <= 0:
+                    raise socket.timeout("timed out")
+
+                try:
+                    response = waiter.responses.get(timeout=min(self._rtt.timeout(waiter.attempt), remaining))
+                except queue.Empty:
+                    if waiter.attempt >= self._retries or deadline <= time.monotonic():
+                        raise socket.timeout("timed out")
+                    waiter.attempt += 1
+                    self._transmit(waiter)
+                    continue
+
+                if isinstance(response, Exception):
+                    raise response
+
+                if response.type is not ResponseType.Challenge:
+                    # A reply shared with other callers may answer an earlier send, so it is not a clean sample.
+                    if waiter.attempt == 0 and not waiter.shared:
+                        with self._lock:
+                            self._rtt.sample(time.monotonic() - waiter.sent)
+                    return response
+
+                challenge = response.read_challenge()
+                if challenge == waiter.challenge:
+                    continue
+
+                if waiter.refreshed:
+                    raise InvalidResponse("Server requested too many challenges")
+
+                waiter.challenge = challenge
+                waiter.refreshed = True
+                self._challenges.set(self._address, waiter.request_type, challenge)
+                self._transmit(waiter)
+        finally:
+            self._stop(waiter)
+
+    def _query(self, request_type: RequestType, body: str = None) -> QueryResponse:
+        deadline = time.monotonic() + self._timeout
+        return self._finish(self._start(request_type, body), deadline)
+
+    def _snapshot(self) -> Snapshot:
+        deadline = time.monotonic() + self._timeout
+        waiters = []
+
+        try:
+            for request_type in _PARSERS:
+                waiters.append(self._start(request_type, _REQUEST_BODIES[request_type]))
+        except BaseException:
+            for waiter in waiters:
+                self._stop(waiter)
+            raise
+
+        results = {}
+        for index, waiter in enumerate(waiters):
+            try:
+                response = self._finish(waiter, deadline)
+            except BaseException:
+                for remaining in waiters[index + 1:]:
+                    self._stop(remaining)
+                raise
+            results[waiter.request_type] = _PARSERS[waiter.request_type](response)
+
+        return Snapshot(
+            info=results[RequestType.Info],
+            players=results[RequestType.Player],
+            rules=results[RequestType.Rules]
+        )
@@ -0,0 +1,107 @@
+import typing
+
+from .data import Player, PlayerEvent
+from .enums import PlayerEventType
+from .parser import Parser
+
+__all__ = ("PlayerTracker",)
+
+
+class PlayerTracker:
+    """Turn successive player responses of servers into join, leave and update events.
+
+    Players are matched by name in a single pass. When several players share a name they are
+    matched in the order the server lists them. A player whose connection duration went down
+    has reconnected and is reported as leaving and joining again. Durations otherwise change on every
+    poll, so by default they do not produce events. Payloads that are byte for byte identical to the
+    previous one of the same server are not parsed at all.
+    """
+
+    def __init__(self, durations: bool = False):
+        """Create a new PlayerTracker.
+
+        Arguments:
+            durations:
+                Also report players whose connection duration changed as updates. As every connected
+                player's duration grows between polls, this reports nearly every player every time.
+        """
+        self.durations = durations
+        self._servers = {}
+
+    def __len__(self):
+        return len(self._servers)
+
+    def forget(self, address: typing.Any) -> None:
+        """Stop tracking a server. Its next payload will report every player as joining."""
+        self._servers.pop(address, None)
+
+    def players(self, address: typing.Any) -> typing.List[Player]:
+        """Get the last known players of a server."""
+        return self._servers[address][1]
+
+    def update(self, address: typing.Any, data: bytes, index: int = 0, end: int = None) -> typing.List[PlayerEvent]:
+        """Compare a server's player payload to its previous one.
+
+        Arguments:
+            address: Identifies the server. Usually its ``(host, port)``.
+            data: The player payload, as passed to :py:meth:`a2squery.parser.Parser.parse_players`.
+            index: Where the payload starts in ``data``.
+            end: Where the payload ends in ``data``.
+
+        Returns:
+            List of :class:`a2squery.PlayerEvent`. Leaves are listed first, then joins, then updates.
+        """
+        payload = bytes(data[index:end])
+        previous = self._servers.get(address)
+
+        if previous is not None and previous[0] == payload:
+            return []
+
+        players = Parser.parse_players(payload)
+        self._servers[address] = (payload, players)
+
+        return self.diff(address, [] if previous is None else previous[1], players, self.durations)
+
+    @staticmethod
+    def diff(
+            address: typing.Any, before: typing.List[Player], after: typing.List[Player], durations: bool = False
+    ) -> typing.List[PlayerEvent]:
+        """Compare two player lists of the same server.
+
+        Arguments:
+            address: Identifies the server. Copied into the events.
+            before: The previous players.
+            after: The current players.
+            durations: Also report players whose connection duration changed as updates.
+
+        Returns:
+            List of :class:`a2squery.PlayerEvent`. Leaves are listed first, then joins, then updates.
+        """
+        remaining = {}
+        for player in before:
+            remaining.setdefault(player.name, []).append(player)
+
+        leaves = []
+        joins = []
+        updates = []
+
+        for player in after:
+            candidates = remaining.get(player.name)
+            old = candidates.pop(0) if candidates else None
+
+            if old is None:
+                joins.append(PlayerEvent._make(PlayerEventType.Join, address, player))
+            elif player.duration < old.duration:
+                leaves.append(PlayerEvent._make(PlayerEventType.Leave, address, old))
+                joins.append(PlayerEvent._make(PlayerEventType.Join, address, player))
+            elif (
+                    player.score != old.score or player.deaths != old.deaths or player.money != old.money
+                    or (durations and player.duration != old.duration)
+            ):
+                updates.append(PlayerEvent._make(PlayerEventType.Update, address, player, old))
+
+        for candidates in remaining.values():
+            for old in candidates:
+                leaves.append(PlayerEvent._make(PlayerEventType.Leave, address, old))
+
+        return leaves + joins + updates
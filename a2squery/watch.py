@@ -0,0 +1,189 @@
+import asyncio
+import heapq
+import itertools
+import random
+import struct
+import typing
+
+from .async_query import AsyncA2SQuery
+from .challenge import ChallengeCache
+from .data import WatchEvent
+from .enums import RequestType
+from .exceptions import SourceQueryException
+from .health import HealthTracker
+from .query import _PARSERS, _REQUEST_BODIES
+from .ratelimit import Pacer
+from .tracker import PlayerTracker
+
+__all__ = ("watch",)
+
+# Exceptions that make a poll fail without stopping the watch.
+_POLL_ERRORS = (asyncio.TimeoutError, SourceQueryException, OSError, ValueError, IndexError, struct.error)
+
+
+class _State:
+    """What is known about one response of one target."""
+
+    __slots__ = ("fingerprint", "result", "failing", "busy")
+
+    def __init__(self):
+        self.fingerprint = None
+        self.result = None
+        self.failing = False
+        self.busy = False
+
+
+def _changed(state: _State, address: typing.Tuple[str, int], request_type: RequestType, result: typing.Any) -> typing.Optional[WatchEvent]:
+    previous = state.result
+    state.result = result
+
+    if request_type is not RequestType.Player:
+        return WatchEvent._make(address, request_type, result, previous)
+
+    # Player payloads change on every poll because of the connection durations, which are not worth reporting.
+    events = PlayerTracker.diff(address, previous or [], result)
+    if previous is None or events:
+        return WatchEvent._make(address, request_type, result, previous, events)
+
+    return None
+
+
+async def _poll(
+        client: AsyncA2SQuery, state: _State, address: typing.Tuple[str, int], request_type: RequestType
+) -> typing.Optional[WatchEvent]:
+    try:
+        response = await client._request(request_type, _REQUEST_BODIES[request_type])
+
+        fingerprint = hash(response.payload)
+        if fingerprint == state.fingerprint:
+            return None
+
+        result = _PARSERS[request_type](response)
+    except _POLL_ERRORS as exception:
+        state.fingerprint = None
+        if state.failing:
+            return None
+
+        state.failing = True
+        return WatchEvent._make(address, request_type, previous=state.result, error=exception)
+
+    state.fingerprint = fingerprint
+    state.failing = False
+    return _changed(state, address, request_type, result)
+
+
+async def watch(
+        targets: typing.Iterable[typing.Tuple[str, int]], interval: float = 30,
+        request_types: typing.Iterable[RequestType] = (RequestType.Info,), jitter: float = 0.1,
+        timeout: float = 5, retries: int = 2, max_in_flight: int = 256, challenge_cache: ChallengeCache = None,
+        health: HealthTracker = None, pacer: Pacer = None
+) -> typing.AsyncIterator[WatchEvent]:
+    """Poll servers forever and yield their responses when they change.
+
+    The first poll of every target and request type happens at a random time within the first interval,
+    and every following one an interval later, stretched or shrunk by up to ``jitter``. Polls of many
+    targets are therefore spread evenly instead of being sent in bursts, and do not fall back into step.
+
+    A response that is byte for byte identical to the previous one of the same target is not parsed.
+    Player lists are only reported when a player joined, left or had their score change, not when
+    only connection durations went up. A target that stops answering is reported once with the error,
+    and again with its response once it answers.
+
+    Stop watching with the iterator's ``aclose()``, which cancels the polls in flight and closes every client.
+
+    Arguments:
+        targets: An iterable of ``(host, port)`` tuples. It is read once, up front.
+        interval: The average time between two polls of the same response, in seconds.
+        request_types: The responses to watch.
+        jitter: How much each interval may vary, as a fraction of ``interval``.
+        timeout: The total time a poll may take, including retransmissions.
+        retries: How many times a request is retransmitted when no reply arrives.
+        max_in_flight: The maximum number of polls waiting for a reply at once.
+        challenge_cache: Shared by every client, see :class:`a2squery.AsyncA2SQuery`.
+        health: Shared by every client, see :class:`a2squery.AsyncA2SQuery`.
+        pacer: Shared by every client, see :class:`a2squery.AsyncA2SQuery`.
+
+    Returns:
+        An async iterator of :class:`a2squery.WatchEvent`.
+    """
+    loop = asyncio.get_event_loop()
+    rng = random.Random()
+    challenge_cache = ChallengeCache() if challenge_cache is None else challenge_cache
+    request_types = tuple(request_types)
+
+    clients = {}
+    states = {}
+    schedule = []
+    order = itertools.count()
+    started = loop.time()
+
+    for address in targets:
+        if address in clients:
+            continue
+
+        clients[address] = AsyncA2SQuery(
+            *address, timeout=timeout, retries=retries, challenge_cache=challenge_cache, health=health, pacer=pacer
+        )
+        for request_type in request_types:
+            states[address, request_type] = _State()
+            schedule.append((started + rng.uniform(0, interval), next(order), address, request_type))
+
+    heapq.heapify(schedule)
+    events = asyncio.Queue()
+    slots = asyncio.Semaphore(max_in_flight)
+    polls = set()
+
+    async def run(state: _State, address: typing.Tuple[str, int], request_type: RequestType) -> None:
+        try:
+            event = await _poll(clients[address], state, address, request_type)
+            if event is not None:
+                events.put_nowait(event)
+        finally:
+            state.busy = False
+            slots.release()
+
+    async def scheduler() -> None:
+        while schedule:
+            due, _, address, request_type = schedule[0]
+            delay = due - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            heapq.heapreplace(
+                schedule, (due + interval * rng.uniform(1 - jitter, 1 + jitter), next(order), address, request_type)
+            )
+
+            # A poll that is still running when the next one is due is not doubled up.
+            state = states[address, request_type]
+            if state.busy:
+                continue
+
+            await slots.acquire()
+            state.busy = True
+            task = loop.create_task(run(state, address, request_type))
+            polls.add(task)
+            task.add_done_callback(polls.discard)
+
+    schedule_task = loop.create_task(scheduler())
+    getter = None
+
+    try:
+        while True:
+            getter = loop.create_task(events.get())
+            done, _ = await asyncio.wait((getter, schedule_task), return_when=asyncio.FIRST_COMPLETED)
+
+            if getter in done:
+                yield getter.result()
+                continue
+
+            # The scheduler only stops when it fails, or when there is nothing to watch.
+            schedule_task.result()
+            return
+    finally:
+        pending = [schedule_task, *polls] + ([] if getter is None else [getter])
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        for client in clients.values():
+            client.close()
@@ -0,0 +1,85 @@
+"""Run the benchmarks and save the results as JSON.
+
+    python -m benchmarks --output results.json
+    python -m benchmarks --output new.json --compare results.json
+"""
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+
+import a2squery
+
+from . import bench_parser, bench_query
+
+SUITES = {"parser": bench_parser, "query": bench_query}
+
+
+def _commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: dict, results: dict, threshold: float) -> bool:
+    """Print the change of every benchmark's ``time_us``. Returns whether any got slower by more than ``threshold``."""
+    regressed = False
+
+    for name, result in results.items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+
+        change = result["time_us"] / before["time_us"] - 1
+        slower = change > threshold
+        regressed = regressed or slower
+        print("{:<40} {:>12.2f}us {:>+8.1%}{}".format(name, result["time_us"], change, "  REGRESSION" if slower else ""))
+
+    return regressed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark a2squery.")
+    parser.add_argument("--output", default="benchmark-results.json", help="Where to save the results.")
+    parser.add_argument("--suite", choices=sorted(SUITES), action="append", help="Only run these suites.")
+    parser.add_argument("--quick", action="store_true", help="Fewer repetitions, for a smoke test.")
+    parser.add_argument("--compare", metavar="BASELINE", help="A previous results file to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Slowdown that counts as a regression (0.1 is 10%%).")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in args.suite or sorted(SUITES):
+        results.update(SUITES[name].run(quick=args.quick))
+
+    report = {
+        "meta": {
+            "commit": _commit(),
+            "version": a2squery.__version__,
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.compare is None:
+        for name, result in results.items():
+            print("{:<40} {:>12.2f}us".format(name, result["time_us"]))
+        return 0
+
+    with open(args.compare) as f:
+        baseline = json.load(f)
+
+    return 1 if compare(baseline, results, args.threshold) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
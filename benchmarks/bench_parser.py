@@ -0,0 +1,50 @@
+"""Microbenchmarks of the :class:`a2squery.parser.Parser` methods over the payload corpus."""
+import statistics
+import timeit
+import typing
+
+from a2squery.parser import Parser
+
+from .corpus import corpus
+
+# Projections timed against the full parse of the same payload.
+PROJECTIONS = {
+    "rules_500_keys": ("rules_500", {"keys": ("sm_plugin_cvar_3", "sm_plugin_cvar_250", "sv_tags")}),
+    "rules_500_early_keys": ("rules_500", {"keys": ("sm_plugin_cvar_3", "sm_plugin_cvar_10")}),
+    "players_64_names": ("players_64", {"fields": ("name",)}),
+    "players_64_scores": ("players_64", {"fields": ("score",)}),
+}
+
+
+def measure(function: typing.Callable[[], typing.Any], repeat: int = 5) -> typing.Dict[str, float]:
+    """Time a function with :mod:`timeit`. ``time_us`` is the best time of a call in microseconds."""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    times = [total / number for total in timer.repeat(repeat=repeat, number=number)]
+
+    return {
+        "time_us": min(times) * 1e6,
+        "median_us": statistics.median(times) * 1e6,
+        "ops_per_sec": 1 / min(times),
+        "number": number,
+    }
+
+
+def run(quick: bool = False) -> typing.Dict[str, typing.Dict[str, float]]:
+    results = {}
+
+    for name, (method, payload) in corpus().items():
+        parse = getattr(Parser, method)
+        result = measure(lambda: parse(payload), repeat=3 if quick else 7)
+        result["bytes"] = len(payload)
+        results["parser.{}".format(name)] = result
+
+    payloads = corpus()
+    for name, (source, options) in PROJECTIONS.items():
+        method, payload = payloads[source]
+        parse = getattr(Parser, method)
+        result = measure(lambda: parse(payload, **options), repeat=3 if quick else 7)
+        result["bytes"] = len(payload)
+        results["parser.{}".format(name)] = result
+
+    return results
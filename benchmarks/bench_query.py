@@ -0,0 +1,228 @@
+"""Loopback benchmarks of a whole query, from sending the request to returning the parsed result."""
+import selectors
+import socket
+import threading
+import time
+import typing
+
+from a2squery import A2SQuery, A2SResponder, FleetScanner, RequestType
+from a2squery.batchio import open_io
+from a2squery.encoder import split_response
+from a2squery.parser import Parser
+
+from .corpus import corpus, packet
+
+CHALLENGE = b"\xff\xff\xff\xffA\x0a\x08\x5e\xea"
+# The payload carried by each split packet, after its 12 byte header.
+SPLIT_SIZE = 1248
+
+
+class LoopbackServer:
+    """Answers A2S requests on a few loopback ports, with a challenge first and split packets for large responses."""
+
+    def __init__(self, ports: int = 1):
+        payloads = corpus()
+        responses = {
+            RequestType.Info.value: packet(*payloads["source_info"]),
+            RequestType.Player.value: packet(*payloads["players_64"]),
+            RequestType.Rules.value: packet(*payloads["rules_500"]),
+        }
+        self._responses = {
+            request_type: split_response(data, request_type, SPLIT_SIZE + 12)
+            for request_type, data in responses.items()
+        }
+
+        self._selector = selectors.DefaultSelector()
+        self._sockets = []
+        self._running = True
+        self.addresses = []
+
+        for _ in range(ports):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.bind(("127.0.0.1", 0))
+            sock.setblocking(False)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+            self._selector.register(sock, selectors.EVENT_READ)
+            self._sockets.append(sock)
+            self.addresses.append(sock.getsockname())
+
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while self._running:
+            for key, _ in self._selector.select(0.1):
+                while True:
+                    try:
+                        data, client = key.fileobj.recvfrom(1400)
+                    except (BlockingIOError, InterruptedError):
+                        break
+
+                    if not data.endswith(CHALLENGE[5:]):
+                        key.fileobj.sendto(CHALLENGE, client)
+                        continue
+
+                    for response in self._responses[data[4]]:
+                        key.fileobj.sendto(response, client)
+
+    def close(self):
+        self._running = False
+        self._thread.join()
+        for sock in self._sockets:
+            self._selector.unregister(sock)
+            sock.close()
+        self._selector.close()
+
+
+def _percentile(values: typing.List[float], percentile: float) -> float:
+    return values[min(int(len(values) * percentile), len(values) - 1)]
+
+
+def latency(server: LoopbackServer, request_type: RequestType, count: int) -> typing.Dict[str, float]:
+    """Time ``count`` sequential requests over one :class:`a2squery.A2SQuery`, challenge already cached."""
+    method = {RequestType.Info: "info", RequestType.Player: "players", RequestType.Rules: "rules"}[request_type]
+    times = []
+
+    with A2SQuery(*server.addresses[0], timeout=2) as a2s:
+        query = getattr(a2s, method)
+        query()
+
+        for _ in range(count):
+            started = time.perf_counter()
+            query()
+            times.append(time.perf_counter() - started)
+
+    times.sort()
+    return {
+        "time_us": _percentile(times, 0.5) * 1e6,
+        "p50_ms": _percentile(times, 0.5) * 1e3,
+        "p90_ms": _percentile(times, 0.9) * 1e3,
+        "p99_ms": _percentile(times, 0.99) * 1e3,
+        "requests_per_sec": count / sum(times),
+        "number": count,
+    }
+
+
+def throughput(server: LoopbackServer, count: int, batch_size: int = 32) -> typing.Dict[str, float]:
+    """Time a :class:`a2squery.FleetScanner` info scan of ``count`` targets spread over the server's ports."""
+    targets = [server.addresses[index % len(server.addresses)] for index in range(count)]
+
+    with FleetScanner(timeout=2, max_in_flight=len(server.addresses), batch_size=batch_size) as scanner:
+        list(scanner.scan(server.addresses))
+
+        started = time.perf_counter()
+        results = list(scanner.scan(targets))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "time_us": elapsed / count * 1e6,
+        "requests_per_sec": count / elapsed,
+        "errors": sum(result.error is not None for result in results),
+        "number": count,
+    }
+
+
+def responder(count: int, window: int = 64) -> typing.Dict[str, float]:
+    """Time ``count`` info queries answered by an :class:`a2squery.A2SResponder`, ``window`` of them in flight at once."""
+    payloads = corpus()
+    server = A2SResponder(
+        Parser.parse_source_info(payloads["source_info"][1]), Parser.parse_players(payloads["players_64"][1]),
+        Parser.parse_rules(payloads["rules_500"][1])
+    )
+    server.start()
+
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client.settimeout(2)
+    client.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+    client.connect(server.address)
+
+    try:
+        request = b"\xff\xff\xff\xffTSource Engine Query\x00"
+        client.send(request + b"\xff\xff\xff\xff")
+        request += client.recv(1400)[5:]
+
+        answered = 0
+        started = time.perf_counter()
+
+        while answered < count:
+            burst = min(window, count - answered)
+            for _ in range(burst):
+                client.send(request)
+            for _ in range(burst):
+                client.recv(1400)
+            answered += burst
+
+        elapsed = time.perf_counter() - started
+    finally:
+        client.close()
+        server.close()
+
+    return {"time_us": elapsed / count * 1e6, "requests_per_sec": count / elapsed, "number": count}
+
+
+def datagrams(count: int, batch_size: int) -> typing.Dict[str, float]:
+    """Time sending ``count`` info requests to a loopback socket and receiving them again, ``batch_size`` per system call."""
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(("127.0.0.1", 0))
+    receiver.setblocking(False)
+    receiver.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sender.setblocking(False)
+
+    # Bursts of 64 fit in the receive buffer, so none are dropped.
+    entries = [(b"\xff\xff\xff\xffTSource Engine Query\x00\xff\xff\xff\xff", receiver.getsockname())] * 64
+    send, receive = open_io(sender, batch_size), open_io(receiver, batch_size)
+    received = 0
+
+    try:
+        started = time.perf_counter()
+
+        while received < count:
+            sent = 0
+            while sent < len(entries):
+                sent += send.send(entries, sent)
+
+            # Nothing should be lost on loopback, but if something is, fail instead of waiting for it forever.
+            deadline = time.perf_counter() + 2
+
+            while sent:
+                datagrams = receive.receive()
+
+                if not datagrams:
+                    if time.perf_counter() > deadline:
+                        raise socket.timeout("{} of {} datagrams were lost".format(sent, len(entries)))
+                    continue
+
+                sent -= len(datagrams)
+                received += len(datagrams)
+
+        elapsed = time.perf_counter() - started
+    finally:
+        sender.close()
+        receiver.close()
+
+    return {
+        "time_us": elapsed / received * 1e6,
+        "packets_per_sec": received / elapsed,
+        "backend": type(send).__name__,
+        "number": received,
+    }
+
+
+def run(quick: bool = False) -> typing.Dict[str, typing.Dict[str, float]]:
+    count = 200 if quick else 2000
+    server = LoopbackServer(ports=32)
+
+    try:
+        return {
+            "query.info": latency(server, RequestType.Info, count),
+            "query.players_64": latency(server, RequestType.Player, count),
+            "query.rules_500": latency(server, RequestType.Rules, count),
+            "scan.info": throughput(server, count * 5),
+            "scan.info.unbatched": throughput(server, count * 5, batch_size=1),
+            "datagrams.sendto": datagrams(count * 50, 1),
+            "datagrams.sendmmsg": datagrams(count * 50, 64),
+            "responder.info": responder(count * 10),
+        }
+    finally:
+        server.close()
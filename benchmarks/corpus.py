@@ -0,0 +1,94 @@
+"""Realistic A2S payloads for the benchmarks.
+
+Payloads are the bytes after the 4 byte header and the response type, which is what the
+:class:`a2squery.parser.Parser` methods take.
+"""
+import random
+import struct
+import typing
+
+_SOURCE_HEADER = b"\xff\xff\xff\xffI"
+_GOLDSOURCE_HEADER = b"\xff\xff\xff\xffm"
+_PLAYER_HEADER = b"\xff\xff\xff\xffD"
+_RULES_HEADER = b"\xff\xff\xff\xffE"
+
+_NAMES = (
+    "xX_Sniper_Xx", "Дмитрий", "プレイヤー", "[CLAN] Anonymous", "player", "ξένος", "a" * 31, "Bot Wesley",
+)
+
+
+def _string(value: str) -> bytes:
+    return value.encode("utf-8") + b"\x00"
+
+
+def source_info(
+        name: str = "Valve Matchmaking Server (Washington srcds1043-eat1 #47)", players: int = 64,
+        keywords: str = "empty,secure,valve_ds,hidden,bhop,awp,128tick,surf,kz,fastdl,rtv,nominate,mapchooser,rank"
+) -> bytes:
+    return b"".join((
+        b"\x11", _string(name), _string("de_dust2"), _string("csgo"), _string("Counter-Strike: Global Offensive"),
+        struct.pack("<HBBB", 730, players, 64, 0), b"dl\x00\x01", _string("1.38.4.4"),
+        b"\xb1", struct.pack("<HQ", 27015, 85568392924437989), _string(keywords), struct.pack("<Q", 730)
+    ))
+
+
+def goldsource_info(modded: bool = True) -> bytes:
+    mod = b""
+    if modded:
+        mod = _string("http://www.counter-strike.net") + _string("") + struct.pack("<LL", 1, 184000000) + b"\x00\x01"
+
+    return b"".join((
+        _string("127.0.0.1:27015"), _string("Counter-Strike 1.6 Public | dust2 only"), _string("de_dust2"),
+        _string("cstrike"), _string("Counter-Strike"), struct.pack("<BBB", 32, 32, 47), b"dl\x00",
+        b"\x01" if modded else b"\x00", mod, b"\x01\x00"
+    ))
+
+
+def players(count: int = 64, ship: bool = False, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    entries = [struct.pack("<B", count)]
+
+    for index in range(count):
+        name = "{} {}".format(rng.choice(_NAMES), index)
+        entries.append(struct.pack("<B", index) + _string(name) + struct.pack("<lf", rng.randint(-5, 80), rng.uniform(0, 7200)))
+
+    if ship:
+        entries.extend(struct.pack("<ll", rng.randint(0, 30), rng.randint(0, 16000)) for _ in range(count))
+
+    return b"".join(entries)
+
+
+def rules(count: int = 500, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    entries = [struct.pack("<H", count)]
+
+    for index in range(count):
+        value = rng.choice(("0", "1", "128", "0.000000", "de_dust2,de_inferno,de_mirage", "http://fastdl.example.com/csgo/"))
+        entries.append(_string("sm_plugin_cvar_{}".format(index)) + _string(value))
+
+    return b"".join(entries)
+
+
+def corpus() -> typing.Dict[str, typing.Tuple[str, bytes]]:
+    """Get every benchmark payload by name, with the name of the :class:`a2squery.parser.Parser` method that parses it."""
+    return {
+        "source_info": ("parse_source_info", source_info()),
+        "source_info_empty_keywords": ("parse_source_info", source_info(name="server", players=0, keywords="")),
+        "goldsource_info": ("parse_goldsource_info", goldsource_info(modded=False)),
+        "goldsource_info_modded": ("parse_goldsource_info", goldsource_info(modded=True)),
+        "players_0": ("parse_players", players(0)),
+        "players_16": ("parse_players", players(16)),
+        "players_64": ("parse_players", players(64)),
+        "players_64_ship": ("parse_players", players(64, ship=True)),
+        "rules_20": ("parse_rules", rules(20)),
+        "rules_500": ("parse_rules", rules(500)),
+    }
+
+
+def packet(method: str, payload: bytes) -> bytes:
+    """Get the whole response packet of a payload."""
+    header = {
+        "parse_source_info": _SOURCE_HEADER, "parse_goldsource_info": _GOLDSOURCE_HEADER,
+        "parse_players": _PLAYER_HEADER, "parse_rules": _RULES_HEADER,
+    }[method]
+    return header + payload
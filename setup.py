@@ -18,7 +18,8 @@ with open("README.md") as f:
 
 requirements = read_requirements("requirements.txt")
 extras_require = {
-    "docs": read_requirements("docs/requirements.txt")
+    "docs": read_requirements("docs/requirements.txt"),
+    "numpy": ["numpy"]
 }
 
 setup(name="a2squery",
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import unittest
+from random import randint
+
+from a2squery import AsyncA2SQuery, SourceInfo, GoldSourceInfo, Player
+from tests.test_query import A2SMockServer
+
+
+class TestAsyncA2SQuery(unittest.TestCase):
+
+    def setUp(self):
+        while True:
+            try:
+                port = randint(1024, 65535)
+
+                self.server = A2SMockServer("127.0.0.1", port)
+                self.a2s = AsyncA2SQuery("127.0.0.1", port, timeout=2)
+
+                break
+            except OSError:
+                pass
+
+        self.loop = asyncio.new_event_loop()
+        self.server_thread = threading.Thread(target=self.server.recv)
+        self.server_thread.start()
+
+    def run_async(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def test_source_info(self):
+        self.server.set_use_goldsource_info(False)
+        info = self.run_async(self.a2s.info())
+        self.assertTrue(isinstance(info, SourceInfo))
+        self.assertEqual(dict(info)["name"], "Server Name")
+
+    def test_goldsource_info(self):
+        self.server.set_use_goldsource_info(True)
+        info = self.run_async(self.a2s.info())
+        self.assertTrue(isinstance(info, GoldSourceInfo))
+        self.assertEqual(dict(info)["name"], "name")
+
+    def test_players(self):
+        players = self.run_async(self.a2s.players())
+        self.assertTrue(isinstance(players[1], Player))
+        self.assertEqual(players[0].name, "Player 0")
+
+    def test_rules(self):
+        self.assertEqual(self.run_async(self.a2s.rules()).get("a2squery"), "bruh momentum")
+
+    def test_concurrent_requests(self):
+        async def query_all():
+            return await asyncio.gather(self.a2s.info(), self.a2s.players(), self.a2s.rules())
+
+        info, players, rules = self.run_async(query_all())
+        self.assertTrue(isinstance(info, SourceInfo))
+        self.assertEqual(len(players), 4)
+        self.assertEqual(rules.get("a2squery"), "bruh momentum")
+
+    def test_concurrent_connect(self):
+        endpoints = []
+        create = self.loop.create_datagram_endpoint
+
+        async def counted(*args, **kwargs):
+            endpoints.append(await create(*args, **kwargs))
+            return endpoints[-1]
+
+        self.loop.create_datagram_endpoint = counted
+
+        async def query_all():
+            return await asyncio.gather(*[self.a2s.info() for _ in range(5)])
+
+        self.assertTrue(all(isinstance(info, SourceInfo) for info in self.run_async(query_all())))
+        self.assertEqual(len(endpoints), 1)
+
+    def tearDown(self):
+        self.server.close()
+        self.a2s.close()
+        self.loop.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
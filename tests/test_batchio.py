@@ -0,0 +1,121 @@
+import errno
+import socket
+import unittest
+
+from a2squery import A2SResponder, FleetScanner, RequestType
+from a2squery import batchio
+from a2squery.batchio import DatagramIO, MMsgIO, open_io
+from a2squery.parser import Parser
+from tests.test_parser import INFO, PLAYERS
+
+RULES = {"rule_{}".format(index): "x" * 20 for index in range(200)}
+
+
+class TestBatchIO(unittest.TestCase):
+
+    def setUp(self):
+        self.receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.receiver.bind(("127.0.0.1", 0))
+        self.receiver.setblocking(False)
+        self.sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sender.bind(("127.0.0.1", 0))
+        self.sender.setblocking(False)
+
+    def tearDown(self):
+        self.receiver.close()
+        self.sender.close()
+
+    def exchange(self, batch_size: int, entries):
+        send, receive = open_io(self.sender, batch_size), open_io(self.receiver, batch_size)
+
+        sent = 0
+        while sent < len(entries):
+            sent += send.send(entries, sent)
+
+        received = []
+        while True:
+            datagrams = receive.receive()
+            if not datagrams:
+                return received
+            received.extend((bytes(receive.buffer[offset:offset + size]), address) for offset, size, address in datagrams)
+
+    def test_fallback(self):
+        self.assertIs(type(open_io(self.sender, 1)), DatagramIO)
+
+        entries = [(bytes([index]) * 10, self.receiver.getsockname()) for index in range(10)]
+        self.assertEqual(self.exchange(1, entries), [(data, self.sender.getsockname()) for data, _ in entries])
+
+    @unittest.skipIf(batchio._libc is None, "sendmmsg and recvmmsg are not available")
+    def test_batched(self):
+        self.assertIsInstance(open_io(self.sender, 8), MMsgIO)
+
+        # More entries than fit in one batch, and one too large for a send slot.
+        entries = [(bytes([index]) * (index + 1), self.receiver.getsockname()) for index in range(20)]
+        entries.insert(5, (b"\xff" * (batchio.SEND_SIZE + 1), self.receiver.getsockname()))
+        self.assertEqual(self.exchange(8, entries), [(data, self.sender.getsockname()) for data, _ in entries])
+
+    @unittest.skipIf(batchio._libc is None, "sendmmsg and recvmmsg are not available")
+    def test_send_error(self):
+        io = open_io(self.sender, 8)
+        entries = [(b"a", self.receiver.getsockname()), (b"b", ("127.0.0.1", 0)), (b"c", self.receiver.getsockname())]
+
+        self.assertEqual(io.send(entries), 1)
+        with self.assertRaises(OSError):
+            io.send(entries, 1)
+        self.assertEqual(io.send(entries, 2), 1)
+
+
+class TestBatchedScan(unittest.TestCase):
+
+    def setUp(self):
+        info = Parser.parse_source_info(INFO)
+        players = Parser.parse_players(PLAYERS)
+        self.responders = [A2SResponder(info, players, RULES) for _ in range(8)]
+        for responder in self.responders:
+            responder.start()
+
+    def tearDown(self):
+        for responder in self.responders:
+            responder.close()
+
+    def test_scan(self):
+        # Rules are split into several packets, which arrive interleaved with the other responders'.
+        targets = [responder.address for responder in self.responders] * 5
+
+        for batch_size in (1, 32):
+            with FleetScanner(timeout=2, batch_size=batch_size) as scanner:
+                results = list(scanner.scan(targets, RequestType.Rules))
+
+            self.assertEqual(len(results), len(targets))
+            for result in results:
+                self.assertIsNone(result.error)
+                self.assertEqual(result.result, RULES)
+
+    def test_send_failure(self):
+        with FleetScanner(timeout=2) as scanner:
+            results = {result.address: result for result in scanner.scan([("127.0.0.1", 0), self.responders[0].address])}
+
+        self.assertIsInstance(results["127.0.0.1", 0].error, OSError)
+        self.assertIsNone(results[self.responders[0].address].error)
+
+    def test_receive_errors(self):
+        target = self.responders[0].address
+
+        for error, raised in ((ConnectionRefusedError(errno.ECONNREFUSED, "refused"), False), (OSError(errno.EBADF, "closed"), True)):
+            with self.subTest(error=error), FleetScanner(timeout=2) as scanner:
+                io = scanner._ios[0]
+                receive = io.receive
+                errors = [error]
+
+                def failing():
+                    if errors:
+                        raise errors.pop()
+                    return receive()
+
+                io.receive = failing
+
+                if raised:
+                    with self.assertRaises(OSError):
+                        list(scanner.scan([target]))
+                else:
+                    self.assertIsNone(next(iter(scanner.scan([target]))).error)
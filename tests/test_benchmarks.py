@@ -0,0 +1,24 @@
+import unittest
+
+from a2squery.parser import Parser
+from benchmarks.corpus import corpus
+
+
+class TestCorpus(unittest.TestCase):
+
+    def test_payloads_parse(self):
+        for name, (method, payload) in corpus().items():
+            with self.subTest(name):
+                getattr(Parser, method)(payload)
+
+    def test_sizes(self):
+        payloads = corpus()
+
+        self.assertEqual(len(Parser.parse_players(payloads["players_64"][1])), 64)
+        self.assertIsNotNone(Parser.parse_players(payloads["players_64_ship"][1])[63].money)
+        self.assertEqual(len(Parser.parse_rules(payloads["rules_500"][1])), 500)
+        self.assertEqual(Parser.parse_source_info(payloads["source_info"][1]).game_id, 730)
+
+
+if __name__ == "__main__":
+    unittest.main()
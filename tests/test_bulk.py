@@ -0,0 +1,89 @@
+import io
+import os
+import struct
+import tempfile
+import unittest
+
+from a2squery import Player, ResponseType, SourceInfo
+from a2squery.bulk import parse_file, parse_records, write_records
+from a2squery.exceptions import InvalidResponse
+from benchmarks.corpus import corpus, packet
+
+INFO = packet(*corpus()["source_info"])
+PLAYERS = packet(*corpus()["players_16"])
+RULES = packet(*corpus()["rules_500"])
+CHALLENGE = b"\xff\xff\xff\xffA\x0a\x08\x5e\xea"
+
+
+def split(data: bytes, response_id: int, size: int = 1200):
+    chunks = [data[offset: offset + size] for offset in range(0, len(data), size)]
+    return [struct.pack("<lLBBH", -2, response_id, len(chunks), number, size) + chunk for number, chunk in enumerate(chunks)]
+
+
+class TestBulk(unittest.TestCase):
+
+    def test_records(self):
+        fragments = split(RULES, 7)
+        records = list(parse_records([INFO, CHALLENGE, b"\xff\xff\xff\xffZ", *fragments[1:], PLAYERS, fragments[0], INFO[:20]]))
+
+        last = 3 + len(fragments)
+        self.assertEqual([record.index for record in records], [0, 1, 2, last - 1, last, last + 1])
+        self.assertTrue(isinstance(records[0].result, SourceInfo))
+        self.assertEqual(records[1].result, -362936310)
+        self.assertTrue(isinstance(records[2].error, ValueError))
+        self.assertTrue(isinstance(records[3].result[0], Player))
+        self.assertEqual(records[4].response_type, ResponseType.Rules)
+        self.assertEqual(len(records[4].result), 500)
+        self.assertIsNotNone(records[5].error)
+
+    def test_colliding_ids(self):
+        # Two servers used split id 7. The first response lost its last fragment.
+        first = split(RULES, 7, 800)[:-1]
+        second = split(PLAYERS, 7, 200)
+        records = list(parse_records([*first, *second]))
+
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0].response_type, ResponseType.Player)
+        self.assertEqual(
+            [dict(player) for player in records[0].result],
+            [dict(player) for player in next(parse_records([PLAYERS])).result]
+        )
+
+        # A fragment that disagrees with its response about the number of fragments is rejected.
+        records = list(parse_records([first[0], second[1], *first[1:]]))
+        self.assertTrue(isinstance(records[0].error, InvalidResponse))
+        self.assertEqual(records[0].index, 1)
+
+    def test_distance(self):
+        fragments = split(RULES, 3)
+        records = list(parse_records([fragments[0], *[INFO] * 5000, *fragments[1:]]))
+
+        self.assertEqual(len(records), 5000)
+        self.assertTrue(all(record.response_type is ResponseType.InfoSource for record in records))
+
+    def test_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "capture.bin")
+
+            with open(path, "wb") as f:
+                self.assertEqual(write_records(f, [INFO, PLAYERS] * 100 + split(RULES, 1)), 200 + len(split(RULES, 1)))
+                f.write(b"\x10\x00\x00\x00\xff")
+
+            records = list(parse_file(path))
+
+        self.assertEqual(len(records), 202)
+        self.assertEqual(records[1].offset, 4 + len(INFO))
+        self.assertEqual(len(records[200].result), 500)
+        self.assertTrue(isinstance(records[201].error, InvalidResponse))
+        self.assertEqual(records[201].index, 200 + len(split(RULES, 1)))
+
+    def test_lazy_buffer(self):
+        capture = io.BytesIO()
+        write_records(capture, [INFO])
+
+        record = next(parse_file(capture, lazy=True))
+        self.assertEqual(record.result.app_id, 730)
+
+
+if __name__ == "__main__":
+    unittest.main()
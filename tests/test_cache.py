@@ -0,0 +1,96 @@
+import socket
+import threading
+import time
+import unittest
+
+from a2squery import ResponseCache, RequestType, RTTEstimator
+
+ADDRESS = ("127.0.0.1", 27015)
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ResponseCache(ttl={RequestType.Info: 0.05}, stale_ttl=0.5, max_size=2)
+        self.calls = 0
+
+    def fetch(self):
+        self.calls += 1
+        time.sleep(0.05)
+        return self.calls
+
+    def test_hit_and_miss(self):
+        self.assertEqual(self.cache.get(ADDRESS, RequestType.Info, self.fetch), 1)
+        self.assertEqual(self.cache.get(ADDRESS, RequestType.Info, self.fetch), 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_stale_while_revalidate(self):
+        self.cache.get(ADDRESS, RequestType.Info, self.fetch)
+        time.sleep(0.06)
+
+        self.assertEqual(self.cache.get(ADDRESS, RequestType.Info, self.fetch), 1)
+        self.assertEqual(self.cache.stale_hits, 1)
+
+        time.sleep(0.08)
+        self.assertEqual(self.cache.get(ADDRESS, RequestType.Info, self.fetch), 2)
+
+    def test_coalescing(self):
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.cache.get(ADDRESS, RequestType.Rules, self.fetch)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [1] * 5)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.cache.coalesced, 4)
+
+    def test_lru_eviction(self):
+        for port in range(3):
+            self.cache.get(("127.0.0.1", port), RequestType.Rules, lambda: port)
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.evictions, 1)
+
+    def test_errors_are_not_cached(self):
+        def fail():
+            raise OSError("unreachable")
+
+        with self.assertRaises(OSError):
+            self.cache.get(ADDRESS, RequestType.Player, fail)
+        self.assertEqual(self.cache.get(ADDRESS, RequestType.Player, self.fetch), 1)
+
+    def test_interrupted_fetch(self):
+        def interrupt():
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            self.cache.get(ADDRESS, RequestType.Info, interrupt)
+        self.assertEqual(self.cache.get(ADDRESS, RequestType.Info, self.fetch), 1)
+
+    def test_rtt_eviction(self):
+        self.cache.get(("127.0.0.1", 0), RequestType.Rules, lambda: 0)
+        self.cache._rtt["127.0.0.1", 0] = RTTEstimator()
+
+        for port in (1, 2):
+            self.cache.get(("127.0.0.1", port), RequestType.Rules, lambda: port)
+        self.assertEqual(self.cache._rtt, {})
+
+        dead = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        dead.bind(("127.0.0.1", 0))
+        self.cache.timeout = 0.1
+        with self.assertRaises(socket.timeout):
+            self.cache.info(*dead.getsockname())
+        dead.close()
+        self.assertEqual(self.cache._rtt, {})
+
+    def tearDown(self):
+        self.cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
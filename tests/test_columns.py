@@ -0,0 +1,37 @@
+import unittest
+
+from a2squery import PlayerColumns
+from a2squery.columns import numpy
+from a2squery.parser import Parser
+
+PLAYERS = b"\x02\x00Player 0\x00\x03\x00\x00\x00\x00\xa8\xc1E\x00Player 1\x00\x00\x00\x00\x00\x00@8C"
+SHIP_PLAYERS = b"\x01\x05Ship\x00\x07\x00\x00\x00\x00\x00\x80?\x02\x00\x00\x00\xe8\x03\x00\x00"
+EMPTY = b"\x00"
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class TestPlayerColumns(unittest.TestCase):
+
+    def setUp(self):
+        self.payloads = [PLAYERS, EMPTY, SHIP_PLAYERS]
+        self.columns = PlayerColumns.from_payloads(self.payloads)
+
+    def test_columns(self):
+        self.assertEqual(len(self.columns), 3)
+        self.assertEqual(self.columns.server_id.tolist(), [0, 0, 2])
+        self.assertEqual(self.columns.score.tolist(), [3, 0, 7])
+        self.assertEqual(self.columns.extended.tolist(), [False, False, True])
+        self.assertEqual(self.columns.name(1), "Player 1")
+
+    def test_aggregations(self):
+        self.assertEqual(self.columns.players_per_server().tolist(), [2, 0, 1])
+        self.assertEqual(self.columns.score_per_server().tolist(), [3, 0, 7])
+
+    def test_players_view(self):
+        for server_id, payload in enumerate(self.payloads):
+            expected = [dict(player) for player in Parser.parse_players(payload)]
+            self.assertEqual([dict(player) for player in self.columns.players(server_id)], expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import pickle
+import unittest
+
+from a2squery import Player, SourceInfo
+
+
+class TestData(unittest.TestCase):
+
+    def test_mapping_api(self):
+        player = Player(index=0, name="Player 0", score=3, duration=1.5)
+
+        self.assertEqual(player["name"], "Player 0")
+        self.assertEqual(player.get("money", 10), 10)
+        self.assertEqual(list(player.keys()), ["index", "name", "score", "duration", "deaths", "money"])
+        self.assertEqual(dict(player)["score"], 3)
+        self.assertEqual(player.items()[0], ("index", 0))
+
+        with self.assertRaises(KeyError):
+            Player(nickname="Player 0")
+        with self.assertRaises(KeyError):
+            player["nickname"]
+
+    def test_slots(self):
+        player = Player._make(0, "Player 0", 3, 1.5)
+
+        self.assertFalse(hasattr(player, "__dict__"))
+        self.assertIsNone(player.deaths)
+        with self.assertRaises(AttributeError):
+            player.nickname = "Player 0"
+
+    def test_pickle(self):
+        info = SourceInfo._make(
+            17, "name", "map", "folder", "game", 730, 1, 2, 0, None, None, False, True, "1.0", 0
+        )
+
+        self.assertEqual(dict(pickle.loads(pickle.dumps(info))), dict(info))
+
+
+if __name__ == "__main__":
+    unittest.main()
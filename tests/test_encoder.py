@@ -0,0 +1,56 @@
+import unittest
+
+from a2squery import SourceInfo, Player, ResponseType, ServerType, Environment
+from a2squery.encoder import Encoder, pack_response, split_response
+from a2squery.parser import Parser
+from a2squery.reassembly import SplitPacketAssembler
+from tests.test_parser import INFO, GOLDSOURCE_INFO, PLAYERS
+
+SHIP_INFO = SourceInfo(
+    protocol=7, name="The Ship", map="batavier", folder="ship", game="The Ship", app_id=2400,
+    players=3, max_players=16, bots=0, server_type=ServerType.Dedicated, environment=Environment.Windows,
+    password=False, vac=True, mode=1, witnesses=2, duration=3, version="1.0.0.4", extra_data_flag=None,
+    spectator_port=27020, spectator_name="SourceTV",
+)
+
+
+class TestEncoder(unittest.TestCase):
+
+    def test_round_trip(self):
+        for payload, method in (
+                # The GoldSource fixture ends with a byte that the parser does not read.
+                (INFO, "source_info"), (GOLDSOURCE_INFO[:-1], "goldsource_info"), (PLAYERS, "players"),
+                (b"\x02\x00a2squery\x00bruh momentum\x00sv_cheats\x000\x00", "rules"),
+        ):
+            with self.subTest(method):
+                parsed = getattr(Parser, "parse_" + method)(payload)
+                self.assertEqual(getattr(Encoder, "encode_" + method)(parsed), payload)
+
+    def test_extra_data_flag(self):
+        info = Parser.parse_source_info(Encoder.encode_source_info(SHIP_INFO))
+
+        self.assertEqual(info.extra_data_flag, 0x40)
+        self.assertEqual((info.mode, info.witnesses, info.duration), (1, 2, 3))
+        self.assertEqual(info.spectator_name, "SourceTV")
+        self.assertIsNone(info.port)
+
+    def test_ship_players(self):
+        players = [Player(index=0, name="a", score=1, duration=2.5, deaths=3, money=4)]
+        self.assertEqual(dict(Parser.parse_players(Encoder.encode_players(players))[0]), dict(players[0]))
+
+    def test_split(self):
+        rules = {"rule_{}".format(index): "value" for index in range(300)}
+        packet = pack_response(ResponseType.Rules, Encoder.encode_rules(rules))
+        datagrams = split_response(packet, 7, 1000)
+
+        self.assertGreater(len(datagrams), 1)
+        self.assertTrue(all(len(datagram) <= 1000 for datagram in datagrams))
+
+        assembler = SplitPacketAssembler()
+        results = [assembler.feed(datagram) for datagram in reversed(datagrams)]
+        self.assertEqual(results[-1], packet)
+        self.assertEqual(split_response(packet[:100], 7), [packet[:100]])
+
+
+if __name__ == "__main__":
+    unittest.main()
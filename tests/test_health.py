@@ -0,0 +1,80 @@
+import socket
+import unittest
+
+from a2squery import A2SQuery, FleetScanner, HealthTracker, RequestType, ServerState
+from a2squery.exceptions import ServerDown
+
+ADDRESS = ("127.0.0.1", 27015)
+
+
+class TestHealthTracker(unittest.TestCase):
+
+    def test_down_after_threshold(self):
+        health = HealthTracker(failure_threshold=2, backoff=30)
+
+        health.record_failure(ADDRESS)
+        self.assertIs(health.state(ADDRESS), ServerState.Up)
+        health.check(ADDRESS)
+
+        health.record_failure(ADDRESS)
+        self.assertIs(health.state(ADDRESS), ServerState.Down)
+
+        with self.assertRaises(ServerDown) as context:
+            health.check(ADDRESS)
+        self.assertEqual(context.exception.address, ADDRESS)
+        self.assertGreater(context.exception.retry_in, 29)
+
+    def test_probe_and_recover(self):
+        health = HealthTracker(failure_threshold=1, backoff=0)
+
+        health.record_failure(ADDRESS)
+        health.check(ADDRESS)
+        self.assertIs(health.state(ADDRESS), ServerState.Probing)
+
+        health.record_success(ADDRESS)
+        self.assertIs(health.state(ADDRESS), ServerState.Up)
+        self.assertEqual(health.servers()[0].failures, 0)
+
+    def test_failed_probe_backs_off(self):
+        health = HealthTracker(failure_threshold=1, backoff=0)
+
+        health.record_failure(ADDRESS)
+        health.check(ADDRESS)
+        health.backoff = 10
+        health.record_failure(ADDRESS)
+
+        self.assertIs(health.state(ADDRESS), ServerState.Down)
+        self.assertEqual(health.servers()[0].probes, 1)
+        self.assertRaises(ServerDown, health.check, ADDRESS)
+
+
+class TestHealthIntegration(unittest.TestCase):
+
+    def setUp(self):
+        self.dead = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.dead.bind(("127.0.0.1", 0))
+        self.health = HealthTracker(failure_threshold=1)
+
+    def test_query_fails_fast(self):
+        with A2SQuery(*self.dead.getsockname(), timeout=0.2, retries=0, health=self.health) as a2s:
+            self.assertRaises(socket.timeout, a2s.info)
+            self.assertRaises(ServerDown, a2s.info)
+
+        self.assertIsInstance(self.health.servers()[0].last_error, socket.timeout)
+
+    def test_scanner_skips_down_servers(self):
+        scanner = FleetScanner(timeout=0.2, retries=0, health=self.health)
+
+        first = list(scanner.scan([self.dead.getsockname()], RequestType.Info))
+        second = list(scanner.scan([self.dead.getsockname()], RequestType.Info))
+        scanner.close()
+
+        self.assertIsInstance(first[0].error, socket.timeout)
+        self.assertIsInstance(second[0].error, ServerDown)
+
+    def tearDown(self):
+        self.dead.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import asyncio
+import socket
+import struct
+import threading
+import unittest
+
+from a2squery import AsyncMasterServerQuery, MasterServerQuery, Region
+
+SERVERS = [("10.0.{}.{}".format(index // 256, index % 256), 27015 + index % 3) for index in range(10)]
+
+
+class MasterMockServer:
+
+    def __init__(self, page_size: int = 4, late: bool = False):
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.settimeout(0.1)
+        self._socket.bind(("127.0.0.1", 0))
+        self._page_size = page_size
+        self._late = late
+        self._previous = None
+        self._should_exit = False
+        self.address = self._socket.getsockname()
+        self.requests = []
+
+    def close(self):
+        self._should_exit = True
+        self._socket.close()
+
+    def recv(self):
+        while not self._should_exit:
+            try:
+                data, client = self._socket.recvfrom(65535)
+            except OSError:
+                continue
+
+            region = data[1]
+            seed, filter = data[2:].decode("utf-8").split("\x00")[:2]
+            self.requests.append((region, seed, filter))
+
+            host, port = seed.split(":")
+            start = 0 if seed == "0.0.0.0:0" else SERVERS.index((host, int(port))) + 1
+            page = SERVERS[start:start + self._page_size]
+            if start + self._page_size >= len(SERVERS):
+                page = page + [("0.0.0.0", 0)]
+
+            reply = b"\xff\xff\xff\xff\x66\x0a" + b"".join(struct.pack(">4sH", socket.inet_aton(h), p) for h, p in page)
+
+            # A late reply to a retransmission of the previous request arrives first.
+            if self._late and self._previous is not None:
+                self._socket.sendto(self._previous, client)
+            self._previous = reply
+
+            self._socket.sendto(reply, client)
+
+
+class TestMasterServerQuery(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MasterMockServer()
+        self.thread = threading.Thread(target=self.server.recv)
+        self.thread.start()
+
+    def test_servers(self):
+        with MasterServerQuery(*self.server.address, timeout=1) as master:
+            servers = list(master.servers(Region.Europe, {"appid": 730, "empty": True}))
+
+        self.assertEqual(servers, SERVERS)
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(self.server.requests[0], (Region.Europe.value, "0.0.0.0:0", "\\appid\\730\\empty\\1"))
+        self.assertEqual(self.server.requests[1][1], "{}:{}".format(*SERVERS[3]))
+
+    def test_first_page_streams(self):
+        with MasterServerQuery(*self.server.address, timeout=1) as master:
+            servers = master.servers(filter="\\appid\\440")
+            self.assertEqual(next(servers), SERVERS[0])
+
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_async_servers(self):
+        async def collect():
+            async with AsyncMasterServerQuery(*self.server.address, timeout=1) as master:
+                return [address async for address in master.servers(Region.World)]
+
+        loop = asyncio.new_event_loop()
+        self.assertEqual(loop.run_until_complete(collect()), SERVERS)
+        loop.close()
+
+    def test_late_replies(self):
+        self.server._late = True
+
+        with MasterServerQuery(*self.server.address, timeout=1) as master:
+            self.assertEqual(list(master.servers()), SERVERS)
+
+        async def collect():
+            async with AsyncMasterServerQuery(*self.server.address, timeout=1) as master:
+                return [address async for address in master.servers()]
+
+        self.server._previous = None
+        loop = asyncio.new_event_loop()
+        self.assertEqual(loop.run_until_complete(collect()), SERVERS)
+        loop.close()
+
+    def test_async_concurrent(self):
+        loop = asyncio.new_event_loop()
+        endpoints = []
+        create = loop.create_datagram_endpoint
+
+        async def counted(*args, **kwargs):
+            endpoints.append(await create(*args, **kwargs))
+            return endpoints[-1]
+
+        loop.create_datagram_endpoint = counted
+
+        async def collect(master):
+            return [address async for address in master.servers()]
+
+        async def collect_all(master):
+            return await asyncio.gather(*[collect(master) for _ in range(3)])
+
+        master = AsyncMasterServerQuery(*self.server.address, timeout=1)
+        self.assertEqual(loop.run_until_complete(collect_all(master)), [SERVERS] * 3)
+        self.assertEqual(len(endpoints), 1)
+        master.close()
+        loop.close()
+
+    def tearDown(self):
+        self.server.close()
+        self.thread.join()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import socket
+import threading
+import unittest
+
+from a2squery import A2SQuery, FleetScanner, HistogramCollector, Instrument, RequestType
+from a2squery.enums import ResponseType
+from tests.test_query import A2SMockServer
+
+
+class TraceList(Instrument):
+
+    def __init__(self):
+        self.traces = []
+
+    def record(self, trace):
+        self.traces.append(trace)
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.server = A2SMockServer("127.0.0.1", 0)
+        self.address = self.server._socket.getsockname()
+        self.thread = threading.Thread(target=self.server.recv)
+        self.thread.start()
+
+    def test_trace(self):
+        traces = TraceList()
+
+        with A2SQuery(*self.address, timeout=1, instrument=traces) as a2s:
+            a2s.info()
+            a2s.info()
+
+        first, second = traces.traces
+        self.assertEqual(first.request_type, RequestType.Info)
+        self.assertEqual(first.response_type, ResponseType.InfoSource)
+        self.assertEqual((first.attempts, first.challenges), (2, 1))
+        self.assertIsNotNone(first.challenge_rtt)
+        self.assertIsNotNone(first.first_byte)
+        self.assertIsNotNone(first.parse)
+        self.assertEqual(first.bytes_out, 29 + 29)
+        self.assertGreater(first.bytes_in, 9)
+        self.assertGreaterEqual(first.total, first.first_byte + first.challenge_rtt)
+
+        self.assertEqual((second.attempts, second.challenges), (1, 0))
+        self.assertIsNone(second.challenge_rtt)
+
+    def test_base_instrument(self):
+        with A2SQuery(*self.address, timeout=1, instrument=Instrument()) as a2s:
+            self.assertEqual(a2s.rules(), a2s.rules())
+
+    def test_prometheus(self):
+        collector = HistogramCollector()
+
+        with A2SQuery(*self.address, timeout=1, instrument=collector) as a2s:
+            a2s.rules()
+            a2s.snapshot()
+
+        dead = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        dead.bind(("127.0.0.1", 0))
+        with A2SQuery(*dead.getsockname(), timeout=0.1, retries=0, instrument=collector) as a2s:
+            self.assertRaises(socket.timeout, a2s.player)
+        dead.close()
+
+        text = collector.render()
+        self.assertIn('a2squery_requests_total{request_type="rules",outcome="ok"} 1', text)
+        self.assertIn('a2squery_request_duration_seconds_bucket{request_type="snapshot",le="+Inf"} 1', text)
+        self.assertIn('a2squery_parse_duration_seconds_count{request_type="rules"} 1', text)
+        self.assertEqual(collector.count(request_type="player", outcome="ok"), 0)
+        self.assertEqual(collector.count(request_type="player"), 1)
+        self.assertEqual(collector.count(), 3)
+
+    def test_scanner(self):
+        traces = TraceList()
+
+        with FleetScanner(timeout=1, instrument=traces) as scanner:
+            list(scanner.scan([self.address], RequestType.Player))
+
+        trace = traces.traces[0]
+        self.assertEqual(trace.challenges, 1)
+        self.assertEqual(trace.response_type, ResponseType.Player)
+        self.assertIsNone(trace.error)
+
+    def tearDown(self):
+        self.server.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import struct
+import unittest
+
+from a2squery import LazySourceInfo, LazyGoldSourceInfo, SourceInfo
+from a2squery.parser import Parser
+
+INFO = b"\x11Server Name\x00Map Name\x00Folder\x00Game\x00\x8a\x84'7\x00dw\x00\x001.64.144629\x00\xb1\xfe\x08\x06<\x88\x85\xf1S@\x01keywords\x00\x8a\x84\x00\x00\x00\x00\x00\x00"
+GOLDSOURCE_INFO = b"address\x00name\x00map\x00valve\x00Half-Life\x00\x14 /dw\x00\x01\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x01\x00\x01\x01"
+RULES = b"\x04\x00sv_tags\x00mp_timelimit\x00mp_timelimit\x0030\x00sv_cheats\x000\x00sv_tags\x00\x00"
+PLAYERS = b"\x02\x00Player 0\x00\x03\x00\x00\x00\x00\xa8\xc1E\x00Player 1\x00\x00\x00\x00\x00\x00@8C"
+
+
+class TestParser(unittest.TestCase):
+
+    def test_reused_buffer(self):
+        buffer = bytearray(64)
+        buffer[5: 5 + len(PLAYERS)] = PLAYERS
+
+        players = Parser.parse_players(buffer, 5, 5 + len(PLAYERS))
+        self.assertEqual([player.name for player in players], ["Player 0", "Player 1"])
+        self.assertIsNone(players[0].deaths)
+
+    def test_source_info(self):
+        info = Parser.parse_source_info(INFO)
+        self.assertEqual(info.name, "Server Name")
+        self.assertEqual(info.keywords, "keywords")
+        self.assertEqual(info.game_id, 33930)
+
+    def test_lazy_source_info(self):
+        lazy = LazySourceInfo.from_payload(INFO)
+
+        self.assertTrue(isinstance(lazy, SourceInfo))
+        self.assertEqual(lazy._anchors[2], 13)
+        self.assertIsNone(lazy._tail)
+        self.assertEqual(lazy.map, "Map Name")
+        self.assertEqual(dict(lazy), dict(Parser.parse_source_info(INFO)))
+
+    def test_lazy_goldsource_info(self):
+        self.assertEqual(dict(LazyGoldSourceInfo.from_payload(GOLDSOURCE_INFO)), dict(Parser.parse_goldsource_info(GOLDSOURCE_INFO)))
+
+    def test_rule_keys(self):
+        full = Parser.parse_rules(RULES)
+
+        for keys in (("mp_timelimit", "sv_tags", "missing"), ("sv_cheats",), ("sv_tags",), ()):
+            with self.subTest(keys=keys):
+                self.assertEqual(Parser.parse_rules(RULES, keys=keys), {key: full[key] for key in keys if key in full})
+
+        buffer = bytearray(8) + bytearray(RULES) + b"\x00\x00"
+        self.assertEqual(Parser.parse_rules(buffer, 8, len(buffer) - 2, keys=("sv_cheats", "sv_tags")), {"sv_cheats": "0", "sv_tags": ""})
+
+        # Rules after the rule count are ignored, as in a full parse, and a cut short response is an error.
+        extra = b"\x01" + RULES[1:] + b"sv_cheats\x001\x00"
+        self.assertEqual(Parser.parse_rules(extra), {"sv_tags": "mp_timelimit"})
+        self.assertEqual(Parser.parse_rules(extra, keys=("sv_cheats", "sv_tags")), {"sv_tags": "mp_timelimit"})
+        with self.assertRaises(struct.error):
+            Parser.parse_rules(RULES[:-2], keys=("sv_cheats",))
+
+    def test_player_fields(self):
+        players = Parser.parse_players(PLAYERS, fields=("name", "duration"))
+        full = Parser.parse_players(PLAYERS)
+
+        self.assertEqual([player.name for player in players], [player.name for player in full])
+        self.assertEqual([player.duration for player in players], [player.duration for player in full])
+        self.assertIsNone(players[0].score)
+        self.assertIsNone(players[0].index)
+
+        with self.assertRaises(ValueError):
+            Parser.parse_players(PLAYERS, fields=("kills",))
+        with self.assertRaises(struct.error):
+            Parser.parse_players(PLAYERS[:-2], fields=("name",))
+
+    def test_truncated(self):
+        buffer = bytearray(INFO) + bytearray(64)
+
+        with self.assertRaises(struct.error):
+            Parser.parse_source_info(buffer, 0, len(INFO) - 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
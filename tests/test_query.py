@@ -1,7 +1,7 @@
 import socket
 import unittest
 from random import randint
-from a2squery import A2SQuery, SourceInfo, GoldSourceInfo, Player
+from a2squery import A2SQuery, SourceInfo, GoldSourceInfo, Player, RequestType
 import threading
 
 
@@ -94,6 +94,10 @@ class TestA2SQuery(unittest.TestCase):
         self.assertTrue(isinstance(self.a2s.info(), SourceInfo))
         self.assertTrue(dict(self.a2s.info())["name"] == "Server Name")
 
+    def test_lazy_info(self):
+        self.server.set_use_goldsource_info(False)
+        self.assertTrue(self.a2s.info(lazy=True).name == "Server Name")
+
     def test_goldsource_info(self):
         self.server.set_use_goldsource_info(True)
         self.assertTrue(isinstance(self.a2s.info(), GoldSourceInfo))
@@ -108,6 +112,22 @@ class TestA2SQuery(unittest.TestCase):
     def test_rules(self):
         self.assertTrue(self.a2s.rules().get("a2squery") == "bruh momentum")
 
+    def test_snapshot(self):
+        snapshot = self.a2s.snapshot()
+        self.assertTrue(isinstance(snapshot.info, SourceInfo))
+        self.assertTrue(snapshot.players[0].name == "Player 0")
+        self.assertTrue(snapshot.rules.get("a2squery") == "bruh momentum")
+
+        self.assertTrue(isinstance(self.a2s.snapshot()["info"], SourceInfo))
+
+    def test_challenge_cache(self):
+        self.a2s.players()
+        challenge = self.a2s._challenges.get(self.a2s._address, RequestType.Player)
+        self.assertEqual(challenge, -362936310)
+
+        self.assertTrue(dict(self.a2s.players()[0])["name"] == "Player 0")
+        self.assertEqual(self.a2s._challenges.get(self.a2s._address, RequestType.Rules), -1)
+
     def tearDown(self):
         self.server.close()
         self.a2s.close()
@@ -0,0 +1,80 @@
+import time
+import unittest
+
+from a2squery import FleetScanner, Pacer, RequestType, TokenBucket
+from tests.test_scanner import TestFleetScanner
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(rate=10, burst=3)
+        now = bucket.updated
+
+        for _ in range(3):
+            self.assertTrue(bucket.consume(now))
+        self.assertFalse(bucket.consume(now))
+        self.assertAlmostEqual(bucket.available_at(now), now + 0.1)
+        self.assertTrue(bucket.consume(now + 0.11))
+
+    def test_reserve_ahead(self):
+        bucket = TokenBucket(rate=10, burst=1)
+        now = bucket.updated
+
+        bucket.reserve(now)
+        bucket.reserve(now)
+        self.assertAlmostEqual(bucket.available_at(now), now + 0.2)
+
+
+class TestPacer(unittest.TestCase):
+
+    def test_subnets_are_independent(self):
+        pacer = Pacer(rate=1000, burst=100, subnet_rate=10, subnet_burst=2)
+
+        self.assertEqual(pacer.reserve(("10.0.0.1", 27015)), 0)
+        self.assertEqual(pacer.reserve(("10.0.0.2", 27015)), 0)
+        self.assertGreater(pacer.reserve(("10.0.0.3", 27015)), 0.05)
+        self.assertEqual(pacer.reserve(("10.0.1.1", 27015)), 0)
+
+        self.assertEqual(pacer.queue_depth, 1)
+        self.assertEqual(pacer.stats()["subnets"], 2)
+        self.assertEqual(pacer.delayed, 1)
+
+    def test_subnet_backlog(self):
+        pacer = Pacer(rate=1000, burst=100, subnet_rate=100, subnet_burst=20)
+
+        for _ in range(1000):
+            pacer.reserve(("10.0.0.1", 27015))
+
+        self.assertGreater(pacer.reserve(("10.0.0.1", 27015)), 9)
+        self.assertEqual(pacer.reserve(("10.9.9.9", 27015)), 0)
+
+    def test_global_rate(self):
+        pacer = Pacer(rate=100, burst=1)
+
+        delays = [pacer.reserve(("10.0.{}.1".format(index), 27015)) for index in range(5)]
+        self.assertAlmostEqual(delays[-1], 0.04, delta=0.005)
+        self.assertEqual(pacer.max_queue_depth, 4)
+
+
+class TestPacedScanner(TestFleetScanner):
+
+    def setUp(self):
+        super().setUp()
+        self.scanner.close()
+        self.pacer = Pacer(rate=20, burst=1)
+        self.scanner = FleetScanner(timeout=1, max_in_flight=2, sockets=2, pacer=self.pacer)
+
+    def test_paced(self):
+        started = time.monotonic()
+        results = list(self.scanner.scan(self.targets, RequestType.Rules))
+
+        self.assertEqual(len(results), 3)
+        for result in results:
+            self.assertIsNone(result.error)
+        self.assertGreater(time.monotonic() - started, 0.09)
+        self.assertGreaterEqual(self.pacer.requests, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
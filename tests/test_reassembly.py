@@ -0,0 +1,136 @@
+import bz2
+import socket
+import struct
+import threading
+import unittest
+import zlib
+
+from a2squery import A2SQuery
+from a2squery.exceptions import InvalidResponse
+from a2squery.reassembly import SplitPacketAssembler
+
+RULES = b"\xff\xff\xff\xffE\x03\x00sv_tags\x00a2squery\x00mp_timelimit\x0030\x00sv_cheats\x000\x00"
+
+
+def source_fragments(payload: bytes, size: int = 16, packet_id: int = 0x1234):
+    chunks = [payload[i: i + size] for i in range(0, len(payload), size)]
+    return [
+        struct.pack("<llBBh", -2, packet_id, len(chunks), number, 1248) + chunk
+        for number, chunk in enumerate(chunks)
+    ]
+
+
+def goldsource_fragments(payload: bytes, size: int = 16, packet_id: int = 0x1234):
+    chunks = [payload[i: i + size] for i in range(0, len(payload), size)]
+    return [
+        struct.pack("<llB", -2, packet_id, number << 4 | len(chunks)) + chunk
+        for number, chunk in enumerate(chunks)
+    ]
+
+
+def compressed_fragments(payload: bytes, size: int = 16, packet_id: int = 0x1234, declared: int = None):
+    data = bz2.compress(payload)
+    chunks = [data[i: i + size] for i in range(0, len(data), size)]
+    fragments = []
+
+    for number, chunk in enumerate(chunks):
+        header = struct.pack("<lLBBh", -2, packet_id | 0x80000000, len(chunks), number, 1248)
+        if number == 0:
+            header += struct.pack("<lL", len(payload) if declared is None else declared, zlib.crc32(payload) & 0xFFFFFFFF)
+        fragments.append(header + chunk)
+
+    return fragments
+
+
+class TestSplitPacketAssembler(unittest.TestCase):
+
+    def feed_all(self, assembler, fragments):
+        results = [assembler.feed(fragment) for fragment in fragments]
+        self.assertTrue(all(result is None for result in results[:-1]))
+        return results[-1]
+
+    def test_source(self):
+        self.assertEqual(self.feed_all(SplitPacketAssembler(), source_fragments(RULES)), RULES)
+
+    def test_goldsource(self):
+        self.assertEqual(self.feed_all(SplitPacketAssembler(), goldsource_fragments(RULES)), RULES)
+
+    def test_out_of_order_and_duplicates(self):
+        fragments = source_fragments(RULES)
+        shuffled = fragments[2:] + fragments[1:2] * 2 + fragments[:1]
+
+        self.assertEqual(self.feed_all(SplitPacketAssembler(), shuffled), RULES)
+
+    def test_interleaved_addresses(self):
+        assembler = SplitPacketAssembler()
+        first, second = source_fragments(RULES), source_fragments(RULES[:30] + RULES[30:])
+
+        for a, b in zip(first[:-1], second[:-1]):
+            self.assertIsNone(assembler.feed(a, "a"))
+            self.assertIsNone(assembler.feed(b, "b"))
+
+        self.assertEqual(assembler.feed(first[-1], "a"), RULES)
+        self.assertEqual(assembler.feed(second[-1], "b"), RULES)
+
+    def test_compressed(self):
+        self.assertEqual(self.feed_all(SplitPacketAssembler(), compressed_fragments(RULES)), RULES)
+
+    def test_compressed_crc_mismatch(self):
+        fragments = compressed_fragments(RULES)
+        fragments[0] = fragments[0][:16] + b"\x00\x00\x00\x00" + fragments[0][20:]
+
+        with self.assertRaises(InvalidResponse):
+            self.feed_all(SplitPacketAssembler(), fragments)
+
+    def test_decompression_bomb(self):
+        fragments = compressed_fragments(bytes(1 << 24), size=1024, declared=len(RULES))
+
+        with self.assertRaises(InvalidResponse):
+            self.feed_all(SplitPacketAssembler(), fragments)
+
+    def test_truncated(self):
+        for data in (b"\xfe\xff\xff\xff\x01\x00\x00\x00\x02", b"\xfe\xff\xff\xff\x01\x00\x00\x80\x01\x00\x00\x00"):
+            with self.subTest(data=data), self.assertRaises(InvalidResponse):
+                SplitPacketAssembler().feed(data)
+
+    def test_eviction_order(self):
+        assembler = SplitPacketAssembler(timeout=10)
+        for packet_id in range(5):
+            assembler.feed(source_fragments(RULES, packet_id=packet_id)[0], now=packet_id)
+
+        self.assertEqual(assembler.evict(12.5), 3)
+        self.assertEqual(len(assembler), 2)
+        self.assertEqual(assembler.feed(source_fragments(RULES, packet_id=4)[1], now=13), None)
+
+    def test_eviction(self):
+        assembler = SplitPacketAssembler(timeout=0)
+        assembler.feed(source_fragments(RULES)[0])
+
+        self.assertEqual(len(assembler), 1)
+        self.assertEqual(assembler.evict(), 1)
+        self.assertEqual(len(assembler), 0)
+
+
+class TestSplitQuery(unittest.TestCase):
+
+    def test_rules(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        server.bind(("127.0.0.1", 0))
+
+        def respond():
+            _, client = server.recvfrom(65536)
+            for fragment in reversed(source_fragments(RULES)):
+                server.sendto(fragment, client)
+
+        thread = threading.Thread(target=respond)
+        thread.start()
+
+        with A2SQuery(*server.getsockname(), timeout=2) as a2s:
+            self.assertEqual(a2s.rules(), {"sv_tags": "a2squery", "mp_timelimit": "30", "sv_cheats": "0"})
+
+        thread.join()
+        server.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import asyncio
+import socket
+import time
+import unittest
+
+from a2squery import A2SQuery, A2SResponder, AsyncA2SQuery, FleetScanner, GoldSourceInfo
+from a2squery.parser import Parser
+from tests.test_parser import INFO, GOLDSOURCE_INFO, PLAYERS
+
+RULES = {"rule_{}".format(index): "x" * 20 for index in range(200)}
+
+
+class TestA2SResponder(unittest.TestCase):
+
+    def setUp(self):
+        self.info = Parser.parse_source_info(INFO)
+        self.players = Parser.parse_players(PLAYERS)
+        self.responder = A2SResponder(self.info, self.players, RULES)
+        self.responder.start()
+
+    def test_query(self):
+        with A2SQuery(*self.responder.address, timeout=2) as a2s:
+            self.assertEqual(dict(a2s.info()), dict(self.info))
+            self.assertEqual([dict(player) for player in a2s.players()], [dict(player) for player in self.players])
+            self.assertEqual(a2s.rules(), RULES)
+            self.assertEqual(a2s.snapshot().rules, RULES)
+
+        self.assertEqual(self.responder.challenges, 3)
+        self.assertEqual(self.responder.requests, 9)
+
+    def test_projection(self):
+        with A2SQuery(*self.responder.address, timeout=2) as a2s:
+            self.assertEqual(a2s.rules(keys=["rule_7", "rule_199", "absent"]), {"rule_7": "x" * 20, "rule_199": "x" * 20})
+            self.assertEqual([player.name for player in a2s.players(fields=["name"])], ["Player 0", "Player 1"])
+            self.assertIsNone(a2s.player(fields=["name"])[0].score)
+
+    def test_update(self):
+        with A2SQuery(*self.responder.address, timeout=2) as a2s:
+            self.assertEqual(a2s.info().name, "Server Name")
+
+            self.responder.update(info=Parser.parse_goldsource_info(GOLDSOURCE_INFO), rules={"a": "b"})
+            self.assertTrue(isinstance(a2s.info(), GoldSourceInfo))
+            self.assertEqual(a2s.rules(), {"a": "b"})
+            self.assertEqual(len(a2s.players()), 2)
+
+    def test_challenge_rotation(self):
+        with A2SQuery(*self.responder.address, timeout=2) as a2s:
+            a2s.info()
+            self.responder._rotate(time.monotonic())
+            a2s.info()
+            self.assertEqual(self.responder.challenges, 1)
+
+            self.responder._rotate(time.monotonic())
+            a2s.info()
+            self.assertEqual(self.responder.challenges, 2)
+
+    def test_ignores_invalid(self):
+        client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        client.settimeout(0.2)
+
+        client.sendto(b"\xff\xff\xff\xffTSource Engine Quer\x00\xff\xff\xff\xff\xff", self.responder.address)
+        client.sendto(b"\xff\xff\xff\xffZ\xff\xff\xff\xff", self.responder.address)
+        client.sendto(b"\xff", self.responder.address)
+
+        with self.assertRaises(socket.timeout):
+            client.recv(1400)
+        client.close()
+        self.assertEqual(self.responder.ignored, 3)
+
+    def test_scan(self):
+        with FleetScanner(timeout=2) as scanner:
+            results = list(scanner.scan([self.responder.address] * 50))
+
+        self.assertTrue(all(result.error is None for result in results))
+        self.assertEqual(len(results), 50)
+
+    def test_async_query(self):
+        async def query():
+            async with AsyncA2SQuery(*self.responder.address, timeout=2) as a2s:
+                return await a2s.rules()
+
+        loop = asyncio.new_event_loop()
+        self.assertEqual(loop.run_until_complete(query()), RULES)
+        loop.close()
+
+    def tearDown(self):
+        self.responder.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import asyncio
+import socket
+import threading
+import time
+import unittest
+
+from a2squery import A2SQuery, AsyncA2SQuery, RTTEstimator
+
+RULES = b"\xff\xff\xff\xffE\x01\x00sv_tags\x00a2squery\x00"
+PLAYERS = b"\xff\xff\xff\xffD\x00"
+
+
+class TestRTTEstimator(unittest.TestCase):
+
+    def test_first_sample(self):
+        rtt = RTTEstimator()
+        rtt.sample(0.1)
+
+        self.assertAlmostEqual(rtt.srtt, 0.1)
+        self.assertAlmostEqual(rtt.rttvar, 0.05)
+        self.assertAlmostEqual(rtt.rto, 0.3)
+
+    def test_smoothing_and_backoff(self):
+        rtt = RTTEstimator(min_rto=0.2, max_rto=1)
+        for _ in range(50):
+            rtt.sample(0.01)
+
+        self.assertAlmostEqual(rtt.srtt, 0.01)
+        self.assertEqual(rtt.timeout(0), 0.2)
+        self.assertEqual(rtt.timeout(1), 0.4)
+        self.assertEqual(rtt.timeout(5), 1)
+
+
+class TestRetransmission(unittest.TestCase):
+
+    def test_lost_request(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        server.bind(("127.0.0.1", 0))
+
+        def respond():
+            server.recvfrom(65536)
+            _, client = server.recvfrom(65536)
+            server.sendto(RULES, client)
+
+        thread = threading.Thread(target=respond)
+        thread.start()
+
+        started = time.monotonic()
+        with A2SQuery(*server.getsockname(), timeout=5, rtt=RTTEstimator(initial_rto=0.1)) as a2s:
+            self.assertEqual(a2s.rules(), {"sv_tags": "a2squery"})
+            self.assertLess(time.monotonic() - started, 1)
+            self.assertIsNone(a2s._rtt.srtt)
+
+        thread.join()
+        server.close()
+
+    def late_reply_server(self) -> socket.socket:
+        server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        server.bind(("127.0.0.1", 0))
+
+        def respond():
+            # The rules request is answered once it has been retransmitted, and the late reply to the
+            # first attempt arrives while the client waits for the players.
+            server.recvfrom(65536)
+            _, client = server.recvfrom(65536)
+            server.sendto(RULES, client)
+            server.recvfrom(65536)
+            server.sendto(RULES, client)
+            server.sendto(PLAYERS, client)
+
+        thread = threading.Thread(target=respond, daemon=True)
+        thread.start()
+        self.addCleanup(server.close)
+        self.addCleanup(thread.join)
+        return server
+
+    def test_late_reply(self):
+        server = self.late_reply_server()
+
+        with A2SQuery(*server.getsockname(), timeout=5, rtt=RTTEstimator(initial_rto=0.1)) as a2s:
+            self.assertEqual(a2s.rules(), {"sv_tags": "a2squery"})
+            self.assertEqual(a2s.player(), [])
+
+    def test_async_late_reply(self):
+        server = self.late_reply_server()
+
+        async def query():
+            async with AsyncA2SQuery(*server.getsockname(), timeout=5, rtt=RTTEstimator(initial_rto=0.1)) as a2s:
+                self.assertEqual(await a2s.rules(), {"sv_tags": "a2squery"})
+                self.assertEqual(await a2s.player(), [])
+
+        asyncio.run(query())
+
+
+if __name__ == "__main__":
+    unittest.main()
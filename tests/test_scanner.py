@@ -0,0 +1,91 @@
+import socket
+import threading
+import unittest
+from random import randint
+from unittest import mock
+
+from a2squery import FleetScanner, RequestType, SourceInfo, scanner
+from tests.test_query import A2SMockServer
+
+
+class TestFleetScanner(unittest.TestCase):
+
+    def setUp(self):
+        self.servers = []
+        self.targets = []
+
+        while len(self.servers) < 3:
+            try:
+                port = randint(1024, 65535)
+                self.servers.append(A2SMockServer("127.0.0.1", port))
+                self.targets.append(("127.0.0.1", port))
+            except OSError:
+                pass
+
+        self.threads = [threading.Thread(target=server.recv) for server in self.servers]
+        for thread in self.threads:
+            thread.start()
+
+        self.scanner = FleetScanner(timeout=1, max_in_flight=2, sockets=2)
+
+    def test_info(self):
+        results = list(self.scanner.scan(self.targets, RequestType.Info))
+
+        self.assertEqual(sorted(result.address for result in results), sorted(self.targets))
+        for result in results:
+            self.assertIsNone(result.error)
+            self.assertTrue(isinstance(result.result, SourceInfo))
+
+    def test_players_with_duplicates(self):
+        results = list(self.scanner.scan(self.targets + self.targets[:1], RequestType.Player))
+
+        self.assertEqual(len(results), 4)
+        for result in results:
+            self.assertEqual(result.result[0].name, "Player 0")
+
+    def test_timeout(self):
+        dead = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        dead.bind(("127.0.0.1", 0))
+
+        self.scanner._timeout = 0.2
+        results = list(self.scanner.scan([dead.getsockname()] + self.targets[:1], RequestType.Rules))
+        dead.close()
+
+        errors = [result for result in results if result.error is not None]
+        self.assertEqual(len(errors), 1)
+        self.assertTrue(isinstance(errors[0].error, socket.timeout))
+
+    def test_host_names(self):
+        lookups = []
+
+        def lookup(host):
+            lookups.append(host)
+            if host == "unknown.invalid":
+                raise socket.gaierror("unknown host")
+            return "127.0.0.1"
+
+        targets = [("server.test", port) for _, port in self.targets] * 2 + [("unknown.invalid", 27015)]
+        with mock.patch("socket.gethostbyname", lookup):
+            results = list(self.scanner.scan(targets, RequestType.Info))
+
+        self.assertEqual(lookups, ["server.test", "unknown.invalid"])
+        self.assertEqual(len(results), len(targets))
+        self.assertEqual([result.address for result in results if result.error is not None], [("unknown.invalid", 27015)])
+
+    def test_estimators_are_bounded(self):
+        with mock.patch.object(scanner, "_MAX_ESTIMATES", 2):
+            first = self.scanner._estimator(("10.0.0.1", 27015))
+            self.scanner._estimator(("10.0.0.2", 27015))
+            self.assertIs(self.scanner._estimator(("10.0.0.1", 27015)), first)
+            self.scanner._estimator(("10.0.0.3", 27015))
+
+        self.assertEqual(list(self.scanner._rtt), [("10.0.0.1", 27015), ("10.0.0.3", 27015)])
+
+    def tearDown(self):
+        self.scanner.close()
+        for server in self.servers:
+            server.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
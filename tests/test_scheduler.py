@@ -0,0 +1,123 @@
+import math
+import time
+import unittest
+
+from a2squery import A2SResponder, AdaptiveScheduler, FleetScanner, RequestType, ScanResult
+from a2squery.parser import Parser
+from tests.test_parser import INFO, PLAYERS
+
+TARGET = ("10.0.0.1", 27015)
+
+
+def info(players: int, map: str = "de_dust2", max_players: int = 32):
+    result = Parser.parse_source_info(INFO)
+    result.players = players
+    result.max_players = max_players
+    result.map = map
+    return result
+
+
+class TestAdaptiveScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.now = time.monotonic()
+
+    def poll(self, scheduler, result=None, error=None):
+        self.now += scheduler.max_interval * 2
+        self.assertEqual(scheduler.due(self.now), [TARGET])
+        scheduler.record(ScanResult(address=TARGET, request_type=RequestType.Info, result=result, error=error), self.now)
+
+    def test_changes_shorten_interval(self):
+        scheduler = AdaptiveScheduler([TARGET], min_interval=10, max_interval=600)
+
+        for players in (10, 10, 10, 10):
+            self.poll(scheduler, info(players))
+        self.assertAlmostEqual(scheduler.interval(TARGET), 10 * 1.25 ** 4)
+
+        self.poll(scheduler, info(11))
+        self.poll(scheduler, info(11, "de_inferno"))
+        self.assertEqual(scheduler.interval(TARGET), 10)
+
+    def test_occupancy_caps_interval(self):
+        scheduler = AdaptiveScheduler([TARGET], min_interval=10, max_interval=600)
+
+        for _ in range(40):
+            self.poll(scheduler, info(0))
+        self.assertEqual(scheduler.interval(TARGET), 600)
+
+        self.poll(scheduler, info(16))
+        self.assertEqual(scheduler.interval(TARGET), 300)
+        for _ in range(10):
+            self.poll(scheduler, info(32))
+        self.assertEqual(scheduler.interval(TARGET), 10)
+
+    def test_errors_back_off(self):
+        scheduler = AdaptiveScheduler([TARGET], min_interval=10, max_interval=30)
+
+        for interval in (20, 30, 30):
+            self.poll(scheduler, error=OSError())
+            self.assertEqual(scheduler.interval(TARGET), interval)
+
+        next_due = scheduler.next_due()
+        self.assertGreaterEqual(next_due - self.now, 27)
+        self.assertLessEqual(next_due - self.now, 33)
+
+    def test_budget(self):
+        targets = [("10.0.{}.{}".format(index // 256, index % 256), 27015) for index in range(5000)]
+        scheduler = AdaptiveScheduler(targets, rate=100, min_interval=10)
+        self.assertAlmostEqual(scheduler.stretch, 5)
+
+        # Every target is due by then, so only the budget limits how many are taken.
+        start = time.monotonic() + 100
+        taken = []
+        for step in range(1, 101):
+            taken += scheduler.due(start + step / 100)
+
+        # One second of polls, plus the bucket's burst.
+        self.assertLessEqual(len(taken), 110)
+        self.assertGreaterEqual(len(taken), 100)
+        self.assertEqual(len(set(taken)), len(taken))
+
+        scheduler.remove(taken[0])
+        self.assertEqual(len(scheduler), 4999)
+        self.assertAlmostEqual(scheduler.demand, 499.9)
+
+    def test_scale(self):
+        targets = [("10.{}.{}.{}".format(index >> 16, (index >> 8) & 255, index & 255), 27015) for index in range(100000)]
+        started = time.perf_counter()
+
+        scheduler = AdaptiveScheduler(targets, rate=10 ** 6, min_interval=1, max_interval=10)
+        now = time.monotonic()
+        taken = scheduler.due(now + 100)
+        empty = info(0)
+        for target in taken:
+            scheduler.record(ScanResult(address=target, request_type=RequestType.Info, result=empty), now)
+
+        self.assertEqual(len(taken), 100000)
+        self.assertLess(scheduler.next_due(), math.inf)
+        self.assertLess(time.perf_counter() - started, 5)
+
+    def test_run(self):
+        responders = [A2SResponder(Parser.parse_source_info(INFO), Parser.parse_players(PLAYERS)) for _ in range(3)]
+        for responder in responders:
+            responder.start()
+
+        scheduler = AdaptiveScheduler([responder.address for responder in responders], min_interval=0.05, max_interval=0.1)
+        results = []
+
+        with FleetScanner(timeout=1) as scanner:
+            for result in scheduler.run(scanner):
+                results.append(result)
+                if len(results) == 12:
+                    scheduler.stop()
+
+        for responder in responders:
+            responder.close()
+
+        self.assertGreaterEqual(len(results), 12)
+        self.assertTrue(all(result.error is None for result in results))
+        self.assertEqual({result.address for result in results}, {responder.address for responder in responders})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import socket
+import threading
+import time
+import unittest
+
+from a2squery import Environment, RequestType, ServerType, ShardedScanner, SourceInfo
+from a2squery.sharded import _BATCH_DELAY, _decode, _encode, _shard
+from tests.test_query import A2SMockServer
+
+
+class TestShardedScanner(unittest.TestCase):
+
+    def setUp(self):
+        self.servers = [A2SMockServer("127.0.0.1", 0) for _ in range(4)]
+        self.targets = [server._socket.getsockname() for server in self.servers]
+
+        for server in self.servers:
+            threading.Thread(target=server.recv).start()
+
+    def scan(self, workers, request_type, targets):
+        with ShardedScanner(workers=workers, timeout=0.5) as scanner:
+            return list(scanner.scan(targets, request_type))
+
+    def test_workers(self):
+        for workers in (1, 3):
+            with self.subTest(workers=workers):
+                results = self.scan(workers, RequestType.Info, self.targets * 2)
+
+                self.assertEqual(sorted(result.address for result in results), sorted(self.targets * 2))
+                for result in results:
+                    self.assertIsNone(result.error)
+                    self.assertTrue(isinstance(result.result, SourceInfo))
+                    self.assertIs(result.result.server_type, ServerType.Dedicated)
+                    self.assertIs(result.result.environment, Environment.Windows)
+
+    def test_players_and_errors(self):
+        dead = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        dead.bind(("127.0.0.1", 0))
+
+        results = self.scan(2, RequestType.Player, self.targets + [dead.getsockname()])
+        dead.close()
+
+        errors = [result for result in results if result.error is not None]
+        self.assertEqual(len(errors), 1)
+        self.assertTrue(isinstance(errors[0].error, socket.timeout))
+        self.assertEqual(len(results), 5)
+        self.assertEqual(results[0].result[0].name, "Player 0")
+
+    def test_lone_result_latency(self):
+        # Every worker also has a target that never answers, which keeps its scan busy until the timeout.
+        silent = [socket.socket(socket.AF_INET, socket.SOCK_DGRAM) for _ in range(8)]
+        for sock in silent:
+            sock.bind(("127.0.0.1", 0))
+        addresses = [sock.getsockname() for sock in silent]
+        self.assertEqual({_shard(address, 2) for address in addresses}, {0, 1})
+
+        with ShardedScanner(workers=2, timeout=2, retries=0) as scanner:
+            started = time.monotonic()
+            results = scanner.scan(self.targets[:1] + addresses, RequestType.Info)
+            first = next(results)
+            elapsed = time.monotonic() - started
+            results.close()
+
+        for sock in silent:
+            sock.close()
+
+        self.assertIsNone(first.error)
+        self.assertLess(elapsed, _BATCH_DELAY + 0.5)
+
+    def test_stable_shards(self):
+        self.assertEqual(_shard(("10.0.0.1", 27015), 32), _shard(("10.0.0.1", 27015), 32))
+
+    def test_round_trip(self):
+        result = self.scan(1, RequestType.Rules, self.targets[:1])[0]
+        decoded = _decode(_encode(result), RequestType.Rules)
+        self.assertEqual(decoded.result, result.result)
+
+    def tearDown(self):
+        for server in self.servers:
+            server.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import socket
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from a2squery import A2SResponder, ResponseType, SharedA2SQuery, SourceInfo
+from a2squery.encoder import pack_response
+from a2squery.exceptions import SocketClosed
+from a2squery.parser import Parser
+from tests.test_parser import INFO, PLAYERS
+
+RULES = {"rule_{}".format(index): "x" * 20 for index in range(200)}
+
+
+class TestSharedA2SQuery(unittest.TestCase):
+
+    def setUp(self):
+        self.responder = A2SResponder(Parser.parse_source_info(INFO), Parser.parse_players(PLAYERS), RULES)
+        self.responder.start()
+        self.a2s = SharedA2SQuery(*self.responder.address, timeout=2)
+
+    def test_thread_pool(self):
+        def query(index):
+            kind = index % 3
+            if kind == 0:
+                return kind, self.a2s.info()
+            if kind == 1:
+                return kind, self.a2s.players()
+            return kind, self.a2s.rules()
+
+        with ThreadPoolExecutor(16) as pool:
+            results = list(pool.map(query, range(600)))
+
+        for kind, result in results:
+            if kind == 0:
+                self.assertTrue(isinstance(result, SourceInfo))
+                self.assertEqual(result.name, "Server Name")
+            elif kind == 1:
+                self.assertEqual([player.name for player in result], ["Player 0", "Player 1"])
+            else:
+                self.assertEqual(result, RULES)
+
+        # Every request type asks for a challenge once; the rest reuse the cached one.
+        self.assertLessEqual(self.responder.challenges, 3 * 16)
+        self.assertEqual(sum(len(waiters) for waiters in self.a2s._waiters.values()), 0)
+
+    def test_snapshot(self):
+        with ThreadPoolExecutor(4) as pool:
+            snapshots = list(pool.map(lambda _: self.a2s.snapshot(), range(20)))
+
+        self.assertTrue(all(snapshot.rules == RULES for snapshot in snapshots))
+        self.assertTrue(all(snapshot.players[0].name == "Player 0" for snapshot in snapshots))
+
+    def test_close_fails_waiters(self):
+        silent = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        silent.bind(("127.0.0.1", 0))
+        silent.settimeout(5)
+        a2s = SharedA2SQuery(*silent.getsockname(), timeout=5, retries=0)
+        errors = []
+
+        def query():
+            try:
+                a2s.info()
+            except Exception as exception:
+                errors.append(exception)
+
+        thread = threading.Thread(target=query)
+        thread.start()
+        silent.recv(1400)
+        a2s.close()
+        thread.join()
+        silent.close()
+
+        self.assertEqual(len(errors), 1)
+        self.assertTrue(isinstance(errors[0], SocketClosed))
+
+    def test_ignores_invalid(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        server.bind(("127.0.0.1", 0))
+        server.settimeout(5)
+
+        def serve():
+            # Datagrams that cannot be decoded arrive before the real reply.
+            _, client = server.recvfrom(1400)
+            server.sendto(b"\xff\xff", client)
+            server.sendto(b"\xff\xff\xff\xff\x01", client)
+            server.sendto(b"garbage", client)
+            server.sendto(pack_response(ResponseType.InfoSource, INFO), client)
+
+        thread = threading.Thread(target=serve)
+        thread.start()
+
+        with SharedA2SQuery(*server.getsockname(), timeout=2) as a2s:
+            self.assertEqual(a2s.info().name, "Server Name")
+
+        thread.join()
+        server.close()
+
+    def test_timeout(self):
+        silent = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        silent.bind(("127.0.0.1", 0))
+
+        with SharedA2SQuery(*silent.getsockname(), timeout=0.3, retries=1) as a2s:
+            with self.assertRaises(socket.timeout):
+                a2s.rules()
+        silent.close()
+
+    def tearDown(self):
+        self.a2s.close()
+        self.responder.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
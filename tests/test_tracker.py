@@ -0,0 +1,58 @@
+import struct
+import unittest
+
+from a2squery import PlayerTracker, PlayerEventType
+
+ADDRESS = ("127.0.0.1", 27015)
+
+
+def payload(*players):
+    return bytes([len(players)]) + b"".join(
+        b"\x00" + name.encode() + b"\x00" + struct.pack("<lf", score, duration)
+        for name, score, duration in players
+    )
+
+
+class TestPlayerTracker(unittest.TestCase):
+
+    def setUp(self):
+        self.tracker = PlayerTracker()
+        self.tracker.update(ADDRESS, payload(("a", 0, 10.0), ("b", 1, 20.0), ("bot", 0, 5.0), ("bot", 0, 6.0)))
+
+    def events(self, data):
+        return [(event.type, event.player.name) for event in self.tracker.update(ADDRESS, data)]
+
+    def test_first_update_joins_everyone(self):
+        self.assertEqual(PlayerTracker().update(ADDRESS, payload(("a", 0, 1.0)))[0].type, PlayerEventType.Join)
+
+    def test_unchanged_payload(self):
+        self.assertEqual(self.events(payload(("a", 0, 10.0), ("b", 1, 20.0), ("bot", 0, 5.0), ("bot", 0, 6.0))), [])
+
+    def test_join_leave_update(self):
+        events = self.events(payload(("b", 4, 25.0), ("bot", 0, 10.0), ("bot", 0, 11.0), ("c", 0, 1.0)))
+
+        self.assertEqual(events, [
+            (PlayerEventType.Leave, "a"),
+            (PlayerEventType.Join, "c"),
+            (PlayerEventType.Update, "b"),
+        ])
+
+    def test_reconnect(self):
+        events = self.events(payload(("a", 0, 1.0), ("b", 1, 25.0), ("bot", 0, 10.0), ("bot", 0, 11.0)))
+
+        self.assertEqual(events, [(PlayerEventType.Leave, "a"), (PlayerEventType.Join, "a")])
+
+    def test_durations(self):
+        data = payload(("a", 0, 15.0), ("b", 1, 20.0), ("bot", 0, 5.0), ("bot", 0, 6.0))
+        self.assertEqual(self.events(data), [])
+
+        tracker = PlayerTracker(durations=True)
+        tracker.update(ADDRESS, payload(("a", 0, 10.0), ("b", 1, 20.0), ("bot", 0, 5.0), ("bot", 0, 6.0)))
+        events = tracker.update(ADDRESS, data)
+
+        self.assertEqual([(event.type, event.player.name) for event in events], [(PlayerEventType.Update, "a")])
+        self.assertEqual(events[0].previous.duration, 10.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import asyncio
+import socket
+import time
+import unittest
+
+from a2squery import A2SResponder, PlayerEventType, RequestType, watch
+from a2squery.parser import Parser
+from tests.test_parser import INFO, PLAYERS
+
+
+class TestWatch(unittest.TestCase):
+
+    def setUp(self):
+        self.players = Parser.parse_players(PLAYERS)
+        self.responder = A2SResponder(Parser.parse_source_info(INFO), self.players, {"a": "1"})
+        self.responder.start()
+        self.loop = asyncio.new_event_loop()
+
+    def collect(self, targets, count, during=None, duration=5, **kwargs):
+        events = []
+
+        async def run():
+            watcher = watch(targets, **kwargs)
+
+            try:
+                async for event in watcher:
+                    events.append(event)
+                    if during is not None:
+                        during(events)
+                    if len(events) == count:
+                        return
+            finally:
+                await watcher.aclose()
+
+        try:
+            self.loop.run_until_complete(asyncio.wait_for(run(), duration))
+        except asyncio.TimeoutError:
+            pass
+
+        return events
+
+    def test_only_changes(self):
+        def during(events):
+            if len(events) == 3:
+                self.responder.update(rules={"a": "2"})
+
+        started = time.monotonic()
+        events = self.collect(
+            [self.responder.address], 4, during, interval=0.1,
+            request_types=(RequestType.Info, RequestType.Player, RequestType.Rules)
+        )
+
+        self.assertEqual({event.request_type for event in events[:3]}, set(RequestType))
+        self.assertTrue(all(event.previous is None for event in events[:3]))
+        self.assertEqual(events[3].request_type, RequestType.Rules)
+        self.assertEqual(events[3].result, {"a": "2"})
+        self.assertEqual(events[3].previous, {"a": "1"})
+        # Unchanged responses kept being polled without producing events.
+        self.assertGreater(self.responder.requests, 6)
+        self.assertLess(time.monotonic() - started, 2)
+
+    def test_player_events(self):
+        def during(events):
+            if len(events) == 1:
+                self.players[0].score += 1
+                self.responder.update(players=self.players[:1])
+
+        events = self.collect([self.responder.address], 2, during, interval=0.1, request_types=(RequestType.Player,))
+
+        self.assertEqual(
+            [event.type for event in events[1].player_events], [PlayerEventType.Leave, PlayerEventType.Update]
+        )
+
+    def test_errors_reported_once(self):
+        silent = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        silent.bind(("127.0.0.1", 0))
+
+        events = self.collect(
+            [silent.getsockname(), self.responder.address, self.responder.address], None,
+            duration=1, interval=0.05, timeout=0.2, retries=0
+        )
+        address = silent.getsockname()
+        silent.close()
+
+        errors = [event for event in events if event.error is not None]
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0].address, address)
+        self.assertTrue(isinstance(errors[0].error, asyncio.TimeoutError))
+        self.assertEqual(len(events), 2)
+
+    def test_no_targets(self):
+        self.assertEqual(self.collect([], 1, duration=1), [])
+
+    def tearDown(self):
+        self.loop.close()
+        self.responder.close()
+
+
+if __name__ == "__main__":
+    unittest.main()